@@ -25,9 +25,6 @@ import tempfile
 import time
 import zipfile
 
-import natsort
-import py7zr
-
 try:
     from unrar.cffi import rarfile
 except:
@@ -40,6 +37,7 @@ try:
 except ImportError:
     pil_available = False
 
+from comicapi import imagesize
 from comicapi.comet import CoMet
 from comicapi.comicbookinfo import ComicBookInfo
 from comicapi.comicinfoxml import ComicInfoXml
@@ -64,6 +62,11 @@ class SevenZipArchiver:
 
     """7Z implementation"""
 
+    # py7zr is imported by the methods that use it, importing it takes longer than reading most zip archives
+
+    # how many bytes of files read_file_headers unpacks at a time
+    header_batch_size = 32 * 1024 * 1024
+
     def __init__(self, path):
         self.path = path
 
@@ -75,6 +78,8 @@ class SevenZipArchiver:
         return False
 
     def read_file(self, archive_file):
+        import py7zr
+
         data = ""
         try:
             with py7zr.SevenZipFile(self.path, "r") as zf:
@@ -88,6 +93,52 @@ class SevenZipArchiver:
 
         return data
 
+    def read_file_headers(self, archive_files, length):
+        """Returns {name: (size, first length bytes)}, a 7z archive has to be unpacked to read them
+
+        The files are unpacked in batches of about header_batch_size bytes, so
+        only one batch is held in memory.  Each batch of a solid archive is
+        unpacked from the start of its block, so the batches are kept large.
+        """
+        import py7zr
+
+        headers = {}
+        try:
+            with py7zr.SevenZipFile(self.path, "r") as zf:
+                sizes = {info.filename: info.uncompressed for info in zf.list()}
+                batches = []
+                batch_size = SevenZipArchiver.header_batch_size
+                for archive_file in archive_files:
+                    if batch_size >= SevenZipArchiver.header_batch_size:
+                        batches.append([])
+                        batch_size = 0
+                    batches[-1].append(archive_file)
+                    batch_size += sizes.get(archive_file, 0)
+
+                for batch in batches:
+                    for archive_file, bio in zf.read(batch).items():
+                        headers[archive_file] = (bio.getbuffer().nbytes, bio.read(length))
+                    zf.reset()
+        except Exception as e:
+            logger.error("bad 7zip file [%s]: %s", e, self.path)
+        return headers
+
+    def read_tag_files(self, wanted):
+        """Returns (filename list, comment, {name: data}) for the files wanted(name) picks, opening the archive once"""
+        import py7zr
+
+        try:
+            with py7zr.SevenZipFile(self.path, "r") as zf:
+                namelist = zf.getnames()
+                targets = [name for name in namelist if wanted(name)]
+                files = {}
+                if len(targets) > 0:
+                    files = {name: bio.read() for name, bio in zf.read(targets).items()}
+        except Exception as e:
+            logger.error("bad 7zip file [%s]: %s", e, self.path)
+            return [], "", {}
+        return namelist, "", files
+
     def remove_file(self, archive_file):
         try:
             self.rebuild_zip_file([archive_file])
@@ -100,6 +151,8 @@ class SevenZipArchiver:
         #  At the moment, no other option but to rebuild the whole
         #  zip archive w/o the indicated file. Very sucky, but maybe
         # another solution can be found
+        import py7zr
+
         try:
             files = self.get_filename_list()
             if archive_file in files:
@@ -113,6 +166,8 @@ class SevenZipArchiver:
             return False
 
     def get_filename_list(self):
+        import py7zr
+
         try:
             with py7zr.SevenZipFile(self.path, "r") as zf:
                 namelist = zf.getnames()
@@ -127,6 +182,8 @@ class SevenZipArchiver:
 
         This recompresses the zip archive, without the files in the exclude_list
         """
+        import py7zr
+
         tmp_fd, tmp_name = tempfile.mkstemp(dir=os.path.dirname(self.path))
         os.close(tmp_fd)
 
@@ -147,6 +204,8 @@ class SevenZipArchiver:
 
     def copy_from_archive(self, otherArchive):
         """Replace the current zip with one copied from another archive"""
+        import py7zr
+
         try:
             with py7zr.SevenZipFile(self.path, "w") as zout:
                 for fname in otherArchive.get_filename_list():
@@ -190,6 +249,39 @@ class ZipArchiver:
                 raise IOError from e
         return data
 
+    def read_file_headers(self, archive_files, length):
+        """Returns {name: (size, first length bytes)}, reading only the start of each file"""
+        headers = {}
+        try:
+            with zipfile.ZipFile(self.path, "r") as zf:
+                for archive_file in archive_files:
+                    try:
+                        info = zf.getinfo(archive_file)
+                        with zf.open(info) as f:
+                            headers[archive_file] = (info.file_size, f.read(length))
+                    except Exception as e:
+                        logger.error("bad zipfile [%s]: %s :: %s", e, self.path, archive_file)
+        except Exception as e:
+            logger.error("bad zipfile [%s]: %s", e, self.path)
+        return headers
+
+    def read_tag_files(self, wanted):
+        """Returns (filename list, comment, {name: data}) for the files wanted(name) picks, opening the archive once"""
+        try:
+            with zipfile.ZipFile(self.path, "r") as zf:
+                namelist = zf.namelist()
+                files = {}
+                for name in namelist:
+                    if wanted(name):
+                        try:
+                            files[name] = zf.read(name)
+                        except Exception as e:
+                            logger.error("bad zipfile [%s]: %s :: %s", e, self.path, name)
+                return namelist, zf.comment, files
+        except Exception as e:
+            logger.error("bad zipfile [%s]: %s", e, self.path)
+            return [], "", {}
+
     def remove_file(self, archive_file):
         try:
             self.rebuild_zip_file([archive_file])
@@ -429,6 +521,48 @@ class RarArchiver:
 
         raise IOError
 
+    def read_file_headers(self, archive_files, length):
+        """Returns {name: (size, first length bytes)}, from one open of the archive"""
+        headers = {}
+        rarc = self.get_rar_obj()
+        if rarc is None:
+            return headers
+        try:
+            sizes = {item.filename: item.file_size for item in rarc.infolist()}
+            for archive_file in archive_files:
+                try:
+                    headers[archive_file] = (sizes[archive_file], rarc.open(archive_file).read(length))
+                except Exception as e:
+                    logger.error("read_file_headers(): [%s]  %s:%s", e, self.path, archive_file)
+        except Exception as e:
+            logger.error("read_file_headers(): [%s]  %s", e, self.path)
+        return headers
+
+    def read_tag_files(self, wanted):
+        """Returns (filename list, comment, {name: data}) for the files wanted(name) picks, opening the archive once"""
+        rarc = self.get_rar_obj()
+        if rarc is None:
+            return [], "", {}
+        try:
+            namelist = [item.filename for item in rarc.infolist() if item.file_size != 0]
+            comment = rarc.comment
+        except (OSError, IOError) as e:
+            logger.error("read_tag_files(): [%s] %s", e, self.path)
+            return [], "", {}
+
+        files = {}
+        for name in namelist:
+            if wanted(name):
+                try:
+                    files[name] = rarc.open(name).read()
+                except Exception:
+                    # read_file retries reads that fail
+                    try:
+                        files[name] = self.read_file(name)
+                    except IOError:
+                        pass
+        return namelist, comment, files
+
     def write_file(self, archive_file, data):
 
         if self.rar_exe_path is not None:
@@ -549,6 +683,22 @@ class FolderArchiver:
 
         return data
 
+    def read_file_headers(self, archive_files, length):
+        headers = {}
+        for archive_file in archive_files:
+            fname = os.path.join(self.path, archive_file)
+            try:
+                with open(fname, "rb") as f:
+                    headers[archive_file] = (os.fstat(f.fileno()).st_size, f.read(length))
+            except IOError:
+                logger.exception("Failed to read: %s", fname)
+        return headers
+
+    def read_tag_files(self, wanted):
+        namelist = self.get_filename_list()
+        files = {name: self.read_file(name) for name in namelist if wanted(name)}
+        return namelist, self.get_comment(), files
+
     def write_file(self, archive_file, data):
 
         fname = os.path.join(self.path, archive_file)
@@ -605,6 +755,12 @@ class UnknownArchiver:
     def read_file(self, archive_file):
         return ""
 
+    def read_file_headers(self, archive_files, length):
+        return {}
+
+    def read_tag_files(self, wanted):
+        return [], "", {}
+
     def write_file(self, archive_file, data):
         return False
 
@@ -617,6 +773,9 @@ class UnknownArchiver:
 
 class ComicArchive:
     logo_data = None
+    # natsort key for page names, made on first use
+    page_name_key = None
+    sevenzip_magic = b"7z\xbc\xaf\x27\x1c"
 
     class ArchiveType:
         SevenZip, Zip, Rar, Folder, Pdf, Unknown = list(range(6))
@@ -632,6 +791,9 @@ class ComicArchive:
         self.path = path
         self.page_count = None
         self.page_list = None
+        self.image_name_list = None
+        # (size, width, height) of each page by name, kept by reset_cache since tag changes don't touch the pages
+        self.page_geometry = {}
 
         self.rar_exe_path = rar_exe_path
         self.ci_xml_filename = "ComicInfo.xml"
@@ -680,6 +842,7 @@ class ComicArchive:
         self.comet_filename = None
         self.page_count = None
         self.page_list = None
+        self.image_name_list = None
         self.cix_md = None
         self.cbi_md = None
         self.comet_md = None
@@ -693,7 +856,12 @@ class ComicArchive:
         self.archiver.path = path
 
     def sevenzip_test(self):
-        return py7zr.is_7zfile(self.path)
+        # the magic number check py7zr.is_7zfile does, without importing py7zr for every archive
+        try:
+            with open(self.path, "rb") as fp:
+                return fp.read(len(ComicArchive.sevenzip_magic)) == ComicArchive.sevenzip_magic
+        except OSError:
+            return False
 
     def zip_test(self):
         return zipfile.is_zipfile(self.path)
@@ -862,44 +1030,59 @@ class ComicArchive:
 
         return scanner_page_index
 
+    def get_image_name_list(self):
+        """Returns the names of the image files in the archive, in archive order"""
+        if self.image_name_list is None:
+            self.image_name_list = self.get_image_names(self.archiver.get_filename_list())
+        return self.image_name_list
+
+    @staticmethod
+    def get_image_names(namelist):
+        return [
+            name
+            for name in namelist
+            if os.path.splitext(name)[1].lower() in [".jpg", "jpeg", ".png", ".gif", ".webp"]
+            and os.path.basename(name)[0] != "."
+        ]
+
     def get_page_name_list(self, sort_list=True):
         if self.page_list is None:
-            # get the list file names in the archive, and sort
-            files = self.archiver.get_filename_list()
+            files = self.get_image_name_list()
 
             # seems like some archive creators are on Windows, and don't know about case-sensitivity!
             if sort_list:
+                if ComicArchive.page_name_key is None:
+                    import natsort
 
-                files = natsort.natsorted(files, alg=natsort.ns.IC | natsort.ns.I | natsort.ns.U)
+                    ComicArchive.page_name_key = natsort.natsort_keygen(alg=natsort.ns.IC | natsort.ns.I | natsort.ns.U)
+                files = sorted(files, key=ComicArchive.page_name_key)
 
-            # make a sub-list of image files
-            self.page_list = []
-            for name in files:
-                if (
-                    os.path.splitext(name)[1].lower() in [".jpg", "jpeg", ".png", ".gif", ".webp"]
-                    and os.path.basename(name)[0] != "."
-                ):
-                    self.page_list.append(name)
+            self.page_list = list(files)
 
         return self.page_list
 
     def get_number_of_pages(self):
+        # counting the pages doesn't need them sorted, which is most of the work for a large archive
         if self.page_count is None:
-            self.page_count = len(self.get_page_name_list())
+            self.page_count = len(self.get_image_name_list())
         return self.page_count
 
     def read_cbi(self):
         if self.cbi_md is None:
-            raw_cbi = self.read_raw_cbi()
-            if raw_cbi is None:
-                self.cbi_md = GenericMetadata()
-            else:
-                self.cbi_md = ComicBookInfo().metadata_from_string(raw_cbi)
-
-            self.cbi_md.set_default_page_list(self.get_number_of_pages())
+            self.cbi_md = self.cbi_from_raw(self.read_raw_cbi())
 
         return self.cbi_md
 
+    def cbi_from_raw(self, raw_cbi):
+        if raw_cbi is None:
+            md = GenericMetadata()
+        else:
+            md = ComicBookInfo().metadata_from_string(raw_cbi)
+
+        md.set_default_page_list(self.get_number_of_pages())
+        md.intern_strings()
+        return md
+
     def read_raw_cbi(self):
         if not self.has_cbi():
             return None
@@ -941,23 +1124,27 @@ class ComicArchive:
 
     def read_cix(self):
         if self.cix_md is None:
-            raw_cix = self.read_raw_cix()
-            if raw_cix is None or raw_cix == "":
-                self.cix_md = GenericMetadata()
-            else:
-                self.cix_md = ComicInfoXml().metadata_from_string(raw_cix)
+            self.cix_md = self.cix_from_raw(self.read_raw_cix())
+
+        return self.cix_md
 
-            # validate the existing page list (make sure count is correct)
-            if len(self.cix_md.pages) != 0:
-                if len(self.cix_md.pages) != self.get_number_of_pages():
-                    # pages array doesn't match the actual number of images we're seeing
-                    # in the archive, so discard the data
-                    self.cix_md.pages = []
+    def cix_from_raw(self, raw_cix):
+        if raw_cix is None or raw_cix == "":
+            md = GenericMetadata()
+        else:
+            md = ComicInfoXml().metadata_from_string(raw_cix)
 
-            if len(self.cix_md.pages) == 0:
-                self.cix_md.set_default_page_list(self.get_number_of_pages())
+        # validate the existing page list (make sure count is correct)
+        if len(md.pages) != 0:
+            if len(md.pages) != self.get_number_of_pages():
+                # pages array doesn't match the actual number of images we're seeing
+                # in the archive, so discard the data
+                md.pages = []
 
-        return self.cix_md
+        if len(md.pages) == 0:
+            md.set_default_page_list(self.get_number_of_pages())
+        md.intern_strings()
+        return md
 
     def read_raw_cix(self):
         if not self.has_cix():
@@ -1008,28 +1195,32 @@ class ComicArchive:
 
     def read_comet(self):
         if self.comet_md is None:
-            raw_comet = self.read_raw_comet()
-            if raw_comet is None or raw_comet == "":
-                self.comet_md = GenericMetadata()
-            else:
-                self.comet_md = CoMet().metadata_from_string(raw_comet)
-
-            self.comet_md.set_default_page_list(self.get_number_of_pages())
-            # use the coverImage value from the comet_data to mark the cover in this struct
-            # walk through list of images in file, and find the matching one for md.coverImage
-            # need to remove the existing one in the default
-            if self.comet_md.cover_image is not None:
-                cover_idx = 0
-                for idx, f in enumerate(self.get_page_name_list()):
-                    if self.comet_md.cover_image == f:
-                        cover_idx = idx
-                        break
-                if cover_idx != 0:
-                    del self.comet_md.pages[0]["Type"]
-                    self.comet_md.pages[cover_idx]["Type"] = PageType.FrontCover
+            self.comet_md = self.comet_from_raw(self.read_raw_comet())
 
         return self.comet_md
 
+    def comet_from_raw(self, raw_comet):
+        if raw_comet is None or raw_comet == "":
+            md = GenericMetadata()
+        else:
+            md = CoMet().metadata_from_string(raw_comet)
+
+        md.set_default_page_list(self.get_number_of_pages())
+        # use the coverImage value from the comet_data to mark the cover in this struct
+        # walk through list of images in file, and find the matching one for md.coverImage
+        # need to remove the existing one in the default
+        if md.cover_image is not None:
+            cover_idx = 0
+            for idx, f in enumerate(self.get_page_name_list()):
+                if md.cover_image == f:
+                    cover_idx = idx
+                    break
+            if cover_idx != 0:
+                del md.pages[0]["Type"]
+                md.pages[cover_idx]["Type"] = PageType.FrontCover
+        md.intern_strings()
+        return md
+
     def read_raw_comet(self):
         if not self.has_comet():
             logger.info("%s doesn't have CoMet data!", self.path)
@@ -1082,7 +1273,7 @@ class ComicArchive:
 
             # look at all xml files in root, and search for CoMet data, get first
             for n in self.archiver.get_filename_list():
-                if os.path.dirname(n) == "" and os.path.splitext(n)[1].lower() == ".xml":
+                if self.is_comet_candidate(n):
                     # read in XML file, and validate it
                     try:
                         data = self.archiver.read_file(n)
@@ -1098,33 +1289,102 @@ class ComicArchive:
 
         return self.has__comet
 
+    @staticmethod
+    def is_comet_candidate(name):
+        return os.path.dirname(name) == "" and os.path.splitext(name)[1].lower() == ".xml"
+
+    def load_all_metadata(self):
+        """Reads every tag style into the caches, with the archive opened once
+
+        The file list, the comment, ComicInfo.xml and the root XML files that
+        might be CoMet are all read in the same pass.  Does nothing when the
+        tags are cached already.
+        """
+        cached = [self.has__cix, self.has__cbi, self.has__comet, self.cix_md, self.cbi_md, self.comet_md]
+        if None not in cached:
+            return
+
+        namelist, comment, files = self.archiver.read_tag_files(
+            lambda name: name == self.ci_xml_filename or self.is_comet_candidate(name)
+        )
+        if self.image_name_list is None:
+            self.image_name_list = self.get_image_names(namelist)
+
+        self.has__cbi = False
+        self.has__cix = False
+        self.has__comet = False
+        if self.seems_to_be_a_comic_archive():
+            self.has__cbi = ComicBookInfo().validate_string(comment)
+            self.has__cix = self.ci_xml_filename in namelist
+            for n in namelist:
+                if self.is_comet_candidate(n) and CoMet().validate_string(files.get(n, "")):
+                    self.comet_filename = n
+                    self.has__comet = True
+                    break
+
+        if self.cbi_md is None:
+            self.cbi_md = self.cbi_from_raw(comment if self.has__cbi else None)
+        if self.cix_md is None:
+            self.cix_md = self.cix_from_raw(files.get(self.ci_xml_filename, "") if self.has__cix else None)
+        if self.comet_md is None:
+            self.comet_md = self.comet_from_raw(files.get(self.comet_filename, "") if self.has__comet else None)
+
+    def get_page_geometry(self, index_list):
+        """Returns {index: (size, width, height)} for the pages, width and height are None if the header isn't known
+
+        The sizes come from the start of each page, read in one pass over the archive.
+        """
+        names = {}
+        for idx in index_list:
+            name = self.get_page_name(idx)
+            if name is not None:
+                names[idx] = name
+
+        to_read = sorted({name for name in names.values() if name not in self.page_geometry})
+        if len(to_read) > 0:
+            for name, (size, header) in self.archiver.read_file_headers(to_read, imagesize.header_length).items():
+                w, h = imagesize.get_image_size(header) or (None, None)
+                self.page_geometry[name] = (size, w, h)
+
+        return {idx: self.page_geometry[name] for idx, name in names.items() if name in self.page_geometry}
+
     def apply_archive_info_to_metadata(self, md, calc_page_sizes=False):
         md.page_count = self.get_number_of_pages()
 
         if calc_page_sizes:
-            for p in md.pages:
-                idx = int(p["Image"])
-                if pil_available:
-                    if "ImageSize" not in p or "ImageHeight" not in p or "ImageWidth" not in p:
-                        data = self.get_page(idx)
-                        if data is not None:
-                            try:
-                                if isinstance(data, bytes):
-                                    im = Image.open(io.BytesIO(data))
-                                else:
-                                    im = Image.open(io.StringIO(data))
-                                w, h = im.size
-
-                                p["ImageSize"] = str(len(data))
-                                p["ImageHeight"] = str(h)
-                                p["ImageWidth"] = str(w)
-                            except Exception as e:
-                                logger.warning("decoding image failed: %s", e)
-                                p["ImageSize"] = str(len(data))
+            missing = [p for p in md.pages if "ImageSize" not in p or "ImageHeight" not in p or "ImageWidth" not in p]
+            geometry = self.get_page_geometry([int(p["Image"]) for p in missing])
 
-                else:
-                    if "ImageSize" not in p:
-                        data = self.get_page(idx)
+            for p in missing:
+                idx = int(p["Image"])
+                if idx in geometry:
+                    size, w, h = geometry[idx]
+                    p["ImageSize"] = str(size)
+                    if w is not None:
+                        p["ImageHeight"] = str(h)
+                        p["ImageWidth"] = str(w)
+                        continue
+
+                # a format the probe doesn't know, or a header it couldn't find
+                if pil_available and ("ImageHeight" not in p or "ImageWidth" not in p):
+                    data = self.get_page(idx)
+                    if data is not None:
+                        try:
+                            if isinstance(data, bytes):
+                                im = Image.open(io.BytesIO(data))
+                            else:
+                                im = Image.open(io.StringIO(data))
+                            w, h = im.size
+
+                            p["ImageSize"] = str(len(data))
+                            p["ImageHeight"] = str(h)
+                            p["ImageWidth"] = str(w)
+                        except Exception as e:
+                            logger.warning("decoding image failed: %s", e)
+                            p["ImageSize"] = str(len(data))
+                elif "ImageSize" not in p:
+                    data = self.get_page(idx)
+                    if data is not None:
                         p["ImageSize"] = str(len(data))
 
     def metadata_from_filename(self, parse_scan_info=True):
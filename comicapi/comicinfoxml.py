@@ -19,7 +19,7 @@ import xml.etree.ElementTree as ET
 
 from comicapi import utils
 from comicapi.genericmetadata import GenericMetadata
-from comicapi.issuestring import IssueString
+from comicapi.issuestring import normalize_issue
 
 logger = logging.getLogger(__name__)
 
@@ -34,6 +34,49 @@ class ComicInfoXml:
     cover_synonyms = ["cover", "covers", "coverartist", "cover artist"]
     editor_synonyms = ["editor"]
 
+    # the simple fields, by tag: the GenericMetadata attribute and whether it's a number
+    fields = {
+        "Series": ("series", False),
+        "Title": ("title", False),
+        "Number": ("issue", False),
+        "Count": ("issue_count", True),
+        "Volume": ("volume", True),
+        "AlternateSeries": ("alternate_series", False),
+        "AlternateNumber": ("alternate_number", False),
+        "AlternateCount": ("alternate_count", True),
+        "Summary": ("comments", False),
+        "Notes": ("notes", False),
+        "Year": ("year", True),
+        "Month": ("month", True),
+        "Day": ("day", True),
+        "Publisher": ("publisher", False),
+        "Imprint": ("imprint", False),
+        "Genre": ("genre", False),
+        "Web": ("web_link", False),
+        "LanguageISO": ("language", False),
+        "Format": ("format", False),
+        "Manga": ("manga", False),
+        "Characters": ("characters", False),
+        "Teams": ("teams", False),
+        "Locations": ("locations", False),
+        "PageCount": ("page_count", True),
+        "ScanInformation": ("scan_info", False),
+        "StoryArc": ("story_arc", False),
+        "SeriesGroup": ("series_group", False),
+        "AgeRating": ("maturity_rating", False),
+    }
+
+    # the credit tags, and the role each one is read as
+    credit_roles = {
+        "Writer": "Writer",
+        "Penciller": "Penciller",
+        "Inker": "Inker",
+        "Colorist": "Colorist",
+        "Letterer": "Letterer",
+        "Editor": "Editor",
+        "CoverArtist": "Cover",
+    }
+
     def get_parseable_credits(self):
         parsable_credits = []
         parsable_credits.extend(self.writer_synonyms)
@@ -67,17 +110,23 @@ class ComicInfoXml:
             root = ET.Element("ComicInfo")
             root.attrib["xmlns:xsi"] = "http://www.w3.org/2001/XMLSchema-instance"
             root.attrib["xmlns:xsd"] = "http://www.w3.org/2001/XMLSchema"
+
+        # the first element with each tag, elements we don't know about are left as they are
+        elements = {}
+        for child in root:
+            elements.setdefault(child.tag, child)
+
         # helper func
 
         def assign(cix_entry, md_entry):
+            et_entry = elements.get(cix_entry)
             if md_entry is not None and md_entry:
-                et_entry = root.find(cix_entry)
                 if et_entry is not None:
                     et_entry.text = str(md_entry)
                 else:
-                    ET.SubElement(root, cix_entry).text = str(md_entry)
+                    elements[cix_entry] = ET.SubElement(root, cix_entry)
+                    elements[cix_entry].text = str(md_entry)
             else:
-                et_entry = root.find(cix_entry)
                 if et_entry is not None:
                     et_entry.clear()
 
@@ -163,7 +212,7 @@ class ComicInfoXml:
         assign("ScanInformation", md.scan_info)
 
         #  loop and add the page entries under pages node
-        pages_node = root.find("Pages")
+        pages_node = elements.get("Pages")
         if pages_node is not None:
             pages_node.clear()
         else:
@@ -186,69 +235,33 @@ class ComicInfoXml:
         if root.tag != "ComicInfo":
             raise "1"
 
-        def get(name):
-            tag = root.find(name)
-            if tag is None:
-                return None
-            return tag.text
-
         md = GenericMetadata()
 
-        md.series = utils.xlate(get("Series"))
-        md.title = utils.xlate(get("Title"))
-        md.issue = IssueString(utils.xlate(get("Number"))).as_string()
-        md.issue_count = utils.xlate(get("Count"), True)
-        md.volume = utils.xlate(get("Volume"), True)
-        md.alternate_series = utils.xlate(get("AlternateSeries"))
-        md.alternate_number = IssueString(utils.xlate(get("AlternateNumber"))).as_string()
-        md.alternate_count = utils.xlate(get("AlternateCount"), True)
-        md.comments = utils.xlate(get("Summary"))
-        md.notes = utils.xlate(get("Notes"))
-        md.year = utils.xlate(get("Year"), True)
-        md.month = utils.xlate(get("Month"), True)
-        md.day = utils.xlate(get("Day"), True)
-        md.publisher = utils.xlate(get("Publisher"))
-        md.imprint = utils.xlate(get("Imprint"))
-        md.genre = utils.xlate(get("Genre"))
-        md.web_link = utils.xlate(get("Web"))
-        md.language = utils.xlate(get("LanguageISO"))
-        md.format = utils.xlate(get("Format"))
-        md.manga = utils.xlate(get("Manga"))
-        md.characters = utils.xlate(get("Characters"))
-        md.teams = utils.xlate(get("Teams"))
-        md.locations = utils.xlate(get("Locations"))
-        md.page_count = utils.xlate(get("PageCount"), True)
-        md.scan_info = utils.xlate(get("ScanInformation"))
-        md.story_arc = utils.xlate(get("StoryArc"))
-        md.series_group = utils.xlate(get("SeriesGroup"))
-        md.maturity_rating = utils.xlate(get("AgeRating"))
-
-        tmp = utils.xlate(get("BlackAndWhite"))
-        if tmp is not None and tmp.lower() in ["yes", "true", "1"]:
-            md.black_and_white = True
-        # Now extract the credit info
+        # one pass over the elements, the first of each simple field is the one used
+        values = {}
+        pages_node = None
         for n in root:
-            if any(
-                [
-                    n.tag == "Writer",
-                    n.tag == "Penciller",
-                    n.tag == "Inker",
-                    n.tag == "Colorist",
-                    n.tag == "Letterer",
-                    n.tag == "Editor",
-                ]
-            ):
+            if n.tag in self.fields:
+                values.setdefault(n.tag, n.text)
+            elif n.tag in self.credit_roles:
                 if n.text is not None:
                     for name in n.text.split(","):
-                        md.add_credit(name.strip(), n.tag)
-
-            if n.tag == "CoverArtist":
-                if n.text is not None:
-                    for name in n.text.split(","):
-                        md.add_credit(name.strip(), "Cover")
+                        md.add_credit(name.strip(), self.credit_roles[n.tag])
+            elif n.tag == "BlackAndWhite":
+                values.setdefault(n.tag, n.text)
+            elif n.tag == "Pages" and pages_node is None:
+                pages_node = n
+
+        for tag, (attribute, is_int) in self.fields.items():
+            setattr(md, attribute, utils.xlate(values.get(tag), is_int))
+        md.issue = normalize_issue(md.issue)
+        md.alternate_number = normalize_issue(md.alternate_number)
+
+        tmp = utils.xlate(values.get("BlackAndWhite"))
+        if tmp is not None and tmp.lower() in ["yes", "true", "1"]:
+            md.black_and_white = True
 
         # parse page data now
-        pages_node = root.find("Pages")
         if pages_node is not None:
             for page in pages_node:
                 md.pages.append(page.attrib)
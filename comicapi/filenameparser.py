@@ -29,6 +29,26 @@ logger = logging.getLogger(__name__)
 
 
 class FileNameParser:
+    # the patterns are compiled once, a batch of names runs each of them many times
+    double_dash_tail = re.compile(r"--.*")
+    double_underscore_tail = re.compile(r"__.*")
+    bracketed_underscores = re.compile(r"\[__\d+__\]")
+    parenthetical = re.compile(r"\(.*?\)")
+    bracketed = re.compile(r"\[.*?]")
+    of_count = re.compile(r"of [\d]+")
+    word = re.compile(r"\S+")
+    hash_number = re.compile(r"#[-]?(([0-9]*\.[0-9]+|[0-9]+)(\w*))")
+    number = re.compile(r"[-]?(([0-9]*\.[0-9]+|[0-9]+)(\w*))")
+    hash_anything = re.compile(r"#\S+")
+    count_after_of = re.compile(r"(?<=\sof\s)\d+(?=\s)", re.IGNORECASE)
+    count_in_parens = re.compile(r"(?<=\(of\s)\d+(?=\))", re.IGNORECASE)
+    volume_suffix = re.compile(r"(.+)([vV]|[Vv][oO][Ll]\.?\s?)(\d+)\s*$")
+    year_in_parens = re.compile(r"(\()(\d{4})(-(\d{4}|)|)(\))")
+    year_marker = re.compile(r"(\(\d\d\d\d\))|(--\d\d\d\d--)")
+    non_digits = re.compile(r"[^0-9]")
+
+    separators = str.maketrans("-_", "  ")
+
     def __init__(self):
         self.series = ""
         self.volume = ""
@@ -41,13 +61,10 @@ class FileNameParser:
         return " " * len(m.group())
 
     def fix_spaces(self, string, remove_dashes=True):
+        # each separator becomes one space, so the words stay where they were
         if remove_dashes:
-            placeholders = [r"[-_]", r"  +"]
-        else:
-            placeholders = [r"[_]", r"  +"]
-        for ph in placeholders:
-            string = re.sub(ph, self.repl, string)
-        return string  # .strip()
+            return string.translate(self.separators)
+        return string.replace("_", " ")
 
     def get_issue_count(self, filename, issue_end):
 
@@ -58,13 +75,13 @@ class FileNameParser:
         tmpstr = self.fix_spaces(filename)
         found = False
 
-        match = re.search(r"(?<=\sof\s)\d+(?=\s)", tmpstr, re.IGNORECASE)
+        match = self.count_after_of.search(tmpstr)
         if match:
             count = match.group()
             found = True
 
         if not found:
-            match = re.search(r"(?<=\(of\s)\d+(?=\))", tmpstr, re.IGNORECASE)
+            match = self.count_in_parens.search(tmpstr)
             if match:
                 count = match.group()
 
@@ -87,25 +104,28 @@ class FileNameParser:
         if "--" in filename:
             # the pattern seems to be that anything to left of the first "--"
             # is the series name followed by issue
-            filename = re.sub(r"--.*", self.repl, filename)
+            filename = self.double_dash_tail.sub(self.repl, filename)
 
-        elif "__" in filename and not re.search(r"\[__\d+__\]", filename):
+        elif "__" in filename and not self.bracketed_underscores.search(filename):
             # the pattern seems to be that anything to left of the first "__"
             # is the series name followed by issue
-            filename = re.sub(r"__.*", self.repl, filename)
+            filename = self.double_underscore_tail.sub(self.repl, filename)
 
         filename = filename.replace("+", " ")
 
         # replace parenthetical phrases with spaces
-        filename = re.sub(r"\(.*?\)", self.repl, filename)
-        filename = re.sub(r"\[.*?]", self.repl, filename)
+        if "(" in filename:
+            filename = self.parenthetical.sub(self.repl, filename)
+        if "[" in filename:
+            filename = self.bracketed.sub(self.repl, filename)
 
         # replace any name separators with spaces
         filename = self.fix_spaces(filename)
 
         # remove any "of NN" phrase with spaces (problem: this could break on
         # some titles)
-        filename = re.sub(r"of [\d]+", self.repl, filename)
+        if "of " in filename:
+            filename = self.of_count.sub(self.repl, filename)
 
         # print u"[{0}]".format(filename)
 
@@ -113,9 +133,7 @@ class FileNameParser:
         # the same positions as original filename
 
         # make a list of each word and its position
-        word_list = []
-        for m in re.finditer(r"\S+", filename):
-            word_list.append((m.group(0), m.start(), m.end()))
+        word_list = [(m.group(0), m.start(), m.end()) for m in self.word.finditer(filename)]
 
         # remove the first word, since it can't be the issue number
         if len(word_list) > 1:
@@ -129,7 +147,7 @@ class FileNameParser:
         # first look for a word with "#" followed by digits with optional suffix
         # this is almost certainly the issue number
         for w in reversed(word_list):
-            if re.match(r"#[-]?(([0-9]*\.[0-9]+|[0-9]+)(\w*))", w[0]):
+            if self.hash_number.match(w[0]):
                 found = True
                 break
 
@@ -137,13 +155,13 @@ class FileNameParser:
         # list
         if not found:
             w = word_list[-1]
-            if re.match(r"[-]?(([0-9]*\.[0-9]+|[0-9]+)(\w*))", w[0]):
+            if self.number.match(w[0]):
                 found = True
 
         # now try to look for a # followed by any characters
         if not found:
             for w in reversed(word_list):
-                if re.match(r"#\S+", w[0]):
+                if self.hash_anything.match(w[0]):
                     found = True
                     break
 
@@ -166,12 +184,12 @@ class FileNameParser:
         if "--" in filename:
             # the pattern seems to be that anything to left of the first "--"
             # is the series name followed by issue
-            filename = re.sub(r"--.*", self.repl, filename)
+            filename = self.double_dash_tail.sub(self.repl, filename)
 
         elif "__" in filename:
             # the pattern seems to be that anything to left of the first "__"
             # is the series name followed by issue
-            filename = re.sub(r"__.*", self.repl, filename)
+            filename = self.double_underscore_tail.sub(self.repl, filename)
 
         filename = filename.replace("+", " ")
         tmpstr = self.fix_spaces(filename, remove_dashes=False)
@@ -186,10 +204,10 @@ class FileNameParser:
             last_word = ""
 
         # remove any parenthetical phrases
-        series = re.sub(r"\(.*?\)", "", series)
+        series = self.parenthetical.sub("", series)
 
         # search for volume number
-        match = re.search(r"(.+)([vV]|[Vv][oO][Ll]\.?\s?)(\d+)\s*$", series)
+        match = self.volume_suffix.search(series)
         if match:
             series = match.group(1)
             volume = match.group(3)
@@ -198,7 +216,7 @@ class FileNameParser:
         # since that's a common way to designate the volume
         if volume == "":
             # match either (YEAR), (YEAR-), or (YEAR-YEAR2)
-            match = re.search(r"(\()(\d{4})(-(\d{4}|)|)(\))", last_word)
+            match = self.year_in_parens.search(last_word)
             if match:
                 volume = match.group(2)
 
@@ -224,11 +242,11 @@ class FileNameParser:
 
         year = ""
         # look for four digit number with "(" ")" or "--" around it
-        match = re.search(r"(\(\d\d\d\d\))|(--\d\d\d\d--)", filename)
+        match = self.year_marker.search(filename)
         if match:
             year = match.group()
             # remove non-digits
-            year = re.sub(r"[^0-9]", "", year)
+            year = self.non_digits.sub("", year)
         return year
 
     def get_remainder(self, filename, year, count, volume, issue_end):
@@ -292,3 +310,13 @@ class FileNameParser:
                 self.issue = "0"
             if self.issue[0] == ".":
                 self.issue = "0" + self.issue
+
+    @classmethod
+    def parse_many(cls, paths):
+        """Parses a batch of paths, returns a parser for each, in the same order"""
+        parsers = []
+        for path in paths:
+            fnp = cls()
+            fnp.parse_filename(path)
+            parsers.append(fnp)
+        return parsers
@@ -21,6 +21,7 @@ possible, however lossy it might be
 # limitations under the License.
 
 import logging
+import sys
 from typing import List, TypedDict
 
 from comicapi import utils
@@ -71,6 +72,97 @@ class GenericMetadata:
     cover_synonyms = ["cover", "covers", "coverartist", "cover artist"]
     editor_synonyms = ["editor"]
 
+    # no per-object __dict__, a batch can hold the metadata of many thousands of files
+    __slots__ = (
+        "is_empty",
+        "tag_origin",
+        "series",
+        "issue",
+        "title",
+        "publisher",
+        "month",
+        "year",
+        "day",
+        "issue_count",
+        "volume",
+        "genre",
+        "language",
+        "comments",
+        "volume_count",
+        "critical_rating",
+        "country",
+        "alternate_series",
+        "alternate_number",
+        "alternate_count",
+        "imprint",
+        "notes",
+        "web_link",
+        "format",
+        "manga",
+        "black_and_white",
+        "page_count",
+        "maturity_rating",
+        "story_arc",
+        "series_group",
+        "scan_info",
+        "characters",
+        "teams",
+        "locations",
+        "credits",
+        "tags",
+        "pages",
+        "price",
+        "is_version_of",
+        "rights",
+        "identifier",
+        "last_mark",
+        "cover_image",
+    )
+
+    # the fields overlay copies when they're set in the new metadata
+    overlay_fields = (
+        "series",
+        "issue",
+        "issue_count",
+        "title",
+        "publisher",
+        "day",
+        "month",
+        "year",
+        "volume",
+        "volume_count",
+        "genre",
+        "language",
+        "country",
+        "critical_rating",
+        "alternate_series",
+        "alternate_number",
+        "alternate_count",
+        "imprint",
+        "web_link",
+        "format",
+        "manga",
+        "black_and_white",
+        "maturity_rating",
+        "story_arc",
+        "series_group",
+        "scan_info",
+        "characters",
+        "teams",
+        "locations",
+        "comments",
+        "notes",
+        "price",
+        "is_version_of",
+        "rights",
+        "identifier",
+        "last_mark",
+    )
+
+    # fields and page entries that repeat from file to file, one copy of each value is shared
+    interned_fields = ("series", "publisher", "imprint", "genre", "language", "country", "format", "manga")
+    interned_page_keys = ("Image", "Type", "ImageHeight", "ImageWidth")
+
     def __init__(self):
 
         self.is_empty = True
@@ -132,54 +224,17 @@ class GenericMetadata:
         to this one.
         """
 
-        def assign(cur, new):
-            if new is not None:
-                if isinstance(new, str) and len(new) == 0:
-                    setattr(self, cur, None)
-                else:
-                    setattr(self, cur, new)
-
         new_md: GenericMetadata
         if not new_md.is_empty:
             self.is_empty = False
 
-        assign("series", new_md.series)
-        assign("issue", new_md.issue)
-        assign("issue_count", new_md.issue_count)
-        assign("title", new_md.title)
-        assign("publisher", new_md.publisher)
-        assign("day", new_md.day)
-        assign("month", new_md.month)
-        assign("year", new_md.year)
-        assign("volume", new_md.volume)
-        assign("volume_count", new_md.volume_count)
-        assign("genre", new_md.genre)
-        assign("language", new_md.language)
-        assign("country", new_md.country)
-        assign("critical_rating", new_md.critical_rating)
-        assign("alternate_series", new_md.alternate_series)
-        assign("alternate_number", new_md.alternate_number)
-        assign("alternate_count", new_md.alternate_count)
-        assign("imprint", new_md.imprint)
-        assign("web_link", new_md.web_link)
-        assign("format", new_md.format)
-        assign("manga", new_md.manga)
-        assign("black_and_white", new_md.black_and_white)
-        assign("maturity_rating", new_md.maturity_rating)
-        assign("story_arc", new_md.story_arc)
-        assign("series_group", new_md.series_group)
-        assign("scan_info", new_md.scan_info)
-        assign("characters", new_md.characters)
-        assign("teams", new_md.teams)
-        assign("locations", new_md.locations)
-        assign("comments", new_md.comments)
-        assign("notes", new_md.notes)
-
-        assign("price", new_md.price)
-        assign("is_version_of", new_md.is_version_of)
-        assign("rights", new_md.rights)
-        assign("identifier", new_md.identifier)
-        assign("last_mark", new_md.last_mark)
+        for name in GenericMetadata.overlay_fields:
+            new = getattr(new_md, name)
+            if new is not None:
+                if isinstance(new, str) and len(new) == 0:
+                    setattr(self, name, None)
+                else:
+                    setattr(self, name, new)
 
         self.overlay_credits(new_md.credits)
         # TODO
@@ -190,23 +245,49 @@ class GenericMetadata:
         # For now, go the easy route, where any overlay
         # value wipes out the whole list
         if len(new_md.tags) > 0:
-            assign("tags", new_md.tags)
+            self.tags = new_md.tags
 
         if len(new_md.pages) > 0:
-            assign("pages", new_md.pages)
+            self.pages = new_md.pages
 
     def overlay_credits(self, new_credits):
+        # index the credits by person and role, instead of searching the list for each new one
+        index = {}
+        for c in self.credits:
+            index.setdefault((c["person"].lower(), c["role"].lower()), c)
+
         for c in new_credits:
             primary = bool("primary" in c and c["primary"])
+            role = c["role"].lower()
 
             # Remove credit role if person is blank
             if c["person"] == "":
-                for r in reversed(self.credits):
-                    if r["role"].lower() == c["role"].lower():
-                        self.credits.remove(r)
+                self.credits[:] = [r for r in self.credits if r["role"].lower() != role]
+                index = {key: r for key, r in index.items() if key[1] != role}
             # otherwise, add it!
             else:
-                self.add_credit(c["person"], c["role"], primary)
+                key = (c["person"].lower(), role)
+                if key in index:
+                    # no need to add it. just adjust the "primary" flag as needed
+                    index[key]["primary"] = primary
+                else:
+                    credit = {"person": c["person"], "role": c["role"]}
+                    if primary:
+                        credit["primary"] = primary
+                    self.credits.append(credit)
+                    index[key] = credit
+
+    def intern_strings(self):
+        """Shares one copy of the values that repeat between files, for metadata that's kept around"""
+        for name in GenericMetadata.interned_fields:
+            value = getattr(self, name)
+            if type(value) is str:
+                setattr(self, name, sys.intern(value))
+        for p in self.pages:
+            for key in GenericMetadata.interned_page_keys:
+                value = p.get(key)
+                if type(value) is str:
+                    p[key] = sys.intern(value)
 
     def set_default_page_list(self, count):
         # generate a default page list, with the first page marked as the cover
@@ -19,7 +19,7 @@ comics industry throws at us.
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-
+import functools
 import logging
 
 logger = logging.getLogger(__name__)
@@ -125,3 +125,14 @@ class IssueString:
         if self.num is None:
             return None
         return int(self.num)
+
+
+@functools.lru_cache(maxsize=4096)
+def normalize_issue(text):
+    """IssueString(text).as_string(), remembered since the same issue numbers are normalized over and over"""
+    return IssueString(text).as_string()
+
+
+def issue_key(text):
+    """The form of an issue number used to compare it with others"""
+    return normalize_issue(text).lower()
@@ -15,6 +15,7 @@
 # limitations under the License.
 
 import codecs
+import functools
 import locale
 import logging
 import os
@@ -24,8 +25,6 @@ import sys
 import unicodedata
 from collections import defaultdict
 
-import pycountry
-
 logger = logging.getLogger(__name__)
 
 
@@ -147,9 +146,8 @@ def xlate(data, is_int=False):
     return str(data)
 
 
-def remove_articles(text):
-    text = text.lower()
-    articles = [
+articles = frozenset(
+    [
         "&",
         "a",
         "am",
@@ -172,17 +170,15 @@ def remove_articles(text):
         "or",
         "so",
         "the",
-        "the",
         "with",
     ]
-    new_text = ""
-    for word in text.split(" "):
-        if word not in articles:
-            new_text += word + " "
+)
 
-    new_text = new_text[:-1]
+non_alphanumeric = re.compile(r"[^A-Za-z0-9]+")
 
-    return new_text
+
+def remove_articles(text):
+    return " ".join(word for word in text.lower().split(" ") if word not in articles)
 
 
 def sanitize_title(text):
@@ -193,7 +189,7 @@ def sanitize_title(text):
     text = text.replace("'", "")
     text = text.replace('"', "")
     # comicvine ignores punctuation and accents
-    text = re.sub(r"[^A-Za-z0-9]+", " ", text)
+    text = non_alphanumeric.sub(" ", text)
     # remove extra space and articles and all lower case
     text = remove_articles(text).lower().strip()
 
@@ -210,21 +206,41 @@ def unique_file(file_name):
         counter += 1
 
 
-languages = defaultdict(lambda: None)
+@functools.lru_cache(maxsize=None)
+def get_countries():
+    """Returns the country names by ISO 3166 alpha-2 code, read from pycountry on first use"""
+    import pycountry
 
-countries = defaultdict(lambda: None)
+    countries = defaultdict(lambda: None)
+    for c in pycountry.countries:
+        if "alpha_2" in c._fields:
+            countries[c.alpha_2] = c.name
+    return countries
 
-for c in pycountry.countries:
-    if "alpha_2" in c._fields:
-        countries[c.alpha_2] = c.name
 
-for lng in pycountry.languages:
-    if "alpha_2" in lng._fields:
-        languages[lng.alpha_2] = lng.name
+@functools.lru_cache(maxsize=None)
+def get_languages():
+    """Returns the language names by ISO 639-1 code, read from pycountry on first use"""
+    import pycountry
+
+    languages = defaultdict(lambda: None)
+    for lng in pycountry.languages:
+        if "alpha_2" in lng._fields:
+            languages[lng.alpha_2] = lng.name
+    return languages
+
+
+def __getattr__(name):
+    # utils.countries and utils.languages used to be built at import time
+    if name == "countries":
+        return get_countries()
+    if name == "languages":
+        return get_languages()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 def get_language_from_iso(iso: str):
-    return languages[iso]
+    return get_languages()[iso]
 
 
 def get_language(string):
@@ -235,6 +251,8 @@ def get_language(string):
 
     if lang is None:
         try:
+            import pycountry
+
             return pycountry.languages.lookup(string).name
         except:
             return None
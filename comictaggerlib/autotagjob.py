@@ -0,0 +1,252 @@
+"""A thread to auto-tag a list of archives, several at a time"""
+
+# Copyright 2012-2014 Anthony Beville
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#     http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import logging
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import List
+
+from PyQt5 import QtCore
+
+from comicapi.comicarchive import ComicArchive, MetaDataStyle
+from comictaggerlib.autotagstartwindow import AutoTagStartWindow
+from comictaggerlib.cbltransformer import CBLTransformer
+from comictaggerlib.comicvinetalker import ComicVineTalker, ComicVineTalkerException
+from comictaggerlib.issueidentifier import IssueIdentifier
+from comictaggerlib.resulttypes import IssueResult, MultipleMatch, OnlineMatchResults
+
+logger = logging.getLogger(__name__)
+
+
+class AutoTagJob(QtCore.QThread):
+    """Identifies and tags archives on a worker pool, reporting to the GUI through signals
+
+    With more than one archive at a time, each archive's log is sent as one
+    block when it's done, so the logs of different archives don't mix.
+    """
+
+    logMessage = QtCore.pyqtSignal(str)
+    archiveStarted = QtCore.pyqtSignal(str, bytes)
+    testImageFetched = QtCore.pyqtSignal(bytes)
+    progressUpdate = QtCore.pyqtSignal(int)
+
+    def __init__(self, ca_list: List[ComicArchive], settings, style, dlg: AutoTagStartWindow):
+        super().__init__()
+        self.ca_list = ca_list
+        self.settings = settings
+        self.style = style
+        self.dlg = dlg
+        self.concurrency = max(dlg.concurrency, 1)
+
+        self.match_results = OnlineMatchResults()
+        self.archives_to_remove = []
+        self.finished_count = 0
+        self.lock = threading.Lock()
+
+        self.canceled = False
+        # cleared while paused
+        self.running = threading.Event()
+        self.running.set()
+        self.identifiers = set()
+
+    def pause(self):
+        self.running.clear()
+
+    def resume(self):
+        self.running.set()
+
+    def is_paused(self):
+        return not self.running.is_set()
+
+    def cancel(self):
+        self.canceled = True
+        with self.lock:
+            for ii in self.identifiers:
+                ii.cancel = True
+        # let paused workers see the cancel
+        self.running.set()
+
+    def run(self):
+        self.logMessage.emit("==========================================================================")
+        self.logMessage.emit(f"Auto-Tagging Started for {len(self.ca_list)} items")
+
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            futures = [executor.submit(self.tag_archive, ca) for ca in self.ca_list]
+            for future in futures:
+                try:
+                    future.result()
+                except Exception:
+                    logger.exception("Auto-tagging failed")
+
+    def tag_archive(self, ca: ComicArchive):
+        # paused jobs stop between archives
+        self.running.wait()
+        if self.canceled:
+            return
+
+        log_lines = []
+
+        def log(text):
+            if self.concurrency == 1:
+                IssueIdentifier.default_write_output(text)
+                self.logMessage.emit(text.rstrip())
+            else:
+                log_lines.append(text)
+
+        # an archive that fails still counts towards the progress, run logs the error
+        try:
+            log("==========================================================================\n")
+            log(f"{ca.path}\n")
+            cover_idx = ca.read_metadata(self.style).get_cover_page_index_list()[0]
+            self.archiveStarted.emit(ca.path, ca.get_page(cover_idx) or bytes())
+
+            if ca.is_writable():
+                success = self.identify_and_tag_single_archive(ca, log)
+
+                if success and self.dlg.remove_after_success:
+                    with self.lock:
+                        self.archives_to_remove.append(ca)
+        finally:
+            if len(log_lines) > 0:
+                IssueIdentifier.default_write_output("".join(log_lines))
+                self.logMessage.emit("\n".join(line.rstrip() for line in log_lines))
+            with self.lock:
+                self.finished_count += 1
+                self.progressUpdate.emit(self.finished_count)
+
+    def fetch_issue_data(self, match):
+        cv_md = None
+        try:
+            comic_vine = ComicVineTalker()
+            comic_vine.wait_for_rate_limit = self.settings.wait_and_retry_on_rate_limit
+            cv_md = comic_vine.fetch_issue_data(match["volume_id"], match["issue_number"], self.settings)
+        except ComicVineTalkerException:
+            logger.exception("Network error while getting issue details. Save aborted")
+
+        if cv_md is not None:
+            if self.settings.apply_cbl_transform_on_cv_import:
+                cv_md = CBLTransformer(cv_md, self.settings).apply()
+
+        return cv_md
+
+    def add_result(self, result_list, item):
+        with self.lock:
+            result_list.append(item)
+
+    def identify_and_tag_single_archive(self, ca: ComicArchive, log):
+        dlg = self.dlg
+        match_results = self.match_results
+        success = False
+        ii = IssueIdentifier(ca, self.settings)
+
+        # read in metadata, and parse file name if not there
+        md = ca.read_metadata(self.style)
+        if md.is_empty:
+            md = ca.metadata_from_filename(self.settings.parse_scan_info)
+            if dlg.ignore_leading_digits_in_filename and md.series is not None:
+                # remove all leading numbers
+                md.series = re.sub(r"([\d.]*)(.*)", "\\2", md.series)
+
+        # use the dialog specified search string
+        if dlg.search_string is not None:
+            md.series = dlg.search_string
+
+        if md is None or md.is_empty:
+            logger.error("No metadata given to search online with!")
+            return False
+
+        if dlg.dont_use_year:
+            md.year = None
+        if dlg.assume_issue_one and (md.issue is None or md.issue == ""):
+            md.issue = "1"
+        ii.set_additional_metadata(md)
+        ii.only_use_additional_meta_data = True
+        ii.wait_and_retry_on_rate_limit = dlg.wait_and_retry_on_rate_limit
+        ii.set_output_function(log)
+        ii.cover_page_index = md.get_cover_page_index_list()[0]
+        ii.set_cover_url_callback(lambda image_data: self.testImageFetched.emit(image_data or bytes()))
+        ii.set_name_length_delta_threshold(dlg.name_length_match_tolerance)
+
+        with self.lock:
+            self.identifiers.add(ii)
+            ii.cancel = self.canceled
+        try:
+            matches: List[IssueResult] = ii.search()
+        finally:
+            with self.lock:
+                self.identifiers.discard(ii)
+
+        if self.canceled:
+            return False
+
+        result = ii.search_result
+
+        found_match = False
+        choices = False
+        low_confidence = False
+
+        if result == ii.result_no_matches:
+            pass
+        elif result == ii.result_found_match_but_bad_cover_score:
+            low_confidence = True
+            found_match = True
+        elif result == ii.result_found_match_but_not_first_page:
+            found_match = True
+        elif result == ii.result_multiple_matches_with_bad_image_scores:
+            low_confidence = True
+            choices = True
+        elif result == ii.result_one_good_match:
+            found_match = True
+        elif result == ii.result_multiple_good_matches:
+            choices = True
+
+        if choices:
+            if low_confidence:
+                log("Online search: Multiple low-confidence matches.  Save aborted\n")
+                self.add_result(match_results.low_confidence_matches, MultipleMatch(ca, matches))
+            else:
+                log("Online search: Multiple matches.  Save aborted\n")
+                self.add_result(match_results.multiple_matches, MultipleMatch(ca, matches))
+        elif low_confidence and not dlg.auto_save_on_low:
+            log("Online search: Low confidence match.  Save aborted\n")
+            self.add_result(match_results.low_confidence_matches, MultipleMatch(ca, matches))
+        elif not found_match:
+            log("Online search: No match found.  Save aborted\n")
+            self.add_result(match_results.no_matches, ca.path)
+        else:
+            # a single match!
+            if low_confidence:
+                log("Online search: Low confidence match, but saving anyways, as indicated...\n")
+
+            # now get the particular issue data
+            cv_md = self.fetch_issue_data(matches[0])
+            if cv_md is None:
+                self.add_result(match_results.fetch_data_failures, ca.path)
+
+            if cv_md is not None:
+                md.overlay(cv_md)
+
+                if not ca.write_metadata(md, self.style):
+                    self.add_result(match_results.write_failures, ca.path)
+                    log("Save failed ;-(\n")
+                else:
+                    self.add_result(match_results.good_matches, ca.path)
+                    success = True
+                    log("Save complete!\n")
+                ca.load_cache([MetaDataStyle.CBI, MetaDataStyle.CIX])
+
+        return success
@@ -43,6 +43,11 @@ class AutoTagProgressWindow(QtWidgets.QDialog):
         gridlayout.setContentsMargins(0, 0, 0, 0)
 
         self.isdone = False
+        self.job = None
+
+        self.btnPause = self.buttonBox.addButton("Pause", QtWidgets.QDialogButtonBox.ButtonRole.ActionRole)
+        self.btnPause.setEnabled(False)
+        self.btnPause.clicked.connect(self.toggle_pause)
 
         self.setWindowFlags(
             QtCore.Qt.WindowType(
@@ -54,6 +59,41 @@ class AutoTagProgressWindow(QtWidgets.QDialog):
 
         reduce_widget_font_size(self.textEdit)
 
+    def set_job(self, job):
+        """Shows the progress of an AutoTagJob, and lets the buttons pause and cancel it"""
+        self.job = job
+        self.progressBar.setMaximum(len(job.ca_list))
+        self.btnPause.setEnabled(True)
+
+        job.logMessage.connect(self.log)
+        job.archiveStarted.connect(self.archive_started)
+        job.testImageFetched.connect(self.set_test_image)
+        job.progressUpdate.connect(self.progressBar.setValue)
+        job.finished.connect(self.job_finished)
+
+    def log(self, text):
+        self.textEdit.append(text)
+        self.textEdit.ensureCursorVisible()
+
+    def archive_started(self, path, img_data):
+        self.label.setText(path)
+        self.set_archive_image(img_data)
+        self.set_test_image(None)
+
+    def toggle_pause(self):
+        if self.job is None:
+            return
+        if self.job.is_paused():
+            self.job.resume()
+            self.btnPause.setText("Pause")
+        else:
+            # archives being identified right now are finished first
+            self.job.pause()
+            self.btnPause.setText("Resume")
+
+    def job_finished(self):
+        self.btnPause.setEnabled(False)
+
     def set_archive_image(self, img_data):
         self.set_cover_image(img_data, self.archiveCoverWidget)
 
@@ -61,10 +101,10 @@ class AutoTagProgressWindow(QtWidgets.QDialog):
         self.set_cover_image(img_data, self.testCoverWidget)
 
     def set_cover_image(self, img_data, widget):
-        widget.set_image_data(img_data)
-        QtCore.QCoreApplication.processEvents()
-        QtCore.QCoreApplication.processEvents()
+        widget.set_image_data(img_data or None)
 
     def reject(self):
         QtWidgets.QDialog.reject(self)
         self.isdone = True
+        if self.job is not None:
+            self.job.cancel()
@@ -44,6 +44,7 @@ class AutoTagStartWindow(QtWidgets.QDialog):
         self.cbxRemoveAfterSuccess.setCheckState(QtCore.Qt.CheckState.Unchecked)
         self.cbxSpecifySearchString.setCheckState(QtCore.Qt.CheckState.Unchecked)
         self.leNameLengthMatchTolerance.setText(str(self.settings.id_length_delta_thresh))
+        self.sbConcurrency.setValue(self.settings.auto_tag_concurrency)
         self.leSearchString.setEnabled(False)
 
         if self.settings.save_on_low_confidence:
@@ -67,6 +68,10 @@ class AutoTagStartWindow(QtWidgets.QDialog):
 
         self.leNameLengthMatchTolerance.setToolTip(nlmt_tip)
 
+        self.sbConcurrency.setToolTip(
+            "How many archives to identify and tag at the same time.  Comic Vine requests are still rate limited."
+        )
+
         ss_tip = """<html>
             The <b>series search string</b> specifies the search string to be used for all selected archives.
             Use this when trying to match archives with hard-to-parse or incorrect filenames.  All archives selected
@@ -88,6 +93,7 @@ class AutoTagStartWindow(QtWidgets.QDialog):
         self.wait_and_retry_on_rate_limit = False
         self.search_string = None
         self.name_length_match_tolerance = self.settings.id_length_delta_thresh
+        self.concurrency = self.settings.auto_tag_concurrency
 
     def search_string_toggle(self):
         enable = self.cbxSpecifySearchString.isChecked()
@@ -103,6 +109,7 @@ class AutoTagStartWindow(QtWidgets.QDialog):
         self.remove_after_success = self.cbxRemoveAfterSuccess.isChecked()
         self.name_length_match_tolerance = int(self.leNameLengthMatchTolerance.text())
         self.wait_and_retry_on_rate_limit = self.cbxWaitForRateLimit.isChecked()
+        self.concurrency = self.sbConcurrency.value()
 
         # persist some settings
         self.settings.save_on_low_confidence = self.auto_save_on_low
@@ -111,6 +118,7 @@ class AutoTagStartWindow(QtWidgets.QDialog):
         self.settings.ignore_leading_numbers_in_filename = self.ignore_leading_digits_in_filename
         self.settings.remove_archive_after_successful_match = self.remove_after_success
         self.settings.wait_and_retry_on_rate_limit = self.wait_and_retry_on_rate_limit
+        self.settings.auto_tag_concurrency = self.concurrency
 
         if self.cbxSpecifySearchString.isChecked():
             self.search_string = str(self.leSearchString.text())
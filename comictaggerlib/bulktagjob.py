@@ -0,0 +1,106 @@
+"""A thread to copy or remove the tags of many archives at once"""
+
+# Copyright 2012-2014 Anthony Beville
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#     http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import logging
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import List
+
+from PyQt5 import QtCore
+
+from comicapi.comicarchive import ComicArchive, MetaDataStyle
+from comictaggerlib.cbltransformer import CBLTransformer
+
+logger = logging.getLogger(__name__)
+
+
+class BulkTagJob(QtCore.QThread):
+    """Copies or removes tags on a worker pool
+
+    Each archive is rewritten by its own worker, the compression that makes
+    up most of a rewrite doesn't hold the GIL.  results has one
+    (archive, status) entry per archive, in the order they were given.
+    """
+
+    progressUpdate = QtCore.pyqtSignal(int, str)
+
+    Remove = 0
+    Copy = 1
+
+    Success = "Success"
+    Failed = "Failed"
+    ReadOnly = "Skipped, read-only"
+    Canceled = "Canceled"
+
+    max_workers = 4
+
+    def __init__(self, ca_list: List[ComicArchive], action, src_style, dest_style, settings):
+        super().__init__()
+        self.ca_list = ca_list
+        self.action = action
+        self.src_style = src_style
+        self.dest_style = dest_style
+        self.settings = settings
+        self.results = []
+        self.canceled = False
+
+    def cancel(self):
+        self.canceled = True
+
+    def get_archives_with_status(self, status):
+        return [ca for ca, ca_status in self.results if ca_status == status]
+
+    def run(self):
+        status_list = [BulkTagJob.Canceled] * len(self.ca_list)
+        with ThreadPoolExecutor(max_workers=BulkTagJob.max_workers) as executor:
+            futures = {executor.submit(self.process_archive, ca): i for i, ca in enumerate(self.ca_list)}
+            pending_canceled = False
+            for count, future in enumerate(as_completed(futures)):
+                i = futures[future]
+                # only the archives that never started stay Canceled
+                if future.cancelled():
+                    continue
+                try:
+                    status_list[i] = future.result()
+                except Exception:
+                    logger.exception("Failed to update the tags of %s", self.ca_list[i].path)
+                    status_list[i] = BulkTagJob.Failed
+
+                if not self.canceled:
+                    self.progressUpdate.emit(count + 1, self.ca_list[i].path)
+                elif not pending_canceled:
+                    # the archives already being rewritten finish, their results are still collected
+                    for f in futures:
+                        f.cancel()
+                    pending_canceled = True
+
+        self.results = list(zip(self.ca_list, status_list))
+
+    def process_archive(self, ca: ComicArchive):
+        if self.canceled:
+            return BulkTagJob.Canceled
+        if not ca.is_writable():
+            return BulkTagJob.ReadOnly
+
+        if self.action == BulkTagJob.Copy:
+            md = ca.read_metadata(self.src_style)
+            if self.dest_style == MetaDataStyle.CBI and self.settings.apply_cbl_transform_on_bulk_operation:
+                md = CBLTransformer(md, self.settings).apply()
+            success = ca.write_metadata(md, self.dest_style)
+        else:
+            success = ca.remove_metadata(self.dest_style)
+
+        ca.load_cache([MetaDataStyle.CBI, MetaDataStyle.CIX])
+        return BulkTagJob.Success if success else BulkTagJob.Failed
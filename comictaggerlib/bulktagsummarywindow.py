@@ -0,0 +1,59 @@
+"""A PyQT5 dialog to show the result of a bulk tag operation for each file"""
+
+# Copyright 2012-2014 Anthony Beville
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#     http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import logging
+import os
+
+from PyQt5 import QtCore, QtWidgets, uic
+
+from comictaggerlib.settings import ComicTaggerSettings
+
+logger = logging.getLogger(__name__)
+
+
+class BulkTagSummaryWindow(QtWidgets.QDialog):
+    def __init__(self, parent, summary, results):
+        super().__init__(parent)
+
+        uic.loadUi(ComicTaggerSettings.get_ui_file("bulktagsummarywindow.ui"), self)
+
+        self.setWindowFlags(
+            QtCore.Qt.WindowType(
+                self.windowFlags()
+                | QtCore.Qt.WindowType.WindowSystemMenuHint
+                | QtCore.Qt.WindowType.WindowMaximizeButtonHint
+            )
+        )
+
+        self.label.setText(summary)
+        self.populate_table(results)
+
+    def populate_table(self, results):
+        self.twList.setSortingEnabled(False)
+        self.twList.setRowCount(len(results))
+
+        for row, (ca, status) in enumerate(results):
+            folder, filename = os.path.split(ca.path)
+            for col, text in enumerate([status, filename, folder]):
+                item = QtWidgets.QTableWidgetItem(text)
+                item.setFlags(QtCore.Qt.ItemFlag.ItemIsSelectable | QtCore.Qt.ItemFlag.ItemIsEnabled)
+                item.setData(QtCore.Qt.ItemDataRole.ToolTipRole, text)
+                self.twList.setItem(row, col, item)
+
+        self.twList.setSortingEnabled(True)
+        self.twList.resizeColumnsToContents()
+        if self.twList.columnWidth(2) > 300:
+            self.twList.setColumnWidth(2, 300)
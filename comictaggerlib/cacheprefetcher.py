@@ -0,0 +1,149 @@
+"""A class to warm up the Comic Vine and image caches before a big auto-tag job"""
+
+# Copyright 2012-2014 Anthony Beville
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#     http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import logging
+from typing import List
+
+from comicapi.issuestring import normalize_issue
+from comictaggerlib.comicvinetalker import ComicVineTalker, ComicVineTalkerException
+from comictaggerlib.imagefetcher import ImageFetcher, ImageFetcherException
+from comictaggerlib.issueidentifier import IssueIdentifier, SearchKeys
+
+logger = logging.getLogger(__name__)
+
+
+class CachePrefetcher:
+    """Makes the Comic Vine requests an identification pass over a batch needs, each only once
+
+    The plan mirrors IssueIdentifier.search: one series search per distinct
+    series name, then one issue query per distinct candidate volume list,
+    asking for the issue numbers of all files that share that list at once.
+    The combined result is split back into the per-file queries the
+    identifier makes, so each IssueIdentifier finds its answer in the cache.
+    Every step lands in the regular caches, so an interrupted run resumes by
+    simply running it again.
+    """
+
+    def __init__(self, settings):
+        self.settings = settings
+        self.output_function = IssueIdentifier.default_write_output
+        self.failures = 0
+
+    def set_output_function(self, func):
+        self.output_function = func
+
+    def log_msg(self, msg):
+        self.output_function(str(msg) + "\n")
+
+    def plan_series_searches(self, keys_list: List[SearchKeys]):
+        """Returns the distinct series names, in the order they were first seen"""
+        series_names = {}
+        for keys in keys_list:
+            if keys["series"] is None or keys["issue_number"] is None:
+                continue
+            # the series search cache is keyed on the lower case name
+            series_names.setdefault(keys["series"].lower(), keys["series"])
+        return list(series_names.values())
+
+    def plan_issue_queries(self, keys_list: List[SearchKeys], search_results):
+        """Groups the (issue number, year) queries the identifier will make by candidate volume list"""
+        ii = IssueIdentifier(None, self.settings)
+        volume_groups = {}
+        for keys in keys_list:
+            if keys["series"] is None or keys["issue_number"] is None:
+                continue
+            cv_search_results = search_results.get(keys["series"].lower())
+            if not cv_search_results:
+                continue
+
+            issue_number = normalize_issue(keys["issue_number"])
+            volume_id_list = [series["id"] for series in ii.filter_series_candidates(keys, cv_search_results)]
+            if len(volume_id_list) == 0:
+                continue
+
+            queries = volume_groups.setdefault(tuple(volume_id_list), {})
+            queries.setdefault((issue_number, keys["year"]), None)
+        return {volume_id_list: list(queries) for volume_id_list, queries in volume_groups.items()}
+
+    def get_talker(self, wait_for_rate_limit):
+        comic_vine = ComicVineTalker()
+        comic_vine.wait_for_rate_limit = wait_for_rate_limit
+        comic_vine.set_log_func(lambda text: logger.info(text.strip()))
+        return comic_vine
+
+    def fetch_issue_lists(self, keys_list: List[SearchKeys], wait_for_rate_limit=False):
+        """Makes the series searches and grouped issue queries, and returns all the issues found"""
+        comic_vine = self.get_talker(wait_for_rate_limit)
+
+        series_names = self.plan_series_searches(keys_list)
+        self.log_msg(f"Searching for {len(series_names)} distinct series...")
+        search_results = {}
+        for counter, series_name in enumerate(series_names):
+            self.log_msg(f"[{counter + 1}/{len(series_names)}] {series_name}")
+            try:
+                search_results[series_name.lower()] = comic_vine.search_for_series(series_name)
+            except ComicVineTalkerException:
+                logger.exception("Series search for %s failed", series_name)
+                self.failures += 1
+
+        volume_groups = self.plan_issue_queries(keys_list, search_results)
+        self.log_msg(f"Fetching issues for {len(volume_groups)} distinct volume lists...")
+        all_issues = []
+        for counter, (volume_id_list, queries) in enumerate(volume_groups.items()):
+            volume_id_list = list(volume_id_list)
+
+            # already answered queries don't need to be asked again
+            missing_queries = []
+            for issue_number, year in queries:
+                if comic_vine.is_issue_query_cached(volume_id_list, issue_number, year):
+                    all_issues.extend(
+                        comic_vine.fetch_issues_by_volume_issue_num_and_year(volume_id_list, issue_number, year)
+                    )
+                else:
+                    missing_queries.append((issue_number, year))
+            queries = missing_queries
+            if len(queries) == 0:
+                continue
+
+            self.log_msg(
+                f"[{counter + 1}/{len(volume_groups)}] {len({issue_number for issue_number, _ in queries})} "
+                f"issue number(s) in {len(volume_id_list)} volume(s)"
+            )
+            try:
+                # this also caches the answer to each query each file's identifier will make
+                all_issues.extend(comic_vine.fetch_issues_by_volume_and_issue_num_list(volume_id_list, queries))
+            except ComicVineTalkerException:
+                logger.exception("Issue query for volumes %s failed", volume_id_list)
+                self.failures += 1
+
+        return all_issues
+
+    def prefetch(self, keys_list: List[SearchKeys], wait_for_rate_limit=True):
+        self.failures = 0
+
+        thumb_urls = {}
+        for issue in self.fetch_issue_lists(keys_list, wait_for_rate_limit):
+            thumb_urls.setdefault(issue["image"]["thumb_url"], None)
+
+        self.log_msg(f"Fetching {len(thumb_urls)} cover thumbnails...")
+        for url in thumb_urls:
+            try:
+                ImageFetcher().fetch(url, blocking=True)
+            except ImageFetcherException:
+                logger.exception("Fetching %s failed", url)
+                self.failures += 1
+
+        return self.failures == 0
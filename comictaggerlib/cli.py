@@ -24,11 +24,15 @@ from pprint import pprint
 
 from comicapi import utils
 from comicapi.comicarchive import ComicArchive, MetaDataStyle
+from comicapi.filenameparser import FileNameParser
 from comicapi.genericmetadata import GenericMetadata
+from comictaggerlib.cacheprefetcher import CachePrefetcher
 from comictaggerlib.cbltransformer import CBLTransformer
 from comictaggerlib.comicvinetalker import ComicVineTalker, ComicVineTalkerException
 from comictaggerlib.filerenamer import FileRenamer
+from comictaggerlib.imagefetcher import ImageFetcher, ImageFetcherException
 from comictaggerlib.issueidentifier import IssueIdentifier
+from comictaggerlib.offlinequeue import OfflineQueue
 from comictaggerlib.resulttypes import MultipleMatch, OnlineMatchResults
 from comictaggerlib.settings import ComicTaggerSettings
 
@@ -151,18 +155,206 @@ def post_process_matches(match_results: OnlineMatchResults, opts, settings):
 
 
 def cli_mode(opts, settings):
+    """Runs the command-line actions, returns the exit code a --use-server client exits with
+
+    The exit code is 1 when a file wasn't matched, tagged or fetched, or a
+    prefetch or replay request failed.  Files that are skipped, such as
+    ones that aren't comic archives, don't count as failures.  A local run
+    ignores it and exits 0, as it always has.
+    """
+    if opts.clean_image_cache:
+        removed, freed = ImageFetcher().collect_garbage()
+        print(f"Removed {removed} unused image cache file(s), freeing {freed // 1024} KB.")
+        return 0
+
+    if opts.replay_offline_queue:
+        return replay_offline_queue(opts)
+
     if len(opts.file_list) < 1:
         logger.error("You must specify at least one filename.  Use the -h option for more info")
-        return
+        return 1
+
+    if opts.prefetch:
+        return prefetch_cli(opts, settings)
+
+    # offline, the planner could only queue its batch queries, each file queues the ones it misses instead
+    if (
+        opts.save_tags
+        and opts.search_online
+        and opts.issue_id is None
+        and len(opts.file_list) > 1
+        and not ComicVineTalker.offline
+    ):
+        archives = plan_batch_identification(opts, settings)
+    else:
+        archives = {}
 
     match_results = OnlineMatchResults()
 
+    if opts.offline:
+        # the queue may hold entries from earlier runs, only this run's are reported
+        queue = OfflineQueue()
+        queued_before = len(queue.get_entries())
+
     for f in opts.file_list:
-        process_file_cli(f, opts, settings, match_results)
+        # reuse the archive the planner read, dropping it once it's done with
+        process_file_cli(f, opts, settings, match_results, archives.pop(f, None))
         sys.stdout.flush()
 
     post_process_matches(match_results, opts, settings)
 
+    if opts.offline:
+        queued = len(queue.get_entries())
+        if queued > queued_before:
+            print(
+                f"\n{queued - queued_before} request(s) were not in the local caches and are queued in "
+                f"{queue.queue_file}, which holds {queued} request(s) in all"
+            )
+            print("Run again online with --replay-offline-queue to fetch them.")
+
+    stats = ImageFetcher.get_stats()
+    logger.info(
+        "Image cache: %d hits, %d misses, %d bytes read, %d bytes downloaded, %d bytes written in %d writes",
+        stats["hits"],
+        stats["misses"],
+        stats["bytes_read"],
+        stats["bytes_downloaded"],
+        stats["bytes_written"],
+        stats["writes"],
+    )
+
+    failed = (
+        match_results.no_matches
+        or match_results.multiple_matches
+        or match_results.low_confidence_matches
+        or match_results.write_failures
+        or match_results.fetch_data_failures
+    )
+    return 1 if failed else 0
+
+
+def search_keys_from_metadata(md):
+    return {
+        "series": md.series,
+        "issue_number": md.issue,
+        "month": md.month,
+        "year": md.year,
+        "issue_count": md.issue_count,
+    }
+
+
+def plan_batch_identification(opts, settings):
+    """Fetches the Comic Vine data for the whole batch up front, grouped by candidate volumes
+
+    Identifying each file afterwards finds its series and issue lists in the cache.  Returns the
+    archives that were read, by filename, with their tags cached so they don't have to be read again.
+    """
+    keys_list = []
+    archives = {}
+    for filename in opts.file_list:
+        ca = ComicArchive(filename, settings.rar_exe_path, ComicTaggerSettings.get_graphic("nocover.png"))
+        archives[filename] = ca
+        # the same single pass process_file_cli makes
+        ca.load_all_metadata()
+        if not ca.seems_to_be_a_comic_archive():
+            continue
+        if opts.no_overwrite and ca.has_metadata(opts.data_style):
+            continue
+
+        md = create_local_metadata(opts, ca, ca.has_metadata(opts.data_style))
+        if (md.issue is None or md.issue == "") and opts.assume_issue_is_one_if_not_set:
+            md.issue = "1"
+        keys_list.append(search_keys_from_metadata(md))
+
+    def myoutput(text):
+        if opts.verbose:
+            IssueIdentifier.default_write_output(text)
+
+    prefetcher = CachePrefetcher(settings)
+    prefetcher.set_output_function(myoutput)
+    prefetcher.fetch_issue_lists(keys_list, opts.wait_and_retry_on_rate_limit)
+
+    return archives
+
+
+def prefetch_cli(opts, settings):
+    keys_list = []
+    # parse the filenames first, since that is what most batches get identified by
+    for filename, fnp in zip(opts.file_list, FileNameParser.parse_many(opts.file_list)):
+        md = GenericMetadata()
+
+        if fnp.series != "":
+            md.series = fnp.series
+        if fnp.issue != "":
+            md.issue = fnp.issue
+        if fnp.year != "":
+            md.year = fnp.year
+        if fnp.issue_count != "":
+            md.issue_count = fnp.issue_count
+
+        # only open the archive when tags are wanted
+        if opts.data_style is not None:
+            ca = ComicArchive(filename, settings.rar_exe_path, ComicTaggerSettings.get_graphic("nocover.png"))
+            if ca.has_metadata(opts.data_style):
+                # tags win, but the filename fills in the keys they leave out, an empty tag
+                # would wipe the filename's value in overlay()
+                tag_md = ca.read_metadata(opts.data_style)
+                for name in ["series", "issue", "year", "issue_count"]:
+                    if getattr(tag_md, name) in [None, ""]:
+                        setattr(tag_md, name, getattr(md, name))
+                md = tag_md
+
+        if opts.metadata is not None:
+            md.overlay(opts.metadata)
+
+        if (md.issue is None or md.issue == "") and opts.assume_issue_is_one_if_not_set:
+            md.issue = "1"
+
+        keys_list.append(search_keys_from_metadata(md))
+
+    # stay well clear of Comic Vine's velocity detection, and wait out any rate limit we still hit
+    ComicVineTalker.min_request_interval = 1.0
+
+    prefetcher = CachePrefetcher(settings)
+    if not prefetcher.prefetch(keys_list, wait_for_rate_limit=True):
+        print(f"{prefetcher.failures} request(s) failed.  Run again to retry them.")
+        return 1
+    print("Prefetch complete.")
+    return 0
+
+
+def replay_offline_queue(opts):
+    queue = OfflineQueue()
+    entries = queue.get_entries()
+    if len(entries) == 0:
+        print("The offline queue is empty.")
+        return 0
+
+    comic_vine = ComicVineTalker()
+    comic_vine.wait_for_rate_limit = opts.wait_and_retry_on_rate_limit
+
+    failed = []
+    for (counter, (fetch_method, args)) in enumerate(entries):
+        print(f"[{counter + 1}/{len(entries)}] {fetch_method}{tuple(args)}")
+        try:
+            if fetch_method == OfflineQueue.FetchImage:
+                ImageFetcher().fetch(args[0], blocking=True)
+            else:
+                getattr(comic_vine, fetch_method)(*args)
+        except (ComicVineTalkerException, ImageFetcherException):
+            logger.exception("Failed to replay %s%s", fetch_method, args)
+            failed.append((fetch_method, args))
+        sys.stdout.flush()
+
+    # keep anything that failed for the next replay
+    if len(failed) > 0:
+        queue.write_entries(failed)
+        print(f"{len(failed)} request(s) failed and remain queued.")
+        return 1
+    queue.clear()
+    print("All queued requests fetched.")
+    return 0
+
 
 def create_local_metadata(opts, ca: ComicArchive, has_desired_tags):
     md = GenericMetadata()
@@ -182,15 +374,19 @@ def create_local_metadata(opts, ca: ComicArchive, has_desired_tags):
     return md
 
 
-def process_file_cli(filename, opts, settings, match_results: OnlineMatchResults):
+def process_file_cli(filename, opts, settings, match_results: OnlineMatchResults, ca: ComicArchive = None):
     batch_mode = len(opts.file_list) > 1
 
-    ca = ComicArchive(filename, settings.rar_exe_path, ComicTaggerSettings.get_graphic("nocover.png"))
+    if ca is None:
+        ca = ComicArchive(filename, settings.rar_exe_path, ComicTaggerSettings.get_graphic("nocover.png"))
 
     if not os.path.lexists(filename):
         logger.error("Cannot find " + filename)
         return
 
+    # list the archive and read all of its tags in one go, the checks below use what this caches
+    ca.load_all_metadata()
+
     if not ca.seems_to_be_a_comic_archive():
         logger.error("Sorry, but %s is not a comic archive!", filename)
         return
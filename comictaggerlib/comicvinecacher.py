@@ -15,19 +15,112 @@
 # limitations under the License.
 
 import datetime
+import json
 import logging
 import os
 import sqlite3 as lite
 
 from comicapi import utils
 from comictaggerlib import ctversion
+from comictaggerlib.memorycache import MemoryCache
 from comictaggerlib.settings import ComicTaggerSettings
 
 logger = logging.getLogger(__name__)
 
 
+class CacheTTLPolicy:
+    """Decides how long each kind of cached Comic Vine data stays fresh
+
+    Volumes (and their issues) whose most recent cover date is older than
+    ended_volume_age days are assumed to be finished and get the longer
+    ended_volume TTL.  With stale_while_revalidate, expired data is still
+    handed out for one more TTL period, flagged as stale so the caller can
+    refresh it in the background.
+    """
+
+    Search = "search"
+    IssueSearch = "issue_search"
+    Volume = "volume"
+    Issue = "issue"
+    AltCovers = "alt_covers"
+
+    def __init__(
+        self,
+        search=1,
+        volume=7,
+        issue=7,
+        alt_covers=30,
+        ended_volume=90,
+        ended_volume_age=365,
+        stale_while_revalidate=False,
+    ):
+        self.ttls = {
+            CacheTTLPolicy.Search: datetime.timedelta(days=search),
+            # new issues show up in volume/issue number queries as often as in series searches
+            CacheTTLPolicy.IssueSearch: datetime.timedelta(days=search),
+            CacheTTLPolicy.Volume: datetime.timedelta(days=volume),
+            CacheTTLPolicy.Issue: datetime.timedelta(days=issue),
+            CacheTTLPolicy.AltCovers: datetime.timedelta(days=alt_covers),
+        }
+        self.ended_volume_ttl = datetime.timedelta(days=ended_volume)
+        self.ended_volume_age = datetime.timedelta(days=ended_volume_age)
+        self.stale_while_revalidate = stale_while_revalidate
+
+    @staticmethod
+    def from_settings(settings):
+        return CacheTTLPolicy(
+            search=settings.cv_cache_ttl_search,
+            volume=settings.cv_cache_ttl_volume,
+            issue=settings.cv_cache_ttl_issue,
+            alt_covers=settings.cv_cache_ttl_alt_covers,
+            ended_volume=settings.cv_cache_ttl_ended_volume,
+            ended_volume_age=settings.cv_cache_ended_volume_age,
+            stale_while_revalidate=settings.cv_cache_stale_while_revalidate,
+        )
+
+    def is_ended(self, last_cover_date):
+        if not last_cover_date:
+            return False
+        try:
+            last = datetime.datetime.strptime(last_cover_date[:10], "%Y-%m-%d")
+        except ValueError:
+            return False
+        return datetime.datetime.today() - last > self.ended_volume_age
+
+    def get_ttl(self, resource, last_cover_date=None):
+        ttl = self.ttls[resource]
+        if resource in (CacheTTLPolicy.Volume, CacheTTLPolicy.Issue) and self.is_ended(last_cover_date):
+            ttl = max(ttl, self.ended_volume_ttl)
+        return ttl
+
+    def get_purge_age(self, resource):
+        """Age past which a record of this type can never be served again"""
+        max_ttl = self.ttls[resource]
+        if resource in (CacheTTLPolicy.Volume, CacheTTLPolicy.Issue):
+            max_ttl = max(max_ttl, self.ended_volume_ttl)
+        if self.stale_while_revalidate:
+            max_ttl *= 2
+        return max_ttl
+
+
 class ComicVineCacher:
+    ttl_policy = CacheTTLPolicy()
+
+    # bumped when the tables change, a cache with another schema is cleared like one from another version
+    schema_version = 3
+
+    # {issue key: [issue records]} of the volumes looked up so far, by volume id, see ComicVineTalker.get_issue_index
+    issue_indexes = MemoryCache(256, lambda index: 1)
+
+    Fresh = 0
+    Stale = 1
+    Expired = 2
+
     def __init__(self):
+        # set by the get_* methods when the data returned is past its TTL
+        # and should be refreshed
+        self.stale = False
+
         self.settings_folder = ComicTaggerSettings.get_settings_folder()
         self.db_file = os.path.join(self.settings_folder, "cv_cache.db")
         self.version_file = os.path.join(self.settings_folder, "cache_version.txt")
@@ -40,13 +133,14 @@ class ComicVineCacher:
                 f.close()
         except:
             pass
-        if data != ctversion.version:
+        if data != self.get_cache_version():
             self.clear_cache()
 
         if not os.path.exists(self.db_file):
             self.create_cache_db()
 
     def clear_cache(self):
+        ComicVineCacher.issue_indexes.clear()
         try:
             os.unlink(self.db_file)
         except:
@@ -56,11 +150,14 @@ class ComicVineCacher:
         except:
             pass
 
+    def get_cache_version(self):
+        return f"{ctversion.version} schema {ComicVineCacher.schema_version}"
+
     def create_cache_db(self):
 
         # create the version file
         with open(self.version_file, "w") as f:
-            f.write(ctversion.version)
+            f.write(self.get_cache_version())
 
         # this will wipe out any existing version
         open(self.db_file, "w").close()
@@ -76,10 +173,12 @@ class ComicVineCacher:
                 + "search_term TEXT,"
                 + "id INT,"
                 + "name TEXT,"
+                + "sanitized_name TEXT,"
                 + "start_year INT,"
                 + "publisher TEXT,"
                 + "count_of_issues INT,"
                 + "image_url TEXT,"
+                + "thumb_url TEXT,"
                 + "description TEXT,"
                 + "timestamp DATE DEFAULT (datetime('now','localtime'))) "
             )
@@ -118,6 +217,51 @@ class ComicVineCacher:
                 + "PRIMARY KEY (id))"
             )
 
+            cur.execute(
+                "CREATE TABLE IssueSearchCache("
+                + "query TEXT,"
+                + "data TEXT,"
+                + "timestamp DATE DEFAULT (datetime('now','localtime')), "
+                + "PRIMARY KEY (query))"
+            )
+
+            cur.execute(
+                "CREATE TABLE IssueDetails("
+                + "id INT,"
+                + "data TEXT,"
+                + "timestamp DATE DEFAULT (datetime('now','localtime')), "
+                + "PRIMARY KEY (id))"
+            )
+
+    def purge(self, cur, tablename, resource):
+        oldest = datetime.datetime.today() - self.ttl_policy.get_purge_age(resource)
+        cur.execute(f"DELETE FROM {tablename} WHERE timestamp  < ?", [str(oldest)])
+
+    def check_freshness(self, timestamp, ttl):
+        try:
+            age = datetime.datetime.today() - datetime.datetime.fromisoformat(str(timestamp))
+        except ValueError:
+            return ComicVineCacher.Expired
+
+        if age <= ttl:
+            return ComicVineCacher.Fresh
+        if self.ttl_policy.stale_while_revalidate and age <= ttl * 2:
+            return ComicVineCacher.Stale
+        return ComicVineCacher.Expired
+
+    def use_cached(self, timestamp, ttl):
+        """Returns True if data with this timestamp may be served, flagging it stale if needed"""
+        freshness = self.check_freshness(timestamp, ttl)
+        self.stale = freshness == ComicVineCacher.Stale
+        return freshness != ComicVineCacher.Expired
+
+    def get_last_cover_date(self, cur, volume_id):
+        cur.execute("SELECT MAX(cover_date) FROM Issues WHERE volume_id = ?", [volume_id])
+        row = cur.fetchone()
+        if row is None:
+            return None
+        return row[0]
+
     def add_search_results(self, search_term, cv_search_results):
 
         con = lite.connect(self.db_file)
@@ -139,21 +283,29 @@ class ComicVineCacher:
 
                 if record["image"] is None:
                     url = ""
+                    thumb_url = ""
                 else:
                     url = record["image"]["super_url"]
+                    thumb_url = record["image"].get("thumb_url", "")
+
+                if "sanitized_name" not in record:
+                    record["sanitized_name"] = utils.sanitize_title(record["name"])
 
                 cur.execute(
                     "INSERT INTO VolumeSearchCache "
-                    + "(search_term, id, name, start_year, publisher, count_of_issues, image_url, description) "
-                    + "VALUES(?, ?, ?, ?, ?, ?, ?, ?)",
+                    + "(search_term, id, name, sanitized_name, start_year, publisher, count_of_issues, image_url,"
+                    + " thumb_url, description) "
+                    + "VALUES(?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
                     (
                         search_term.lower(),
                         record["id"],
                         record["name"],
+                        record["sanitized_name"],
                         record["start_year"],
                         pub_name,
                         record["count_of_issues"],
                         url,
+                        thumb_url,
                         record["description"],
                     ),
                 )
@@ -166,25 +318,35 @@ class ComicVineCacher:
             con.text_factory = str
             cur = con.cursor()
 
-            # purge stale search results
-            a_day_ago = datetime.datetime.today() - datetime.timedelta(days=1)
-            cur.execute("DELETE FROM VolumeSearchCache WHERE timestamp  < ?", [str(a_day_ago)])
+            # purge search results that are too old to ever be used
+            self.purge(cur, "VolumeSearchCache", CacheTTLPolicy.Search)
 
             # fetch
-            cur.execute("SELECT * FROM VolumeSearchCache WHERE search_term=?", [search_term.lower()])
+            cur.execute(
+                "SELECT id,name,sanitized_name,start_year,publisher,count_of_issues,image_url,thumb_url,description,"
+                + "timestamp"
+                + " FROM VolumeSearchCache WHERE search_term=?",
+                [search_term.lower()],
+            )
             rows = cur.fetchall()
+
+            # all results for a search term are written at the same time
+            if len(rows) > 0 and not self.use_cached(rows[0][9], self.ttl_policy.get_ttl(CacheTTLPolicy.Search)):
+                return results
             # now process the results
             for record in rows:
                 result = {}
-                result["id"] = record[1]
-                result["name"] = record[2]
+                result["id"] = record[0]
+                result["name"] = record[1]
+                result["sanitized_name"] = record[2]
                 result["start_year"] = record[3]
                 result["publisher"] = {}
                 result["publisher"]["name"] = record[4]
                 result["count_of_issues"] = record[5]
                 result["image"] = {}
                 result["image"]["super_url"] = record[6]
-                result["description"] = record[7]
+                result["image"]["thumb_url"] = record[7]
+                result["description"] = record[8]
 
                 results.append(result)
 
@@ -214,14 +376,16 @@ class ComicVineCacher:
 
             # purge stale issue info - probably issue data won't change
             # much....
-            a_month_ago = datetime.datetime.today() - datetime.timedelta(days=30)
-            cur.execute("DELETE FROM AltCovers WHERE timestamp  < ?", [str(a_month_ago)])
+            self.purge(cur, "AltCovers", CacheTTLPolicy.AltCovers)
 
-            cur.execute("SELECT url_list FROM AltCovers WHERE issue_id=?", [issue_id])
+            cur.execute("SELECT url_list, timestamp FROM AltCovers WHERE issue_id=?", [issue_id])
             row = cur.fetchone()
             if row is None:
                 return None
 
+            if not self.use_cached(row[1], self.ttl_policy.get_ttl(CacheTTLPolicy.AltCovers)):
+                return None
+
             url_list_str = row[0]
             if len(url_list_str) == 0:
                 return []
@@ -280,6 +444,8 @@ class ComicVineCacher:
                 }
                 self.upsert(cur, "issues", "id", issue["id"], data)
 
+        ComicVineCacher.issue_indexes.remove(volume_id)
+
     def get_volume_info(self, volume_id):
 
         result = None
@@ -290,17 +456,23 @@ class ComicVineCacher:
             con.text_factory = str
 
             # purge stale volume info
-            a_week_ago = datetime.datetime.today() - datetime.timedelta(days=7)
-            cur.execute("DELETE FROM Volumes WHERE timestamp  < ?", [str(a_week_ago)])
+            self.purge(cur, "Volumes", CacheTTLPolicy.Volume)
 
             # fetch
-            cur.execute("SELECT id,name,publisher,count_of_issues,start_year FROM Volumes WHERE id = ?", [volume_id])
+            cur.execute(
+                "SELECT id,name,publisher,count_of_issues,start_year,timestamp FROM Volumes WHERE id = ?", [volume_id]
+            )
 
             row = cur.fetchone()
 
             if row is None:
                 return result
 
+            # ended volumes are kept around for longer
+            ttl = self.ttl_policy.get_ttl(CacheTTLPolicy.Volume, self.get_last_cover_date(cur, volume_id))
+            if not self.use_cached(row[5], ttl):
+                return result
+
             result = {}
 
             # since ID is primary key, there is only one row
@@ -323,18 +495,22 @@ class ComicVineCacher:
 
             # purge stale issue info - probably issue data won't change
             # much....
-            a_week_ago = datetime.datetime.today() - datetime.timedelta(days=7)
-            cur.execute("DELETE FROM Issues WHERE timestamp  < ?", [str(a_week_ago)])
+            self.purge(cur, "Issues", CacheTTLPolicy.Issue)
 
             # fetch
             results = []
 
             cur.execute(
-                "SELECT id,name,issue_number,site_detail_url,cover_date,super_url,thumb_url,description FROM Issues WHERE volume_id = ?",
+                "SELECT id,name,issue_number,site_detail_url,cover_date,super_url,thumb_url,description,timestamp FROM Issues WHERE volume_id = ?",
                 [volume_id],
             )
             rows = cur.fetchall()
 
+            if len(rows) > 0:
+                ttl = self.ttl_policy.get_ttl(CacheTTLPolicy.Issue, max(row[4] or "" for row in rows))
+                if not self.use_cached(min(str(row[8]) for row in rows), ttl):
+                    return None
+
             # now process the results
             for row in rows:
                 record = {}
@@ -399,6 +575,72 @@ class ComicVineCacher:
 
             return details
 
+    def add_issue_search_results(self, query, cv_issue_results):
+
+        con = lite.connect(self.db_file)
+
+        with con:
+            cur = con.cursor()
+            timestamp = datetime.datetime.now()
+
+            data = {
+                "data": json.dumps(cv_issue_results),
+                "timestamp": timestamp,
+            }
+            self.upsert(cur, "IssueSearchCache", "query", query, data)
+
+    def get_issue_search_results(self, query):
+
+        con = lite.connect(self.db_file)
+        with con:
+            cur = con.cursor()
+            con.text_factory = str
+
+            self.purge(cur, "IssueSearchCache", CacheTTLPolicy.IssueSearch)
+
+            cur.execute("SELECT data,timestamp FROM IssueSearchCache WHERE query=?", [query])
+            row = cur.fetchone()
+            if row is None:
+                return None
+
+            if not self.use_cached(row[1], self.ttl_policy.get_ttl(CacheTTLPolicy.IssueSearch)):
+                return None
+
+            return json.loads(row[0])
+
+    def add_issue_details(self, issue_id, cv_issue_results):
+
+        con = lite.connect(self.db_file)
+
+        with con:
+            cur = con.cursor()
+            timestamp = datetime.datetime.now()
+
+            data = {
+                "data": json.dumps(cv_issue_results),
+                "timestamp": timestamp,
+            }
+            self.upsert(cur, "IssueDetails", "id", issue_id, data)
+
+    def get_issue_details(self, issue_id):
+
+        con = lite.connect(self.db_file)
+        with con:
+            cur = con.cursor()
+            con.text_factory = str
+
+            self.purge(cur, "IssueDetails", CacheTTLPolicy.Issue)
+
+            cur.execute("SELECT data,timestamp FROM IssueDetails WHERE id=?", [issue_id])
+            row = cur.fetchone()
+            if row is None:
+                return None
+
+            if not self.use_cached(row[1], self.ttl_policy.get_ttl(CacheTTLPolicy.Issue)):
+                return None
+
+            return json.loads(row[0])
+
     def upsert(self, cur, tablename, pkname, pkval, data):
         """This does an insert if the given PK doesn't exist, and an
         update it if does
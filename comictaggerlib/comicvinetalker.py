@@ -17,29 +17,20 @@
 import json
 import logging
 import re
-import sys
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from typing import TypedDict
 
-import requests
-from bs4 import BeautifulSoup
-
 from comicapi import utils
 from comicapi.genericmetadata import GenericMetadata
-from comicapi.issuestring import IssueString
+from comicapi.issuestring import issue_key, normalize_issue
 from comictaggerlib import ctversion
 from comictaggerlib.comicvinecacher import ComicVineCacher
+from comictaggerlib.offlinequeue import OfflineQueue
 
-logger = logging.getLogger(__name__)
-
-try:
-    from PyQt5 import QtCore, QtNetwork
-
-    qt_available = True
-except ImportError:
-    qt_available = False
-
+# requests, bs4 and Qt are imported where they are used, so command-line runs that never go online don't load them
 logger = logging.getLogger(__name__)
 
 
@@ -58,6 +49,7 @@ class CVTypeID:
 class ComicVineTalkerException(Exception):
     Unknown = -1
     Network = -2
+    Offline = -3
     InvalidKey = 100
     RateLimit = 107
 
@@ -67,7 +59,11 @@ class ComicVineTalkerException(Exception):
         self.code = code
 
     def __str__(self):
-        if self.code in (ComicVineTalkerException.Unknown, ComicVineTalkerException.Network):
+        if self.code in (
+            ComicVineTalkerException.Unknown,
+            ComicVineTalkerException.Network,
+            ComicVineTalkerException.Offline,
+        ):
             return self.desc
 
         return f"CV error #{self.code}:  [{self.desc}]. \n"
@@ -85,9 +81,24 @@ class ComicVineTalker:
     logo_url = "http://static.comicvine.com/bundles/comicvinesite/images/logo.png"
     api_key = ""
 
+    # when set, only answer from the cache and queue misses for later
+    offline = False
+
     alt_url_list_fetch_complete = list_fetch_complete
     url_fetch_complete = url_fetch_complete
 
+    # how many result pages of one query may be fetched at the same time
+    max_concurrent_requests = 4
+
+    # minimum number of seconds between requests to the CV server, shared by all talkers
+    min_request_interval = 0.0
+    last_request_time = 0.0
+    request_lock = threading.Lock()
+
+    # stale cache entries currently being refreshed in the background
+    revalidating = set()
+    revalidating_lock = threading.Lock()
+
     @staticmethod
     def get_rate_limit_message():
         if ComicVineTalker.api_key == "":
@@ -112,15 +123,15 @@ class ComicVineTalker:
 
         self.log_func = None
 
-        if qt_available:
-            self.nam = QtNetwork.QNetworkAccessManager()
+        # made by the asynchronous fetches, the GUI is the only user of those
+        self.nam = None
 
     def set_log_func(self, log_func):
         self.log_func = log_func
 
     def write_log(self, text):
         if self.log_func is None:
-            logger.info(text, file=sys.stderr)
+            logger.info(text)
         else:
             self.log_func(text)
 
@@ -137,8 +148,21 @@ class ComicVineTalker:
                     day = utils.xlate(parts[2], True)
         return day, month, year
 
+    def check_offline(self, fetch_method, *args):
+        """In offline mode, queue the missed fetch for an online pass and bail out"""
+        if ComicVineTalker.offline:
+            OfflineQueue().record(fetch_method, *args)
+            raise ComicVineTalkerException(
+                ComicVineTalkerException.Offline, f"Offline mode: {fetch_method}{args} is not in the cache"
+            )
+
     def test_key(self, key):
 
+        if ComicVineTalker.offline:
+            return False
+
+        import requests
+
         try:
             test_url = self.api_base_url + "/issue/1/?api_key=" + key + "&format=json&field_list=name"
 
@@ -155,6 +179,9 @@ class ComicVineTalker:
         Get the content from the CV server.  If we're in "wait mode" and status code is a rate limit error
         sleep for a bit and retry.
         """
+        if ComicVineTalker.offline:
+            raise ComicVineTalkerException(ComicVineTalkerException.Offline, "Offline mode: network access disabled")
+
         total_time_waited = 0
         limit_wait_time = 1
         counter = 0
@@ -181,12 +208,25 @@ class ComicVineTalker:
             break
         return cv_response
 
+    def wait_for_request_slot(self):
+        """Spaces out requests when a minimum request interval is set"""
+        if ComicVineTalker.min_request_interval <= 0:
+            return
+        with ComicVineTalker.request_lock:
+            wait = ComicVineTalker.last_request_time + ComicVineTalker.min_request_interval - time.monotonic()
+            if wait > 0:
+                time.sleep(wait)
+            ComicVineTalker.last_request_time = time.monotonic()
+
     def get_url_content(self, url, params):
         # connect to server:
         #  if there is a 500 error, try a few more times before giving up
         #  any other error, just bail
+        import requests
+
         for tries in range(3):
             try:
+                self.wait_for_request_slot()
                 resp = requests.get(url, params=params, headers={"user-agent": "comictagger/" + ctversion.version})
                 if resp.status_code == 200:
                     return resp.json()
@@ -203,6 +243,59 @@ class ComicVineTalker:
 
         raise ComicVineTalkerException(ComicVineTalkerException.Unknown, "Error on Comic Vine server")
 
+    def revalidate_in_background(self, fetch_method, *args):
+        """Re-fetch stale cache data on a worker thread, so the caller can use the cached copy right away"""
+        if ComicVineTalker.offline:
+            return
+
+        key = (fetch_method, str(args))
+        with ComicVineTalker.revalidating_lock:
+            if key in ComicVineTalker.revalidating:
+                return
+            ComicVineTalker.revalidating.add(key)
+
+        def revalidate():
+            talker = ComicVineTalker()
+            talker.api_key = self.api_key
+            try:
+                getattr(talker, fetch_method)(*args, refresh_cache=True)
+            except Exception:
+                logger.exception("Failed to refresh stale cache data: %s%s", fetch_method, args)
+            finally:
+                with ComicVineTalker.revalidating_lock:
+                    ComicVineTalker.revalidating.discard(key)
+
+        threading.Thread(target=revalidate, daemon=True).start()
+
+    def fetch_pages(self, url, params, page_params_list):
+        """Fetches several pages of the same query concurrently, returning the responses in order"""
+
+        def fetch_page(page_params):
+            return self.get_cv_content(url, dict(params, **page_params))
+
+        if ComicVineTalker.max_concurrent_requests <= 1 or len(page_params_list) <= 1:
+            return [fetch_page(page_params) for page_params in page_params_list]
+
+        workers = min(ComicVineTalker.max_concurrent_requests, len(page_params_list))
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            return list(pool.map(fetch_page, page_params_list))
+
+    def is_series_search_done(self, last_result, search_series_name, result_word_count_max):
+        # Sanitize the series name for comicvine searching, comicvine search ignore symbols
+        last_result = utils.sanitize_title(last_result)
+
+        # See if the last result's name has all the of the search terms.
+        # If not, we're done.
+        for term in search_series_name.split():
+            if term not in last_result.lower():
+                return True
+
+        # Also, stop searching when the word count of last results is too much longer than our search terms list
+        if len(last_result) > result_word_count_max:
+            return True
+
+        return False
+
     def search_for_series(self, series_name, callback=None, refresh_cache=False):
 
         # Sanitize the series name for comicvine searching, comicvine search ignore symbols
@@ -215,8 +308,12 @@ class ComicVineTalker:
             cached_search_results = cvc.get_search_results(series_name)
 
             if len(cached_search_results) > 0:
+                if cvc.stale:
+                    self.revalidate_in_background("search_for_series", series_name)
                 return cached_search_results
 
+        self.check_offline("search_for_series", series_name)
+
         params = {
             "api_key": self.api_key,
             "format": "json",
@@ -260,65 +357,67 @@ class ComicVineTalker:
             callback(current_result_count, total_result_count)
 
         # see if we need to keep asking for more pages...
+        # Pages are requested a few at a time.  They are still consumed one by
+        # one, checking the halting rules before each, so a page past the
+        # point where we'd have stopped is just dropped.
+        last_page = -(-total_result_count // params["limit"])
         stop_searching = False
-        while current_result_count < total_result_count:
-
-            last_result = search_results[-1]["name"]
+        while current_result_count < total_result_count and page < last_page and not stop_searching:
 
-            # Sanitize the series name for comicvine searching, comicvine search ignore symbols
-            last_result = utils.sanitize_title(last_result)
-
-            # See if the last result's name has all the of the search terms.
-            # If not, break out of this, loop, we're done.
-            for term in search_series_name.split():
-                if term not in last_result.lower():
-                    stop_searching = True
-                    break
-
-            # Also, stop searching when the word count of last results is too much longer than our search terms list
-            if len(last_result) > result_word_count_max:
-                stop_searching = True
-
-            if stop_searching:
+            if self.is_series_search_done(search_results[-1]["name"], search_series_name, result_word_count_max):
                 break
 
             if callback is None:
                 self.write_log(f"getting another page of results {current_result_count} of {total_result_count}...\n")
-            page += 1
 
-            params["page"] = page
-            cv_response = self.get_cv_content(self.api_base_url + "/search", params)
+            pages = range(page + 1, min(page + ComicVineTalker.max_concurrent_requests, last_page) + 1)
+            cv_responses = self.fetch_pages(self.api_base_url + "/search", params, [{"page": p} for p in pages])
 
-            search_results.extend(cv_response["results"])
-            current_result_count += cv_response["number_of_page_results"]
+            for cv_response in cv_responses:
+                page += 1
 
-            if callback is not None:
-                callback(current_result_count, total_result_count)
+                search_results.extend(cv_response["results"])
+                current_result_count += cv_response["number_of_page_results"]
 
-        # Remove any search results that don't contain all the search terms (iterate backwards for easy removal)
-        for i in range(len(search_results) - 1, -1, -1):
-            record = search_results[i]
-            # Sanitize the series name for comicvine searching, comicvine search ignore symbols
-            record_name = utils.sanitize_title(record["name"])
-            for term in search_series_name.split():
+                if callback is not None:
+                    callback(current_result_count, total_result_count)
 
-                if term not in record_name:
-                    del search_results[i]
+                if current_result_count >= total_result_count or len(cv_response["results"]) == 0:
+                    stop_searching = True
+                    break
+                if self.is_series_search_done(search_results[-1]["name"], search_series_name, result_word_count_max):
+                    stop_searching = True
                     break
 
+        # Sanitize the series names for comicvine searching, comicvine search ignore symbols.  The
+        # sanitized name is kept with each record, and cached with it, for the later filtering steps
+        for record in search_results:
+            record["sanitized_name"] = utils.sanitize_title(record["name"])
+
+        # Remove any search results that don't contain all the search terms
+        terms = search_series_name.split()
+        search_results = [
+            record for record in search_results if all(term in record["sanitized_name"] for term in terms)
+        ]
+
         # cache these search results
         cvc.add_search_results(series_name, search_results)
 
         return search_results
 
-    def fetch_volume_data(self, series_id):
+    def fetch_volume_data(self, series_id, refresh_cache=False):
 
         # before we search online, look in our cache, since we might already have this info
         cvc = ComicVineCacher()
-        cached_volume_result = cvc.get_volume_info(series_id)
+        if not refresh_cache:
+            cached_volume_result = cvc.get_volume_info(series_id)
+
+            if cached_volume_result is not None:
+                if cvc.stale:
+                    self.revalidate_in_background("fetch_volume_data", series_id)
+                return cached_volume_result
 
-        if cached_volume_result is not None:
-            return cached_volume_result
+        self.check_offline("fetch_volume_data", series_id)
 
         volume_url = self.api_base_url + "/volume/" + CVTypeID.Volume + "-" + str(series_id)
 
@@ -335,48 +434,69 @@ class ComicVineTalker:
 
         return volume_results
 
-    def fetch_issues_by_volume(self, series_id):
+    def fetch_issues_by_volume(self, series_id, refresh_cache=False):
 
         # before we search online, look in our cache, since we might already have this info
         cvc = ComicVineCacher()
-        cached_volume_issues_result = cvc.get_volume_issues_info(series_id)
+        if not refresh_cache:
+            cached_volume_issues_result = cvc.get_volume_issues_info(series_id)
+
+            if cached_volume_issues_result is not None:
+                if cvc.stale:
+                    self.revalidate_in_background("fetch_issues_by_volume", series_id)
+                return cached_volume_issues_result
 
-        if cached_volume_issues_result is not None:
-            return cached_volume_issues_result
+        self.check_offline("fetch_issues_by_volume", series_id)
 
+        volume_issues_result = self.fetch_issue_list("volume:" + str(series_id))
+
+        cvc.add_volume_issues_info(series_id, volume_issues_result)
+
+        return volume_issues_result
+
+    def get_issue_index(self, series_id):
+        """Returns the issues of the volume by issue key, each key has its issues in list order"""
+        index = ComicVineCacher.issue_indexes.get(series_id)
+        if index is None:
+            index = {}
+            for record in self.fetch_issues_by_volume(series_id):
+                index.setdefault(issue_key(record["issue_number"]), []).append(record)
+            ComicVineCacher.issue_indexes.put(series_id, index)
+        return index
+
+    def fetch_issue_list(self, flt):
+        """Fetches every page of an /issues query"""
         params = {
             "api_key": self.api_key,
-            "filter": "volume:" + str(series_id),
             "format": "json",
             "field_list": "id,volume,issue_number,name,image,cover_date,site_detail_url,description",
+            "filter": flt,
         }
+
         cv_response = self.get_cv_content(self.api_base_url + "/issues/", params)
 
         current_result_count = cv_response["number_of_page_results"]
         total_result_count = cv_response["number_of_total_results"]
 
-        volume_issues_result = cv_response["results"]
-        page = 1
-        offset = 0
+        issues_result = cv_response["results"]
+        page_size = cv_response["number_of_page_results"]
 
         # see if we need to keep asking for more pages...
-        while current_result_count < total_result_count:
-            page += 1
-            offset += cv_response["number_of_page_results"]
-
-            params["offset"] = offset
-            cv_response = self.get_cv_content(self.api_base_url + "/issues/", params)
-
-            volume_issues_result.extend(cv_response["results"])
-            current_result_count += cv_response["number_of_page_results"]
+        # the total is known up front, so ask for all the remaining pages at once
+        if current_result_count < total_result_count and page_size > 0:
+            offsets = range(current_result_count, total_result_count, page_size)
+            cv_responses = self.fetch_pages(
+                self.api_base_url + "/issues/", params, [{"offset": offset} for offset in offsets]
+            )
 
-        self.repair_urls(volume_issues_result)
+            for cv_response in cv_responses:
+                issues_result.extend(cv_response["results"])
 
-        cvc.add_volume_issues_info(series_id, volume_issues_result)
+        self.repair_urls(issues_result)
 
-        return volume_issues_result
+        return issues_result
 
-    def fetch_issues_by_volume_issue_num_and_year(self, volume_id_list, issue_number, year):
+    def build_issue_filter(self, volume_id_list, issue_number, year):
         volume_filter = ""
         for vid in volume_id_list:
             volume_filter += str(vid) + "|"
@@ -386,65 +506,145 @@ class ComicVineTalker:
         if int_year is not None:
             flt += f",cover_date:{int_year}-1-1|{int_year+1}-1-1"
 
-        params = {
-            "api_key": self.api_key,
-            "format": "json",
-            "field_list": "id,volume,issue_number,name,image,cover_date,site_detail_url,description",
-            "filter": flt,
-        }
+        return flt
 
-        cv_response = self.get_cv_content(self.api_base_url + "/issues", params)
+    def filter_issue_list(self, issue_list, issue_number, year):
+        """Picks out the issues that the issue_number and cover_date parts of build_issue_filter would
 
-        current_result_count = cv_response["number_of_page_results"]
-        total_result_count = cv_response["number_of_total_results"]
+        The rules are the server's, so a split result can be cached under that filter: the issue
+        number matches as given, and the cover date is in the inclusive range {year}-1-1 to {year+1}-1-1.
+        """
+        int_year = utils.xlate(year, True)
+        if int_year is not None:
+            first_date = (int_year, 1, 1)
+            last_date = (int_year + 1, 1, 1)
 
-        filtered_issues_result = cv_response["results"]
-        page = 1
-        offset = 0
+        filtered_issues_result = []
+        for issue in issue_list:
+            if issue["issue_number"] != issue_number:
+                continue
+            if int_year is not None:
+                day, month, cover_year = self.parse_date_str(issue["cover_date"])
+                if cover_year is None or not first_date <= (cover_year, month or 1, day or 1) <= last_date:
+                    continue
+            filtered_issues_result.append(issue)
 
-        # see if we need to keep asking for more pages...
-        while current_result_count < total_result_count:
-            page += 1
-            offset += cv_response["number_of_page_results"]
+        return filtered_issues_result
+
+    def fetch_cached_issues_by_volume_issue_num_and_year(self, volume_id_list, issue_number, year):
+        """Answers the issue query from cached volume issue lists.  Every volume must be cached."""
+        cvc = ComicVineCacher()
 
-            params["offset"] = offset
-            cv_response = self.get_cv_content(self.api_base_url + "/issues/", params)
+        filtered_issues_result = []
+        missing = []
+        for vid in volume_id_list:
+            volume = cvc.get_volume_info(vid)
+            volume_issues = cvc.get_volume_issues_info(vid)
+            if volume is None or volume_issues is None:
+                missing.append(vid)
+                continue
+            for issue in self.filter_issue_list(volume_issues, issue_number, year):
+                issue["volume"] = {"id": volume["id"], "name": volume["name"]}
+                filtered_issues_result.append(issue)
+
+        if len(missing) > 0:
+            # a partial answer could pick the wrong volume, so fetch all missing lists in the online pass
+            for vid in missing:
+                OfflineQueue().record("fetch_volume_data", vid)
+                OfflineQueue().record("fetch_issues_by_volume", vid)
+            raise ComicVineTalkerException(
+                ComicVineTalkerException.Offline, f"Offline mode: {len(missing)} volume(s) are not in the cache"
+            )
+
+        return filtered_issues_result
+
+    def fetch_issues_by_volume_issue_num_and_year(self, volume_id_list, issue_number, year, refresh_cache=False):
+        flt = self.build_issue_filter(volume_id_list, issue_number, year)
+
+        # the filter describes the whole query, so it doubles as the cache key
+        cvc = ComicVineCacher()
+        if not refresh_cache:
+            cached_issues_result = cvc.get_issue_search_results(flt)
 
-            filtered_issues_result.extend(cv_response["results"])
-            current_result_count += cv_response["number_of_page_results"]
+            if cached_issues_result is not None:
+                if cvc.stale:
+                    self.revalidate_in_background(
+                        "fetch_issues_by_volume_issue_num_and_year", volume_id_list, issue_number, year
+                    )
+                return cached_issues_result
 
-        self.repair_urls(filtered_issues_result)
+        if ComicVineTalker.offline:
+            return self.fetch_cached_issues_by_volume_issue_num_and_year(volume_id_list, issue_number, year)
+
+        filtered_issues_result = self.fetch_issue_list(flt)
+
+        cvc.add_issue_search_results(flt, filtered_issues_result)
+
+        return filtered_issues_result
+
+    def fetch_issues_by_volume_and_issue_num_list(self, volume_id_list, queries):
+        """Answers several (issue_number, year) queries on the same volumes with one (paginated) query
+
+        No cover date filter is applied, the result is split per query and
+        cached the way fetch_issues_by_volume_issue_num_and_year caches it, so
+        a replayed offline queue entry fills the cache too.  Returns the issues
+        of all the queries.
+        """
+        self.check_offline("fetch_issues_by_volume_and_issue_num_list", volume_id_list, queries)
+
+        issue_number_list = sorted({issue_number for issue_number, _ in queries})
+        volume_filter = ""
+        for vid in volume_id_list:
+            volume_filter += str(vid) + "|"
+        issue_list = self.fetch_issue_list(f"volume:{volume_filter},issue_number:{'|'.join(issue_number_list)}")
+
+        filtered_issues_result = []
+        for issue_number, year in queries:
+            filtered_issues_result.extend(
+                self.cache_issues_by_volume_issue_num_and_year(volume_id_list, issue_number, year, issue_list)
+            )
+        return filtered_issues_result
+
+    def cache_issues_by_volume_issue_num_and_year(self, volume_id_list, issue_number, year, issue_list):
+        """Caches the part of a wider issue list that answers one fetch_issues_by_volume_issue_num_and_year query"""
+        filtered_issues_result = self.filter_issue_list(issue_list, issue_number, year)
+
+        cvc = ComicVineCacher()
+        cvc.add_issue_search_results(
+            self.build_issue_filter(volume_id_list, issue_number, year), filtered_issues_result
+        )
 
         return filtered_issues_result
 
+    def is_issue_query_cached(self, volume_id_list, issue_number, year):
+        cvc = ComicVineCacher()
+        return cvc.get_issue_search_results(self.build_issue_filter(volume_id_list, issue_number, year)) is not None
+
     def fetch_issue_data(self, series_id, issue_number, settings):
 
         volume_results = self.fetch_volume_data(series_id)
-        issues_list_results = self.fetch_issues_by_volume(series_id)
-
-        found = False
-        f_record = None
-        for record in issues_list_results:
-            if IssueString(issue_number).as_string() is None:
-                issue_number = 1
-            if IssueString(record["issue_number"]).as_string().lower() == IssueString(issue_number).as_string().lower():
-                found = True
-                f_record = record
-                break
-
-        if found:
-            issue_url = self.api_base_url + "/issue/" + CVTypeID.Issue + "-" + str(f_record["id"])
-            params = {"api_key": self.api_key, "format": "json"}
-            cv_response = self.get_cv_content(issue_url, params)
-            issue_results = cv_response["results"]
 
-        else:
+        records = self.get_issue_index(series_id).get(issue_key(issue_number))
+        if not records:
             return None
+        issue_results = self.fetch_issue_details(records[0]["id"])
 
         # Now, map the Comic Vine data to generic metadata
         return self.map_cv_data_to_metadata(volume_results, issue_results, settings)
 
-    def fetch_issue_data_by_issue_id(self, issue_id, settings):
+    def fetch_issue_details(self, issue_id, refresh_cache=False):
+
+        # before we search online, look in our cache, since we might already have this info
+        cvc = ComicVineCacher()
+        if not refresh_cache:
+            cached_issue_results = cvc.get_issue_details(issue_id)
+
+            if cached_issue_results is not None:
+                if cvc.stale:
+                    self.revalidate_in_background("fetch_issue_details", issue_id)
+                return cached_issue_results
+
+        self.check_offline("fetch_issue_details", issue_id)
 
         issue_url = self.api_base_url + "/issue/" + CVTypeID.Issue + "-" + str(issue_id)
         params = {"api_key": self.api_key, "format": "json"}
@@ -452,6 +652,14 @@ class ComicVineTalker:
 
         issue_results = cv_response["results"]
 
+        cvc.add_issue_details(issue_id, issue_results)
+
+        return issue_results
+
+    def fetch_issue_data_by_issue_id(self, issue_id, settings):
+
+        issue_results = self.fetch_issue_details(issue_id)
+
         volume_results = self.fetch_volume_data(issue_results["volume"]["id"])
 
         # Now, map the Comic Vine data to generic metadata
@@ -466,7 +674,7 @@ class ComicVineTalker:
         metadata.is_empty = False
 
         metadata.series = utils.xlate(issue_results["volume"]["name"])
-        metadata.issue = IssueString(issue_results["issue_number"]).as_string()
+        metadata.issue = normalize_issue(issue_results["issue_number"])
         metadata.title = utils.xlate(issue_results["name"])
 
         if volume_results["publisher"] is not None:
@@ -529,6 +737,8 @@ class ComicVineTalker:
 
         if string is None:
             return ""
+        from bs4 import BeautifulSoup
+
         # find any tables
         soup = BeautifulSoup(string, "html.parser")
         tables = soup.findAll("table")
@@ -627,6 +837,8 @@ class ComicVineTalker:
         if cached_details["image_url"] is not None:
             return cached_details
 
+        self.check_offline("fetch_issue_select_details", issue_id)
+
         issue_url = self.api_base_url + "/issue/" + CVTypeID.Issue + "-" + str(issue_id)
 
         params = {"api_key": self.api_key, "format": "json", "field_list": "image,cover_date,site_detail_url"}
@@ -665,12 +877,20 @@ class ComicVineTalker:
         cvc = ComicVineCacher()
         cvc.add_issue_select_details(issue_id, image_url, thumb_url, cover_date, page_url)
 
-    def fetch_alternate_cover_urls(self, issue_id, issue_page_url):
-        url_list = self.fetch_cached_alternate_cover_urls(issue_id)
-        if url_list is not None:
-            return url_list
+    def fetch_alternate_cover_urls(self, issue_id, issue_page_url, refresh_cache=False):
+        if not refresh_cache:
+            cvc = ComicVineCacher()
+            url_list = cvc.get_alt_covers(issue_id)
+            if url_list is not None:
+                if cvc.stale:
+                    self.revalidate_in_background("fetch_alternate_cover_urls", issue_id, issue_page_url)
+                return url_list
+
+        self.check_offline("fetch_alternate_cover_urls", issue_id, issue_page_url)
 
         # scrape the CV issue page URL to get the alternate cover URLs
+        import requests
+
         content = requests.get(issue_page_url, headers={"user-agent": "comictagger/" + ctversion.version}).text
         alt_cover_url_list = self.parse_out_alt_cover_urls(content)
 
@@ -680,6 +900,8 @@ class ComicVineTalker:
         return alt_cover_url_list
 
     def parse_out_alt_cover_urls(self, page_html):
+        from bs4 import BeautifulSoup
+
         soup = BeautifulSoup(page_html, "html.parser")
 
         alt_cover_url_list = []
@@ -727,6 +949,10 @@ class ComicVineTalker:
             self.url_fetch_complete(details["image_url"], details["thumb_image_url"])
             return
 
+        if ComicVineTalker.offline:
+            OfflineQueue().record("fetch_issue_select_details", issue_id)
+            return
+
         issue_url = (
             self.api_base_url
             + "/issue/"
@@ -738,6 +964,10 @@ class ComicVineTalker:
             + "&format=json&field_list=image,cover_date,site_detail_url"
         )
 
+        from PyQt5 import QtCore, QtNetwork
+
+        if self.nam is None:
+            self.nam = QtNetwork.QNetworkAccessManager()
         self.nam.finished.connect(self.async_fetch_issue_cover_url_complete)
         self.nam.get(QtNetwork.QNetworkRequest(QtCore.QUrl(issue_url)))
 
@@ -772,6 +1002,14 @@ class ComicVineTalker:
             self.alt_url_list_fetch_complete(url_list)
             return
 
+        if ComicVineTalker.offline:
+            OfflineQueue().record("fetch_alternate_cover_urls", issue_id, issue_page_url)
+            return
+
+        from PyQt5 import QtCore, QtNetwork
+
+        if self.nam is None:
+            self.nam = QtNetwork.QNetworkAccessManager()
         self.nam.finished.connect(self.async_fetch_alternate_cover_urls_complete)
         self.nam.get(QtNetwork.QNetworkRequest(QtCore.QUrl(str(issue_page_url))))
 
@@ -29,7 +29,7 @@ from comictaggerlib.imagefetcher import ImageFetcher
 from comictaggerlib.imagepopup import ImagePopup
 from comictaggerlib.pageloader import PageLoader
 from comictaggerlib.settings import ComicTaggerSettings
-from comictaggerlib.ui.qtutils import get_qimage_from_data, reduce_widget_font_size
+from comictaggerlib.ui.qtutils import get_qimage_from_data, get_scaled_pixmap, pixmap_cache, reduce_widget_font_size
 
 logger = logging.getLogger(__name__)
 
@@ -58,7 +58,7 @@ def clickable(widget):
 class Signal(QtCore.QObject):
     alt_url_list_fetch_complete = QtCore.pyqtSignal(list)
     url_fetch_complete = QtCore.pyqtSignal(str, str)
-    image_fetch_complete = QtCore.pyqtSignal(QtCore.QByteArray)
+    image_fetch_complete = QtCore.pyqtSignal(str, QtCore.QByteArray)
 
     def __init__(self, list_fetch, url_fetch, image_fetch):
         super().__init__()
@@ -72,8 +72,8 @@ class Signal(QtCore.QObject):
     def emit_url(self, image_url: str, thumb_url: str):
         self.url_fetch_complete.emit(image_url, thumb_url)
 
-    def emit_image(self, image_data: QtCore.QByteArray):
-        self.image_fetch_complete.emit(image_data)
+    def emit_image(self, image_url: str, image_data: QtCore.QByteArray):
+        self.image_fetch_complete.emit(image_url, image_data)
 
 
 class CoverImageWidget(QtWidgets.QWidget):
@@ -95,14 +95,22 @@ class CoverImageWidget(QtWidgets.QWidget):
 
         self.mode = mode
         self.page_loader = None
+        # set by windows that decode pages ahead of time, see PageDecoder
+        self.page_decoder = None
         self.showControls = True
 
         self.current_pixmap = QtGui.QPixmap()
+        # where current_pixmap came from (a URL or an archive page), for the pixmap cache
+        self.current_source = None
+        self.pending_url = None
+        self.popup = None
 
         self.comic_archive = None
         self.issue_id = None
         self.cover_fetcher = None
         self.url_list = []
+        # thumbnail URLs by full image URL, where known
+        self.thumb_urls = {}
         if self.page_loader is not None:
             self.page_loader.abandoned = True
         self.page_loader = None
@@ -126,7 +134,10 @@ class CoverImageWidget(QtWidgets.QWidget):
         self.comic_archive = None
         self.issue_id = None
         self.cover_fetcher = None
+        self.pending_url = None
         self.url_list = []
+        # thumbnail URLs by full image URL, where known
+        self.thumb_urls = {}
         if self.page_loader is not None:
             self.page_loader.abandoned = True
         self.page_loader = None
@@ -158,12 +169,14 @@ class CoverImageWidget(QtWidgets.QWidget):
             self.imageCount = ca.get_number_of_pages()
             self.update_content()
 
-    def set_url(self, url):
+    def set_url(self, url, thumb_url=None):
         if self.mode == CoverImageWidget.URLMode:
             self.reset_widget()
             self.update_content()
 
             self.url_list = [url]
+            if thumb_url:
+                self.thumb_urls[url] = thumb_url
             self.imageIndex = 0
             self.imageCount = 1
             self.update_content()
@@ -192,6 +205,8 @@ class CoverImageWidget(QtWidgets.QWidget):
 
     def primary_url_fetch_complete(self, primary_url, thumb_url):
         self.url_list.append(str(primary_url))
+        if thumb_url:
+            self.thumb_urls[str(primary_url)] = str(thumb_url)
         self.imageIndex = 0
         self.imageCount = len(self.url_list)
         self.update_content()
@@ -231,7 +246,7 @@ class CoverImageWidget(QtWidgets.QWidget):
         elif self.mode in [CoverImageWidget.AltCoverMode, CoverImageWidget.URLMode]:
             self.load_url()
         elif self.mode == CoverImageWidget.DataMode:
-            self.cover_remote_fetch_complete(self.imageData)
+            self.set_pixmap_from_data(None, self.imageData)
         else:
             self.load_page()
 
@@ -261,46 +276,136 @@ class CoverImageWidget(QtWidgets.QWidget):
             self.label.setText(f"Page {self.imageIndex + 1} (of {self.imageCount})")
 
     def load_url(self):
+        """Shows the thumbnail first when there is one, and the full image once it's needed"""
+        url = self.url_list[self.imageIndex]
+        if self.load_cached_pixmap(url):
+            return
+
+        thumb_url = self.thumb_urls.get(url)
+        if thumb_url is not None and self.load_cached_pixmap(thumb_url):
+            self.load_full_image_if_needed()
+            return
+
         self.load_default()
+        self.fetch_image(thumb_url or url)
+
+    def fetch_image(self, url):
+        self.pending_url = url
         self.cover_fetcher = ImageFetcher()
-        self.cover_fetcher.image_fetch_complete = self.sig.emit_image
-        self.cover_fetcher.fetch(self.url_list[self.imageIndex])
+        self.cover_fetcher.image_fetch_complete = lambda image_data: self.sig.emit_image(url, image_data)
+        self.cover_fetcher.fetch(url)
+
+    def get_current_url(self):
+        if self.mode not in [CoverImageWidget.AltCoverMode, CoverImageWidget.URLMode] or self.imageIndex == -1:
+            return None
+        return self.url_list[self.imageIndex]
+
+    def showing_thumbnail(self):
+        url = self.get_current_url()
+        return url is not None and url in self.thumb_urls and self.current_source == self.thumb_urls[url]
+
+    def load_full_image_if_needed(self):
+        """Swaps the thumbnail for the full image when the thumbnail would have to be stretched"""
+        url = self.get_current_url()
+        if not self.showing_thumbnail() or self.pending_url == url:
+            return
+        if (
+            self.current_pixmap.width() >= self.frame.width() - 4
+            or self.current_pixmap.height() >= self.frame.height() - 4
+        ):
+            return
+        if not self.load_cached_pixmap(url):
+            self.fetch_image(url)
 
     # called when the image is done loading from internet
-    def cover_remote_fetch_complete(self, image_data):
+    def cover_remote_fetch_complete(self, image_url, image_data):
+        if image_url == self.pending_url:
+            self.pending_url = None
+
+        # ignore anything that arrives after the user has moved on, or a thumbnail after the full image
+        url = self.get_current_url()
+        if url is None or image_url not in [url, self.thumb_urls.get(url)]:
+            return
+        if image_url != url and self.current_source == url:
+            return
+
+        self.set_pixmap_from_data(image_url, image_data)
+        self.load_full_image_if_needed()
+
+        # the popup opened with the thumbnail, it gets the full image when it arrives
+        if image_url == url and self.popup is not None and self.popup.isVisible():
+            self.popup.set_image_pixmap(self.current_pixmap)
+
+    def load_cached_pixmap(self, source):
+        pixmap = pixmap_cache.get((source, None))
+        if pixmap is None:
+            return False
+        self.current_pixmap = pixmap
+        self.current_source = source
+        self.set_display_pixmap()
+        return True
+
+    def set_pixmap_from_data(self, source, image_data):
         img = get_qimage_from_data(image_data)
         self.current_pixmap = QtGui.QPixmap.fromImage(img)
+        self.current_source = source
+        if source is not None:
+            pixmap_cache.put((source, None), self.current_pixmap)
         self.set_display_pixmap()
 
+    def set_page_decoder(self, page_decoder):
+        self.page_decoder = page_decoder
+        self.page_decoder.pageDecoded.connect(self.page_decoded)
+
     def load_page(self):
         if self.comic_archive is not None:
             if self.page_loader is not None:
                 self.page_loader.abandoned = True
+            self.page_loader = None
+            source = (self.comic_archive.path, self.imageIndex)
+            if self.load_cached_pixmap(source):
+                return
+            if self.page_decoder is not None and self.page_decoder.ca is self.comic_archive:
+                size = self.get_display_size()
+                scaled_pixmap = pixmap_cache.get((source, size))
+                if scaled_pixmap is not None:
+                    # a prefetched page, show it scaled until the full size one is decoded
+                    self.current_pixmap = scaled_pixmap
+                    self.current_source = None
+                    self.set_display_pixmap()
+                self.page_decoder.decode(self.imageIndex, size, full=True)
+                return
             self.page_loader = PageLoader(self.comic_archive, self.imageIndex)
             self.page_loader.loadComplete.connect(self.page_load_complete)
             self.page_loader.start()
 
+    def page_decoded(self, page_num):
+        if (
+            self.mode == CoverImageWidget.ArchiveMode
+            and self.page_decoder.ca is self.comic_archive
+            and page_num == self.imageIndex
+        ):
+            self.load_cached_pixmap(self.page_decoder.get_source(page_num))
+
     def page_load_complete(self, image_data):
-        img = get_qimage_from_data(image_data)
-        self.current_pixmap = QtGui.QPixmap.fromImage(img)
-        self.set_display_pixmap()
+        self.set_pixmap_from_data((self.page_loader.ca.path, self.page_loader.page_num), image_data)
         self.page_loader = None
 
     def load_default(self):
         self.current_pixmap = QtGui.QPixmap(ComicTaggerSettings.get_graphic("nocover.png"))
+        self.current_source = None
         self.set_display_pixmap()
 
     def resizeEvent(self, resize_event):
         if self.current_pixmap is not None:
             self.set_display_pixmap()
+            self.load_full_image_if_needed()
 
-    def set_display_pixmap(self):
+    def get_display_size(self):
         """The deltas let us know what the new width and height of the label will be"""
 
         new_h = self.frame.height()
         new_w = self.frame.width()
-        frame_w = self.frame.width()
-        frame_h = self.frame.height()
 
         new_h -= 4
         new_w -= 4
@@ -308,8 +413,15 @@ class CoverImageWidget(QtWidgets.QWidget):
         new_h = max(new_h, 0)
         new_w = max(new_w, 0)
 
+        return new_w, new_h
+
+    def set_display_pixmap(self):
+        frame_w = self.frame.width()
+        frame_h = self.frame.height()
+        new_w, new_h = self.get_display_size()
+
         # scale the pixmap to fit in the frame
-        scaled_pixmap = self.current_pixmap.scaled(new_w, new_h, QtCore.Qt.AspectRatioMode.KeepAspectRatio)
+        scaled_pixmap = get_scaled_pixmap(self.current_source, self.current_pixmap, new_w, new_h)
         self.lblImage.setPixmap(scaled_pixmap)
 
         # move and resize the label to be centered in the fame
@@ -319,4 +431,13 @@ class CoverImageWidget(QtWidgets.QWidget):
         self.lblImage.move(int((frame_w - img_w) / 2), int((frame_h - img_h) / 2))
 
     def show_popup(self):
-        ImagePopup(self, self.current_pixmap)
+        # the popup is shown full size, so fetch the full image and show what we have until it arrives
+        url = self.get_current_url()
+        if (
+            url is not None
+            and self.current_source != url
+            and not self.load_cached_pixmap(url)
+            and self.pending_url != url
+        ):
+            self.fetch_image(url)
+        self.popup = ImagePopup(self, self.current_pixmap)
@@ -0,0 +1 @@
+version = "1.4.0"
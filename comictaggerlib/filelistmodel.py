@@ -0,0 +1,253 @@
+"""A Qt table model for the list of comic archive files"""
+
+# Copyright 2012-2014 Anthony Beville
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#     http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import array
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from PyQt5 import QtCore
+
+from comicapi.comicarchive import ComicArchive
+from comictaggerlib.memorycache import MemoryCache
+from comictaggerlib.settings import ComicTaggerSettings
+
+logger = logging.getLogger(__name__)
+
+
+class FileListModel(QtCore.QAbstractTableModel):
+    """Keeps one entry per archive in a few parallel columns, instead of an object per cell
+
+    Only the path, archive type and read-only flag are stored up front.
+    Whether an archive has ComicRack or ComicBookLover tags is read on a
+    worker thread the first time its row is shown.  ComicArchive objects are
+    made when asked for, and the most recently used are kept around.
+    """
+
+    flagsLoaded = QtCore.pyqtSignal(str, bool, bool)
+
+    fileColNum = 0
+    CRFlagColNum = 1
+    CBLFlagColNum = 2
+    typeColNum = 3
+    readonlyColNum = 4
+    folderColNum = 5
+
+    columns = [
+        ("File", "File Name"),
+        ("CR", "Has ComicRack Tags"),
+        ("CBL", "Has ComicBookLover Tags"),
+        ("Type", "Archive Type"),
+        ("R/O", "Read-Only"),
+        ("Folder", "File Location"),
+    ]
+
+    type_names = {
+        ComicArchive.ArchiveType.SevenZip: "7Z",
+        ComicArchive.ArchiveType.Zip: "ZIP",
+        ComicArchive.ArchiveType.Rar: "RAR",
+    }
+
+    # flag values in the tag columns
+    Unknown = -1
+
+    max_loader_workers = 2
+
+    def __init__(self, settings):
+        super().__init__()
+        self.settings = settings
+
+        self.paths = []
+        self.archive_types = array.array("b")
+        self.readonly = array.array("b")
+        self.has_cix = array.array("b")
+        self.has_cbi = array.array("b")
+
+        # row of every archive, by path
+        self.path_index = {}
+
+        self.archive_cache = MemoryCache(200, lambda ca: 1)
+
+        self.loader = ThreadPoolExecutor(max_workers=FileListModel.max_loader_workers)
+        self.loading = set()
+        self.flagsLoaded.connect(self.flags_loaded)
+
+    def rowCount(self, parent=QtCore.QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self.paths)
+
+    def columnCount(self, parent=QtCore.QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(FileListModel.columns)
+
+    def headerData(self, section, orientation, role=QtCore.Qt.ItemDataRole.DisplayRole):
+        if orientation != QtCore.Qt.Orientation.Horizontal:
+            return None
+        if role == QtCore.Qt.ItemDataRole.DisplayRole:
+            return FileListModel.columns[section][0]
+        if role == QtCore.Qt.ItemDataRole.ToolTipRole:
+            return FileListModel.columns[section][1]
+        return None
+
+    def flags(self, index):
+        return QtCore.Qt.ItemFlag.ItemIsSelectable | QtCore.Qt.ItemFlag.ItemIsEnabled
+
+    def data(self, index, role=QtCore.Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        row = index.row()
+        col = index.column()
+
+        if col in [FileListModel.CRFlagColNum, FileListModel.CBLFlagColNum, FileListModel.readonlyColNum]:
+            if col == FileListModel.CRFlagColNum:
+                flag = self.has_cix[row]
+            elif col == FileListModel.CBLFlagColNum:
+                flag = self.has_cbi[row]
+            else:
+                flag = self.readonly[row]
+
+            if role == QtCore.Qt.ItemDataRole.CheckStateRole:
+                if flag == FileListModel.Unknown:
+                    self.load_flags(row)
+                    return None
+                return QtCore.Qt.CheckState.Checked if flag else QtCore.Qt.CheckState.Unchecked
+            if role == QtCore.Qt.ItemDataRole.UserRole:
+                # sort key, rows not read yet sort with the untagged ones
+                return flag == 1
+            if role == QtCore.Qt.ItemDataRole.TextAlignmentRole:
+                return QtCore.Qt.AlignmentFlag.AlignHCenter
+            return None
+
+        if role in [
+            QtCore.Qt.ItemDataRole.DisplayRole,
+            QtCore.Qt.ItemDataRole.ToolTipRole,
+            QtCore.Qt.ItemDataRole.UserRole,
+        ]:
+            if col == FileListModel.fileColNum:
+                return os.path.split(self.paths[row])[1]
+            if col == FileListModel.folderColNum:
+                return os.path.split(self.paths[row])[0]
+            if col == FileListModel.typeColNum:
+                return FileListModel.type_names.get(self.archive_types[row], "")
+        return None
+
+    def get_row(self, path):
+        return self.path_index.get(path, -1)
+
+    def add_archives(self, ca_list):
+        """Adds rows for the archives that aren't listed already"""
+        new_archives = {}
+        for ca in ca_list:
+            if ca.path not in self.path_index:
+                new_archives.setdefault(ca.path, ca)
+        new_list = list(new_archives.values())
+        if len(new_list) == 0:
+            return
+
+        first = len(self.paths)
+        self.beginInsertRows(QtCore.QModelIndex(), first, first + len(new_list) - 1)
+        for ca in new_list:
+            self.path_index[ca.path] = len(self.paths)
+            self.paths.append(ca.path)
+            self.archive_types.append(ca.archive_type)
+            self.readonly.append(not ca.is_writable())
+            # the scanner may have read these already
+            self.has_cix.append(FileListModel.Unknown if ca.has__cix is None else ca.has__cix)
+            self.has_cbi.append(FileListModel.Unknown if ca.has__cbi is None else ca.has__cbi)
+            self.archive_cache.put(ca.path, ca)
+        self.endInsertRows()
+
+    def remove_rows(self, row_list):
+        """Removes the given rows, in as few blocks as possible"""
+        row_list = sorted(set(row_list), reverse=True)
+        i = 0
+        while i < len(row_list):
+            # find the run of consecutive rows ending at the highest one left, and remove it in one go
+            last = row_list[i]
+            first = last
+            i += 1
+            while i < len(row_list) and row_list[i] == first - 1:
+                first = row_list[i]
+                i += 1
+
+            self.beginRemoveRows(QtCore.QModelIndex(), first, last)
+            for path in self.paths[first : last + 1]:
+                del self.path_index[path]
+                self.archive_cache.remove(path)
+            del self.paths[first : last + 1]
+            del self.archive_types[first : last + 1]
+            del self.readonly[first : last + 1]
+            del self.has_cix[first : last + 1]
+            del self.has_cbi[first : last + 1]
+            self.endRemoveRows()
+
+        self.path_index = {path: row for row, path in enumerate(self.paths)}
+
+    def get_archive(self, row) -> ComicArchive:
+        path = self.paths[row]
+        ca = self.archive_cache.get(path)
+        if ca is None:
+            ca = ComicArchive(path, self.settings.rar_exe_path, ComicTaggerSettings.get_graphic("nocover.png"))
+            self.archive_cache.put(path, ca)
+        return ca
+
+    def update_row(self, row, ca=None):
+        """Re-reads the row from its archive, ca is the archive when it may have been renamed"""
+        if ca is None:
+            ca = self.get_archive(row)
+
+        old_path = self.paths[row]
+        if ca.path != old_path:
+            # the archive was renamed, the File and Folder columns change with the path
+            del self.path_index[old_path]
+            self.archive_cache.remove(old_path)
+            self.paths[row] = ca.path
+            self.path_index[ca.path] = row
+            self.archive_cache.put(ca.path, ca)
+
+        # this also puts the tags into the ComicArchive's cache
+        ca.load_all_metadata()
+        self.readonly[row] = not ca.is_writable()
+        self.has_cix[row] = ca.has_cix()
+        self.has_cbi[row] = ca.has_cbi()
+
+        self.dataChanged.emit(self.index(row, 0), self.index(row, self.columnCount() - 1))
+
+    def load_flags(self, row):
+        path = self.paths[row]
+        if path in self.loading:
+            return
+        self.loading.add(path)
+        self.loader.submit(self.read_flags, path)
+
+    def read_flags(self, path):
+        try:
+            ca = ComicArchive(path, self.settings.rar_exe_path, ComicTaggerSettings.get_graphic("nocover.png"))
+            self.flagsLoaded.emit(path, ca.has_cix(), ca.has_cbi())
+        except Exception:
+            logger.exception("Failed to read the tags of %s", path)
+            self.flagsLoaded.emit(path, False, False)
+
+    def flags_loaded(self, path, has_cix, has_cbi):
+        self.loading.discard(path)
+        row = self.get_row(path)
+        if row == -1:
+            return
+        self.has_cix[row] = has_cix
+        self.has_cbi[row] = has_cbi
+        self.dataChanged.emit(self.index(row, FileListModel.CRFlagColNum), self.index(row, FileListModel.CBLFlagColNum))
@@ -0,0 +1,92 @@
+"""A thread to find and open comic archives in the background"""
+
+# Copyright 2012-2014 Anthony Beville
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#     http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from PyQt5 import QtCore
+
+from comicapi import utils
+from comicapi.comicarchive import ComicArchive
+from comictaggerlib.settings import ComicTaggerSettings
+
+logger = logging.getLogger(__name__)
+
+
+class FileScanner(QtCore.QThread):
+    """Walks the given paths and opens every file on a worker pool
+
+    The comic archives found are handed to the GUI thread in batches through
+    archivesScanned, in the order the files were listed.
+    """
+
+    filesFound = QtCore.pyqtSignal(int)
+    archivesScanned = QtCore.pyqtSignal(list, int)
+
+    max_workers = 4
+    batch_size = 200
+    # seconds between batches, so a slow scan still shows progress
+    batch_interval = 0.25
+
+    def __init__(self, path_list, rar_exe_path):
+        super().__init__()
+        self.path_list = path_list
+        self.rar_exe_path = rar_exe_path
+        self.canceled = False
+
+    def cancel(self):
+        self.canceled = True
+
+    def scan_file(self, path):
+        if self.canceled:
+            return None
+
+        ca = ComicArchive(path, self.rar_exe_path, ComicTaggerSettings.get_graphic("nocover.png"))
+        if not ca.seems_to_be_a_comic_archive():
+            return None
+        return ca
+
+    def run(self):
+        file_list = [os.path.abspath(str(f)) for f in utils.get_recursive_filelist(self.path_list)]
+        self.filesFound.emit(len(file_list))
+
+        batch = []
+        last_batch_time = time.time()
+        with ThreadPoolExecutor(max_workers=FileScanner.max_workers) as executor:
+            futures = [executor.submit(self.scan_file, path) for path in file_list]
+            for count, future in enumerate(futures):
+                if self.canceled:
+                    for f in futures:
+                        f.cancel()
+                    break
+
+                try:
+                    ca = future.result()
+                except Exception:
+                    logger.exception("Failed to scan %s", file_list[count])
+                    ca = None
+                if ca is not None:
+                    batch.append(ca)
+
+                if len(batch) >= FileScanner.batch_size or time.time() - last_batch_time > FileScanner.batch_interval:
+                    self.archivesScanned.emit(batch, count + 1)
+                    batch = []
+                    last_batch_time = time.time()
+
+            else:
+                self.archivesScanned.emit(batch, len(file_list))
@@ -20,19 +20,15 @@ from typing import List
 
 from PyQt5 import QtCore, QtWidgets, uic
 
-from comicapi import utils
 from comicapi.comicarchive import ComicArchive
+from comictaggerlib.filelistmodel import FileListModel
+from comictaggerlib.filescanner import FileScanner
 from comictaggerlib.settings import ComicTaggerSettings
 from comictaggerlib.ui.qtutils import center_window_on_parent, reduce_widget_font_size
 
 logger = logging.getLogger(__name__)
 
 
-class FileTableWidgetItem(QtWidgets.QTableWidgetItem):
-    def __lt__(self, other):
-        return self.data(QtCore.Qt.ItemDataRole.UserRole) < other.data(QtCore.Qt.ItemDataRole.UserRole)
-
-
 class FileInfo:
     def __init__(self, ca: ComicArchive):
         self.ca: ComicArchive = ca
@@ -42,13 +38,12 @@ class FileSelectionList(QtWidgets.QWidget):
     selectionChanged = QtCore.pyqtSignal(QtCore.QVariant)
     listCleared = QtCore.pyqtSignal()
 
-    fileColNum = 0
-    CRFlagColNum = 1
-    CBLFlagColNum = 2
-    typeColNum = 3
-    readonlyColNum = 4
-    folderColNum = 5
-    dataColNum = fileColNum
+    fileColNum = FileListModel.fileColNum
+    CRFlagColNum = FileListModel.CRFlagColNum
+    CBLFlagColNum = FileListModel.CBLFlagColNum
+    typeColNum = FileListModel.typeColNum
+    readonlyColNum = FileListModel.readonlyColNum
+    folderColNum = FileListModel.folderColNum
 
     def __init__(self, parent, settings, dirty_flag_verification):
         super().__init__(parent)
@@ -59,10 +54,19 @@ class FileSelectionList(QtWidgets.QWidget):
 
         reduce_widget_font_size(self.twList)
 
-        self.twList.setColumnCount(6)
-        self.twList.currentItemChanged.connect(self.current_item_changed_cb)
+        # rows are kept in the model in the order they were added, the proxy sorts and filters them
+        self.model = FileListModel(settings)
+        self.proxy_model = QtCore.QSortFilterProxyModel(self)
+        self.proxy_model.setSourceModel(self.model)
+        self.proxy_model.setSortRole(QtCore.Qt.ItemDataRole.UserRole)
+        self.proxy_model.setFilterKeyColumn(FileSelectionList.fileColNum)
+        self.proxy_model.setFilterCaseSensitivity(QtCore.Qt.CaseSensitivity.CaseInsensitive)
+        self.twList.setModel(self.proxy_model)
+        self.twList.setSortingEnabled(True)
+        self.twList.verticalHeader().setDefaultSectionSize(self.twList.fontMetrics().height() + 6)
+        self.twList.selectionModel().currentRowChanged.connect(self.current_item_changed_cb)
+        self.leFilter.textChanged.connect(self.proxy_model.setFilterFixedString)
 
-        self.currentItem = None
         self.setContextMenuPolicy(QtCore.Qt.ContextMenuPolicy.ActionsContextMenu)
         self.dirty_flag = False
 
@@ -83,6 +87,12 @@ class FileSelectionList(QtWidgets.QWidget):
 
         self.dirty_flag_verification = dirty_flag_verification
 
+        self.scanner = None
+        self.scan_queue = []
+        self.scan_progdialog = None
+        self.scan_path_list = []
+        self.scan_first_added = None
+
     def get_sorting(self) -> (int, int):
         col = self.twList.horizontalHeader().sortIndicatorSection()
         order = self.twList.horizontalHeader().sortIndicatorOrder()
@@ -98,106 +108,118 @@ class FileSelectionList(QtWidgets.QWidget):
         self.dirty_flag = modified
 
     def select_all(self):
-        self.twList.setRangeSelected(QtWidgets.QTableWidgetSelectionRange(0, 0, self.twList.rowCount() - 1, 5), True)
+        self.twList.selectAll()
 
     def deselect_all(self):
-        self.twList.setRangeSelected(QtWidgets.QTableWidgetSelectionRange(0, 0, self.twList.rowCount() - 1, 5), False)
+        self.twList.clearSelection()
+
+    def get_model_row(self, row):
+        """Maps a row of the view to the row in the model"""
+        return self.proxy_model.mapToSource(self.proxy_model.index(row, 0)).row()
+
+    def get_view_row(self, model_row):
+        if model_row == -1:
+            return -1
+        return self.proxy_model.mapFromSource(self.model.index(model_row, 0)).row()
+
+    def get_selected_model_rows(self):
+        """Returns the model rows of the selection, in the order they are shown"""
+        index_list = sorted(self.twList.selectionModel().selectedRows(), key=lambda index: index.row())
+        return [self.proxy_model.mapToSource(index).row() for index in index_list]
 
     def remove_archive_list(self, ca_list):
-        self.twList.setSortingEnabled(False)
-        for ca in ca_list:
-            for row in range(self.twList.rowCount()):
-                row_ca = self.get_archive_by_row(row)
-                if row_ca == ca:
-                    self.twList.removeRow(row)
-                    break
-        self.twList.setSortingEnabled(True)
+        row_list = [self.model.get_row(ca.path) for ca in ca_list]
+        self.model.remove_rows([row for row in row_list if row != -1])
 
     def get_archive_by_row(self, row):
-        fi = self.twList.item(row, FileSelectionList.dataColNum).data(QtCore.Qt.ItemDataRole.UserRole)
-        return fi.ca
+        return self.model.get_archive(self.get_model_row(row))
 
     def get_current_archive(self):
-        return self.get_archive_by_row(self.twList.currentRow())
+        return self.get_archive_by_row(self.twList.currentIndex().row())
 
     def remove_selection(self):
-        row_list = []
-        for item in self.twList.selectedItems():
-            if item.column() == 0:
-                row_list.append(item.row())
+        row_list = self.get_selected_model_rows()
 
         if len(row_list) == 0:
             return
 
-        if self.twList.currentRow() in row_list:
+        if self.get_model_row(self.twList.currentIndex().row()) in row_list:
             if not self.dirty_flag_verification(
                 "Remove Archive", "If you close this archive, data in the form will be lost.  Are you sure?"
             ):
                 return
 
-        row_list.sort()
-        row_list.reverse()
+        self.twList.selectionModel().currentRowChanged.disconnect(self.current_item_changed_cb)
+        self.model.remove_rows(row_list)
+        self.twList.selectionModel().currentRowChanged.connect(self.current_item_changed_cb)
 
-        self.twList.currentItemChanged.disconnect(self.current_item_changed_cb)
-        self.twList.setSortingEnabled(False)
-
-        for i in row_list:
-            self.twList.removeRow(i)
-
-        self.twList.setSortingEnabled(True)
-        self.twList.currentItemChanged.connect(self.current_item_changed_cb)
-
-        if self.twList.rowCount() > 0:
+        if self.proxy_model.rowCount() > 0:
             # since on a removal, we select row 0, make sure callback occurs if
             # we're already there
-            if self.twList.currentRow() == 0:
-                self.current_item_changed_cb(self.twList.currentItem(), None)
+            if self.twList.currentIndex().row() == 0:
+                self.current_item_changed_cb(self.twList.currentIndex(), QtCore.QModelIndex())
             self.twList.selectRow(0)
         else:
             self.listCleared.emit()
 
     def add_path_list(self, pathlist):
+        """Scans the paths for comic archives in the background, adding rows as they are found"""
+        if self.scanner is not None:
+            # one scan at a time, the next one starts when this one is done
+            self.scan_queue.append(pathlist)
+            return
 
-        filelist = utils.get_recursive_filelist(pathlist)
-        # we now have a list of files to add
+        self.scan_path_list = pathlist
+        self.scan_first_added = None
 
         # Prog dialog on Linux flakes out for small range, so scale up
-        progdialog = QtWidgets.QProgressDialog("", "Cancel", 0, len(filelist), parent=self)
-        progdialog.setWindowTitle("Adding Files")
-        progdialog.setWindowModality(QtCore.Qt.WindowModality.ApplicationModal)
-        progdialog.setMinimumDuration(300)
-        center_window_on_parent(progdialog)
-
-        QtCore.QCoreApplication.processEvents()
-        first_added = None
-        self.twList.setSortingEnabled(False)
-        for idx, f in enumerate(filelist):
-            QtCore.QCoreApplication.processEvents()
-            if progdialog.wasCanceled():
-                break
-            progdialog.setValue(idx + 1)
-            progdialog.setLabelText(f)
-            center_window_on_parent(progdialog)
-            QtCore.QCoreApplication.processEvents()
-            row = self.add_path_item(f)
-            if first_added is None and row is not None:
-                first_added = row
-
-        progdialog.hide()
-        QtCore.QCoreApplication.processEvents()
-
-        if first_added is not None:
-            self.twList.selectRow(first_added)
+        self.scan_progdialog = QtWidgets.QProgressDialog("Looking for files...", "Cancel", 0, 0, parent=self)
+        self.scan_progdialog.setWindowTitle("Adding Files")
+        self.scan_progdialog.setWindowModality(QtCore.Qt.WindowModality.ApplicationModal)
+        self.scan_progdialog.setMinimumDuration(300)
+        center_window_on_parent(self.scan_progdialog)
+
+        # re-sorting after every batch would make adding files quadratic
+        self.proxy_model.setDynamicSortFilter(False)
+
+        self.scanner = FileScanner(pathlist, self.settings.rar_exe_path)
+        self.scanner.filesFound.connect(self.scan_files_found)
+        self.scanner.archivesScanned.connect(self.scan_archives_scanned)
+        self.scanner.finished.connect(self.scan_finished)
+        self.scan_progdialog.canceled.connect(self.scanner.cancel)
+        self.scanner.start()
+
+    def scan_files_found(self, count):
+        self.scan_progdialog.setMaximum(count)
+        self.scan_progdialog.setLabelText(f"Scanning {count} files...")
+
+    def scan_archives_scanned(self, ca_list, scanned_count):
+        if self.scan_first_added is None and len(ca_list) > 0:
+            self.scan_first_added = ca_list[0].path
+        self.model.add_archives(ca_list)
+        if not self.scan_progdialog.wasCanceled():
+            self.scan_progdialog.setValue(scanned_count)
+
+    def scan_finished(self):
+        self.scan_progdialog.hide()
+        self.scan_progdialog = None
+        self.scanner = None
+
+        self.proxy_model.setDynamicSortFilter(True)
+        self.proxy_model.sort(
+            self.twList.horizontalHeader().sortIndicatorSection(), self.twList.horizontalHeader().sortIndicatorOrder()
+        )
+
+        if self.scan_first_added is not None:
+            self.twList.selectRow(self.get_current_list_row(self.scan_first_added))
         else:
-            if len(pathlist) == 1 and os.path.isfile(pathlist[0]):
+            if len(self.scan_path_list) == 1 and os.path.isfile(self.scan_path_list[0]):
                 QtWidgets.QMessageBox.information(
                     self, "File Open", "Selected file doesn't seem to be a comic archive."
                 )
             else:
                 QtWidgets.QMessageBox.information(self, "File/Folder Open", "No readable comic archives were found.")
 
-        self.twList.setSortingEnabled(True)
-
         # Adjust column size
         self.twList.resizeColumnsToContents()
         self.twList.setColumnWidth(FileSelectionList.CRFlagColNum, 35)
@@ -209,175 +231,65 @@ class FileSelectionList(QtWidgets.QWidget):
         if self.twList.columnWidth(FileSelectionList.folderColNum) > 200:
             self.twList.setColumnWidth(FileSelectionList.folderColNum, 200)
 
-    def is_list_dupe(self, path):
-        r = 0
-        while r < self.twList.rowCount():
-            ca = self.get_archive_by_row(r)
-            if ca.path == path:
-                return True
-            r = r + 1
+        if len(self.scan_queue) > 0:
+            self.add_path_list(self.scan_queue.pop(0))
 
-        return False
+    def is_list_dupe(self, path):
+        return self.model.get_row(path) != -1
 
     def get_current_list_row(self, path):
-        r = 0
-        while r < self.twList.rowCount():
-            ca = self.get_archive_by_row(r)
-            if ca.path == path:
-                return r
-            r = r + 1
-
-        return -1
-
-    def add_path_item(self, path):
-        path = str(path)
-        path = os.path.abspath(path)
-        # print "processing", path
-
-        if self.is_list_dupe(path):
-            return self.get_current_list_row(path)
-
-        ca = ComicArchive(path, self.settings.rar_exe_path, ComicTaggerSettings.get_graphic("nocover.png"))
-
-        if ca.seems_to_be_a_comic_archive():
-            row = self.twList.rowCount()
-            self.twList.insertRow(row)
-
-            fi = FileInfo(ca)
-
-            filename_item = QtWidgets.QTableWidgetItem()
-            folder_item = QtWidgets.QTableWidgetItem()
-            cix_item = FileTableWidgetItem()
-            cbi_item = FileTableWidgetItem()
-            readonly_item = FileTableWidgetItem()
-            type_item = QtWidgets.QTableWidgetItem()
-
-            filename_item.setFlags(QtCore.Qt.ItemFlag.ItemIsSelectable | QtCore.Qt.ItemFlag.ItemIsEnabled)
-            filename_item.setData(QtCore.Qt.ItemDataRole.UserRole, fi)
-            self.twList.setItem(row, FileSelectionList.fileColNum, filename_item)
-
-            folder_item.setFlags(QtCore.Qt.ItemFlag.ItemIsSelectable | QtCore.Qt.ItemFlag.ItemIsEnabled)
-            self.twList.setItem(row, FileSelectionList.folderColNum, folder_item)
-
-            type_item.setFlags(QtCore.Qt.ItemFlag.ItemIsSelectable | QtCore.Qt.ItemFlag.ItemIsEnabled)
-            self.twList.setItem(row, FileSelectionList.typeColNum, type_item)
-
-            cix_item.setFlags(QtCore.Qt.ItemFlag.ItemIsSelectable | QtCore.Qt.ItemFlag.ItemIsEnabled)
-            cix_item.setTextAlignment(QtCore.Qt.AlignmentFlag.AlignHCenter)
-            self.twList.setItem(row, FileSelectionList.CRFlagColNum, cix_item)
-
-            cbi_item.setFlags(QtCore.Qt.ItemFlag.ItemIsSelectable | QtCore.Qt.ItemFlag.ItemIsEnabled)
-            cbi_item.setTextAlignment(QtCore.Qt.AlignmentFlag.AlignHCenter)
-            self.twList.setItem(row, FileSelectionList.CBLFlagColNum, cbi_item)
-
-            readonly_item.setFlags(QtCore.Qt.ItemFlag.ItemIsSelectable | QtCore.Qt.ItemFlag.ItemIsEnabled)
-            readonly_item.setTextAlignment(QtCore.Qt.AlignmentFlag.AlignHCenter)
-            self.twList.setItem(row, FileSelectionList.readonlyColNum, readonly_item)
-
-            self.update_row(row)
-
-            return row
-        return -1
+        return self.get_view_row(self.model.get_row(path))
 
     def update_row(self, row):
-        fi: FileInfo = self.twList.item(row, FileSelectionList.dataColNum).data(QtCore.Qt.ItemDataRole.UserRole)
-
-        filename_item = self.twList.item(row, FileSelectionList.fileColNum)
-        folder_item = self.twList.item(row, FileSelectionList.folderColNum)
-        cix_item = self.twList.item(row, FileSelectionList.CRFlagColNum)
-        cbi_item = self.twList.item(row, FileSelectionList.CBLFlagColNum)
-        type_item = self.twList.item(row, FileSelectionList.typeColNum)
-        readonly_item = self.twList.item(row, FileSelectionList.readonlyColNum)
-
-        item_text = os.path.split(fi.ca.path)[0]
-        folder_item.setText(item_text)
-        folder_item.setData(QtCore.Qt.ItemDataRole.ToolTipRole, item_text)
-
-        item_text = os.path.split(fi.ca.path)[1]
-        filename_item.setText(item_text)
-        filename_item.setData(QtCore.Qt.ItemDataRole.ToolTipRole, item_text)
-
-        if fi.ca.is_sevenzip():
-            item_text = "7Z"
-        elif fi.ca.is_zip():
-            item_text = "ZIP"
-        elif fi.ca.is_rar():
-            item_text = "RAR"
-        else:
-            item_text = ""
-        type_item.setText(item_text)
-        type_item.setData(QtCore.Qt.ItemDataRole.ToolTipRole, item_text)
-
-        if fi.ca.has_cix():
-            cix_item.setCheckState(QtCore.Qt.CheckState.Checked)
-            cix_item.setData(QtCore.Qt.ItemDataRole.UserRole, True)
-        else:
-            cix_item.setData(QtCore.Qt.ItemDataRole.UserRole, False)
-            cix_item.setCheckState(QtCore.Qt.CheckState.Unchecked)
-
-        if fi.ca.has_cbi():
-            cbi_item.setCheckState(QtCore.Qt.CheckState.Checked)
-            cbi_item.setData(QtCore.Qt.ItemDataRole.UserRole, True)
-        else:
-            cbi_item.setData(QtCore.Qt.ItemDataRole.UserRole, False)
-            cbi_item.setCheckState(QtCore.Qt.CheckState.Unchecked)
-
-        if not fi.ca.is_writable():
-            readonly_item.setCheckState(QtCore.Qt.CheckState.Checked)
-            readonly_item.setData(QtCore.Qt.ItemDataRole.UserRole, True)
-        else:
-            readonly_item.setData(QtCore.Qt.ItemDataRole.UserRole, False)
-            readonly_item.setCheckState(QtCore.Qt.CheckState.Unchecked)
-
-        # Reading these will force them into the ComicArchive's cache
-        fi.ca.read_cix()
-        fi.ca.has_cbi()
+        self.model.update_row(self.get_model_row(row))
 
     def get_selected_archive_list(self) -> List[ComicArchive]:
-        ca_list: List[ComicArchive] = []
-        for r in range(self.twList.rowCount()):
-            item = self.twList.item(r, FileSelectionList.dataColNum)
-            if item.isSelected():
-                fi: FileInfo = item.data(QtCore.Qt.ItemDataRole.UserRole)
-                ca_list.append(fi.ca)
-
-        return ca_list
+        return [self.model.get_archive(row) for row in self.get_selected_model_rows()]
 
     def update_current_row(self):
-        self.update_row(self.twList.currentRow())
+        self.update_row(self.twList.currentIndex().row())
 
     def update_selected_rows(self):
-        self.twList.setSortingEnabled(False)
-        for r in range(self.twList.rowCount()):
-            item = self.twList.item(r, FileSelectionList.dataColNum)
-            if item.isSelected():
-                self.update_row(r)
-        self.twList.setSortingEnabled(True)
+        for row in self.get_selected_model_rows():
+            self.model.update_row(row)
+
+    def update_renamed_archives(self, old_paths, ca_list):
+        """Updates the rows of archives that were renamed, found by the paths they had before"""
+        for old_path, ca in zip(old_paths, ca_list):
+            row = self.model.get_row(old_path)
+            if row != -1:
+                self.model.update_row(row, ca)
+
+    def update_archive_list(self, ca_list):
+        for ca in ca_list:
+            row = self.model.get_row(ca.path)
+            if row != -1:
+                self.model.update_row(row)
 
     def current_item_changed_cb(self, curr, prev):
 
         new_idx = curr.row()
         old_idx = -1
-        if prev is not None:
+        if prev.isValid():
             old_idx = prev.row()
 
-        if old_idx == new_idx:
+        if old_idx == new_idx or new_idx == -1:
             return
 
         # don't allow change if modified
-        if prev is not None and new_idx != old_idx:
+        if prev.isValid() and new_idx != old_idx:
             if not self.dirty_flag_verification(
                 "Change Archive", "If you change archives now, data in the form will be lost.  Are you sure?"
             ):
-                self.twList.currentItemChanged.disconnect(self.current_item_changed_cb)
-                self.twList.setCurrentItem(prev)
-                self.twList.currentItemChanged.connect(self.current_item_changed_cb)
+                self.twList.selectionModel().currentRowChanged.disconnect(self.current_item_changed_cb)
+                self.twList.setCurrentIndex(prev)
+                self.twList.selectionModel().currentRowChanged.connect(self.current_item_changed_cb)
                 # Need to defer this revert selection, for some reason
                 QtCore.QTimer.singleShot(1, self.revert_selection)
                 return
 
-        fi = self.twList.item(new_idx, FileSelectionList.dataColNum).data(QtCore.Qt.ItemDataRole.UserRole)
+        fi = FileInfo(self.get_archive_by_row(new_idx))
         self.selectionChanged.emit(QtCore.QVariant(fi))
 
     def revert_selection(self):
-        self.twList.selectRow(self.twList.currentRow())
+        self.twList.selectRow(self.twList.currentIndex().row())
@@ -15,28 +15,25 @@
 # limitations under the License.
 
 import datetime
+import hashlib
+import importlib.util
+import logging
 import os
 import shutil
 import sqlite3 as lite
 import tempfile
-
-import requests
-
-try:
-    from PyQt5 import QtCore, QtNetwork
-
-    qt_available = True
-except ImportError:
-    qt_available = False
-
-
-import logging
+import threading
 
 from comictaggerlib import ctversion
+from comictaggerlib.memorycache import MemoryCache
+from comictaggerlib.offlinequeue import OfflineQueue
 from comictaggerlib.settings import ComicTaggerSettings
 
 logger = logging.getLogger(__name__)
 
+# requests and Qt are imported where they are used, a cache hit on the command line needs neither
+qt_available = importlib.util.find_spec("PyQt5") is not None
+
 
 class ImageFetcherException(Exception):
     pass
@@ -50,6 +47,30 @@ class ImageFetcher:
 
     image_fetch_complete = fetch_complete
 
+    # when set, only answer from the image cache and queue misses for later
+    offline = False
+
+    # maximum size of the image cache in bytes, 0 for no limit
+    max_cache_size = 1024 * 1024 * 1024
+
+    # an image's last use is only recorded again after this long, to keep cache hits from writing on every read
+    lru_resolution = datetime.timedelta(hours=1)
+
+    # recently used images, so moving back and forth between rows doesn't go to the disk cache every time
+    memory_cache = MemoryCache(64 * 1024 * 1024)
+
+    # cache statistics for the whole process, see get_stats()
+    stats = {
+        "hits": 0,
+        "memory_hits": 0,
+        "misses": 0,
+        "bytes_read": 0,
+        "bytes_downloaded": 0,
+        "bytes_written": 0,
+        "writes": 0,
+    }
+    stats_lock = threading.Lock()
+
     def __init__(self):
 
         self.settings_folder = ComicTaggerSettings.get_settings_folder()
@@ -59,17 +80,35 @@ class ImageFetcher:
         self.user_data = None
         self.fetched_url = ""
 
-        if not os.path.exists(self.db_file):
+        if not os.path.exists(self.db_file) or not self.is_content_addressed_db():
             self.create_image_db()
 
-        if qt_available:
-            self.nam = QtNetwork.QNetworkAccessManager()
+        # only needed for background fetches, and blocking fetches may run outside the Qt thread
+        self.nam = None
 
     def clear_cache(self):
+        ImageFetcher.memory_cache.clear()
         os.unlink(self.db_file)
         if os.path.isdir(self.cache_folder):
             shutil.rmtree(self.cache_folder)
 
+    @staticmethod
+    def count(**amounts):
+        with ImageFetcher.stats_lock:
+            for name, amount in amounts.items():
+                ImageFetcher.stats[name] += amount
+
+    @staticmethod
+    def get_stats():
+        with ImageFetcher.stats_lock:
+            return dict(ImageFetcher.stats)
+
+    @staticmethod
+    def reset_stats():
+        with ImageFetcher.stats_lock:
+            for name in ImageFetcher.stats:
+                ImageFetcher.stats[name] = 0
+
     def fetch(self, url, blocking=False):
         """
         If called with blocking=True, this will block until the image is
@@ -80,27 +119,53 @@ class ImageFetcher:
 
         self.fetched_url = url
 
-        # first look in the DB
-        image_data = self.get_image_from_cache(url)
+        # first look in memory, then in the DB
+        image_data = ImageFetcher.memory_cache.get(url)
+        if image_data is not None:
+            self.count(hits=1, memory_hits=1)
+        else:
+            image_data = self.get_image_from_cache(url)
+            if image_data is not None:
+                self.count(hits=1, bytes_read=len(image_data))
+                ImageFetcher.memory_cache.put(url, image_data)
+            else:
+                self.count(misses=1)
+
+        if image_data is None and ImageFetcher.offline:
+            OfflineQueue().record(OfflineQueue.FetchImage, url)
+            if blocking or not qt_available:
+                raise ImageFetcherException("Offline mode: image is not in the cache")
+            return bytes()
+
         if blocking or not qt_available:
-            if image_data is None:
-                try:
-                    image_data = requests.get(url, headers={"user-agent": "comictagger/" + ctversion.version}).content
-                except Exception as e:
-                    logger.exception("Fetching url failed: %s")
-                    raise ImageFetcherException("Network Error!") from e
+            # a cache hit is returned as is, without touching the disk again
+            if image_data is not None:
+                return image_data
+
+            import requests
+
+            try:
+                image_data = requests.get(url, headers={"user-agent": "comictagger/" + ctversion.version}).content
+                self.count(bytes_downloaded=len(image_data))
+            except Exception as e:
+                logger.exception("Fetching url failed: %s", url)
+                raise ImageFetcherException("Network Error!") from e
 
             # save the image to the cache
             self.add_image_to_cache(self.fetched_url, image_data)
             return image_data
 
         if qt_available:
+            from PyQt5 import QtCore, QtNetwork
+
             # if we found it, just emit the signal asap
             if image_data is not None:
                 self.image_fetch_complete(QtCore.QByteArray(image_data))
                 return bytes()
 
             # didn't find it.  look online
+            if self.nam is None:
+                self.nam = QtNetwork.QNetworkAccessManager()
             self.nam.finished.connect(self.finish_request)
             self.nam.get(QtNetwork.QNetworkRequest(QtCore.QUrl(url)))
 
@@ -111,12 +176,25 @@ class ImageFetcher:
         # read in the image data
         logger.debug("request finished")
         image_data = reply.readAll()
+        self.count(bytes_downloaded=len(image_data))
 
         # save the image to the cache
-        self.add_image_to_cache(self.fetched_url, image_data)
+        self.add_image_to_cache(self.fetched_url, bytes(image_data))
 
         self.image_fetch_complete(image_data)
 
+    def is_content_addressed_db(self):
+        """Older caches kept one randomly named file per URL, and get rebuilt"""
+        con = lite.connect(self.db_file)
+        with con:
+            cur = con.cursor()
+            cur.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='Blobs'")
+            return cur.fetchone() is not None
+
+    def get_blob_path(self, image_hash):
+        # shard on the first two hex digits, to keep directories small
+        return os.path.join(self.cache_folder, image_hash[:2], image_hash)
+
     def create_image_db(self):
 
         # this will wipe out any existing version
@@ -133,23 +211,87 @@ class ImageFetcher:
         with con:
             cur = con.cursor()
 
-            cur.execute("CREATE TABLE Images(url TEXT,filename TEXT,timestamp TEXT,PRIMARY KEY (url))")
+            # URLs point at content hashes, so the same image is only stored once
+            cur.execute("CREATE TABLE Images(url TEXT,hash TEXT,timestamp TEXT,PRIMARY KEY (url))")
+            cur.execute("CREATE INDEX ImagesHash ON Images(hash)")
+            cur.execute("CREATE TABLE Blobs(hash TEXT,size INT,last_used TEXT,PRIMARY KEY (hash))")
+            cur.execute("CREATE INDEX BlobsLastUsed ON Blobs(last_used)")
+
+    def write_blob(self, image_hash, image_data):
+        path = self.get_blob_path(image_hash)
+        if os.path.exists(path):
+            # already stored under another URL
+            return
+
+        # write to a temp file and move it into place, so readers never see a partial image
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_fd, tmp_name = tempfile.mkstemp(dir=os.path.dirname(path), prefix="tmp")
+        try:
+            with os.fdopen(tmp_fd, "wb") as f:
+                f.write(image_data)
+            os.replace(tmp_name, path)
+            self.count(writes=1, bytes_written=len(image_data))
+        except OSError:
+            if os.path.exists(tmp_name):
+                os.unlink(tmp_name)
+            raise
+
+    def remove_blob(self, cur, image_hash):
+        cur.execute("DELETE FROM Images WHERE hash = ?", [image_hash])
+        cur.execute("DELETE FROM Blobs WHERE hash = ?", [image_hash])
+        try:
+            os.unlink(self.get_blob_path(image_hash))
+        except FileNotFoundError:
+            pass
 
     def add_image_to_cache(self, url, image_data):
 
+        ImageFetcher.memory_cache.put(url, image_data)
+
+        image_hash = hashlib.sha256(image_data).hexdigest()
+        self.write_blob(image_hash, image_data)
+
         con = lite.connect(self.db_file)
 
         with con:
             cur = con.cursor()
 
-            timestamp = datetime.datetime.now()
-
-            tmp_fd, filename = tempfile.mkstemp(dir=self.cache_folder, prefix="img")
-            f = os.fdopen(tmp_fd, "w+b")
-            f.write(image_data)
-            f.close()
+            timestamp = str(datetime.datetime.now())
 
-            cur.execute("INSERT or REPLACE INTO Images VALUES(?, ?, ?)", (url, filename, timestamp))
+            cur.execute("SELECT hash FROM Images WHERE url=?", [url])
+            row = cur.fetchone()
+            old_hash = None if row is None else row[0]
+
+            cur.execute("INSERT or REPLACE INTO Images VALUES(?, ?, ?)", (url, image_hash, timestamp))
+            cur.execute("INSERT or REPLACE INTO Blobs VALUES(?, ?, ?)", (image_hash, len(image_data), timestamp))
+
+            # the URL used to point at different content, drop that if nothing else uses it
+            if old_hash is not None and old_hash != image_hash:
+                cur.execute("SELECT COUNT(*) FROM Images WHERE hash=?", [old_hash])
+                if cur.fetchone()[0] == 0:
+                    self.remove_blob(cur, old_hash)
+
+            self.evict(cur)
+
+    def evict(self, cur):
+        """Removes the least recently used images until the cache fits in max_cache_size"""
+        if ImageFetcher.max_cache_size <= 0:
+            return
+
+        cur.execute("SELECT SUM(size) FROM Blobs")
+        total_size = cur.fetchone()[0] or 0
+        if total_size <= ImageFetcher.max_cache_size:
+            return
+
+        # go a bit below the limit, so we don't evict again on the very next add
+        target_size = ImageFetcher.max_cache_size * 0.9
+        cur.execute("SELECT hash, size FROM Blobs ORDER BY last_used")
+        for image_hash, size in cur.fetchall():
+            if total_size <= target_size:
+                break
+            self.remove_blob(cur, image_hash)
+            total_size -= size
+        logger.info("Image cache trimmed to %d bytes", total_size)
 
     def get_image_from_cache(self, url):
 
@@ -157,20 +299,70 @@ class ImageFetcher:
         with con:
             cur = con.cursor()
 
-            cur.execute("SELECT filename FROM Images WHERE url=?", [url])
+            cur.execute(
+                "SELECT Blobs.hash, Blobs.last_used FROM Images JOIN Blobs ON Images.hash = Blobs.hash WHERE url=?",
+                [url],
+            )
             row = cur.fetchone()
 
             if row is None:
                 return None
 
-            filename = row[0]
+            image_hash, last_used = row
             image_data = None
 
             try:
-                with open(filename, "rb") as f:
+                with open(self.get_blob_path(image_hash), "rb") as f:
                     image_data = f.read()
-                    f.close()
             except IOError:
-                pass
+                # the file went missing, forget about it
+                self.remove_blob(cur, image_hash)
+                return None
+
+            now = datetime.datetime.now()
+            if str(now - ImageFetcher.lru_resolution) > last_used:
+                cur.execute("UPDATE Blobs SET last_used = ? WHERE hash = ?", (str(now), image_hash))
 
             return image_data
+
+    def collect_garbage(self):
+        """Removes cache files and records that nothing refers to any more
+
+        Returns the number of files removed and the bytes freed.
+        """
+        removed = 0
+        freed = 0
+
+        con = lite.connect(self.db_file)
+        with con:
+            cur = con.cursor()
+
+            # records that point at nothing
+            cur.execute("DELETE FROM Images WHERE hash NOT IN (SELECT hash FROM Blobs)")
+            cur.execute("SELECT hash FROM Blobs WHERE hash NOT IN (SELECT hash FROM Images)")
+            for (image_hash,) in cur.fetchall():
+                self.remove_blob(cur, image_hash)
+
+            cur.execute("SELECT hash FROM Blobs")
+            known = {row[0] for row in cur.fetchall()}
+
+            # files that nothing points at (including left over temp files)
+            for folder, _, files in os.walk(self.cache_folder):
+                for name in files:
+                    if name in known and folder == os.path.dirname(self.get_blob_path(name)):
+                        known.discard(name)
+                        continue
+                    path = os.path.join(folder, name)
+                    try:
+                        size = os.path.getsize(path)
+                        os.unlink(path)
+                    except OSError:
+                        continue
+                    removed += 1
+                    freed += size
+
+            # records whose file is gone
+            for image_hash in known:
+                self.remove_blob(cur, image_hash)
+
+        return removed, freed
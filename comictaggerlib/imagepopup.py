@@ -63,6 +63,10 @@ class ImagePopup(QtWidgets.QDialog):
         painter.drawPixmap(0, 0, self.clientBgPixmap)
         painter.end()
 
+    def set_image_pixmap(self, image_pixmap):
+        self.imagePixmap = image_pixmap
+        self.apply_image_pixmap()
+
     def apply_image_pixmap(self):
         win_h = self.height()
         win_w = self.width()
@@ -22,7 +22,7 @@ from typing import List, TypedDict
 from comicapi import utils
 from comicapi.comicarchive import ComicArchive
 from comicapi.genericmetadata import GenericMetadata
-from comicapi.issuestring import IssueString
+from comicapi.issuestring import normalize_issue
 from comictaggerlib.comicvinetalker import ComicVineTalker, ComicVineTalkerException
 from comictaggerlib.imagefetcher import ImageFetcher, ImageFetcherException
 from comictaggerlib.imagehasher import ImageHasher
@@ -340,6 +340,49 @@ class IssueIdentifier:
 
         return best_score_item
 
+    def filter_series_candidates(self, keys: SearchKeys, cv_search_results):
+        """Narrows the series search results down to the volumes worth looking for the issue in"""
+        series_second_round_list = []
+
+        # sanitize the search string the way search_for_series sanitized the result names, so
+        # we are comparing the same type of data
+        shortened_key = utils.sanitize_title(keys["series"])
+        max_name_length = len(shortened_key) + self.length_delta_thresh
+
+        for item in cv_search_results:
+            length_approved = False
+            publisher_approved = True
+            date_approved = True
+
+            # remove any series that starts after the issue year
+            if (
+                keys["year"] is not None
+                and str(keys["year"]).isdigit()
+                and item["start_year"] is not None
+                and str(item["start_year"]).isdigit()
+            ):
+                if int(keys["year"]) < int(item["start_year"]):
+                    date_approved = False
+
+            # assume that our search name is close to the actual name, say
+            # within ,e.g. 5 chars
+            if len(item["sanitized_name"]) < max_name_length:
+                length_approved = True
+
+            # remove any series from publishers on the filter
+            if item["publisher"] is not None:
+                publisher = item["publisher"]["name"]
+                if publisher is not None and publisher.lower() in self.publisher_filter:
+                    publisher_approved = False
+
+            if length_approved and publisher_approved and date_approved:
+                series_second_round_list.append(item)
+
+        # now sort the list by name length
+        series_second_round_list.sort(key=lambda x: len(x["name"]), reverse=False)
+
+        return series_second_round_list
+
     def search(self) -> List[IssueResult]:
         ca = self.comic_archive
         self.match_list: List[IssueResult] = []
@@ -369,7 +412,7 @@ class IssueIdentifier:
 
         keys = self.get_search_keys()
         # normalize the issue number
-        keys["issue_number"] = IssueString(keys["issue_number"]).as_string()
+        keys["issue_number"] = normalize_issue(keys["issue_number"])
 
         # we need, at minimum, a series and issue number
         if keys["series"] is None or keys["issue_number"] is None:
@@ -404,49 +447,13 @@ class IssueIdentifier:
         if cv_search_results is None:
             return []
 
-        series_second_round_list = []
-
-        for item in cv_search_results:
-            length_approved = False
-            publisher_approved = True
-            date_approved = True
-
-            # remove any series that starts after the issue year
-            if (
-                keys["year"] is not None
-                and str(keys["year"]).isdigit()
-                and item["start_year"] is not None
-                and str(item["start_year"]).isdigit()
-            ):
-                if int(keys["year"]) < int(item["start_year"]):
-                    date_approved = False
-
-            # assume that our search name is close to the actual name, say
-            # within ,e.g. 5 chars
-            # sanitize both the search string and the result so that
-            # we are comparing the same type of data
-            shortened_key = utils.sanitize_title(keys["series"])
-            shortened_item_name = utils.sanitize_title(item["name"])
-            if len(shortened_item_name) < (len(shortened_key) + self.length_delta_thresh):
-                length_approved = True
-
-            # remove any series from publishers on the filter
-            if item["publisher"] is not None:
-                publisher = item["publisher"]["name"]
-                if publisher is not None and publisher.lower() in self.publisher_filter:
-                    publisher_approved = False
-
-            if length_approved and publisher_approved and date_approved:
-                series_second_round_list.append(item)
+        series_second_round_list = self.filter_series_candidates(keys, cv_search_results)
 
         self.log_msg("Searching in " + str(len(series_second_round_list)) + " series")
 
         if self.callback is not None:
             self.callback(0, len(series_second_round_list))
 
-        # now sort the list by name length
-        series_second_round_list.sort(key=lambda x: len(x["name"]), reverse=False)
-
         # build a list of volume IDs
         volume_id_list = []
         for series in series_second_round_list:
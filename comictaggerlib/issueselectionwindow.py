@@ -19,11 +19,12 @@ import logging
 
 from PyQt5 import QtCore, QtGui, QtWidgets, uic
 
-from comicapi.issuestring import IssueString
+from comicapi.issuestring import IssueString, issue_key
 from comictaggerlib.comicvinetalker import ComicVineTalker, ComicVineTalkerException
 from comictaggerlib.coverimagewidget import CoverImageWidget
 from comictaggerlib.settings import ComicTaggerSettings
-from comictaggerlib.ui.qtutils import reduce_widget_font_size
+from comictaggerlib.thumbnailprefetcher import ThumbnailPrefetcher
+from comictaggerlib.ui.qtutils import get_visible_rows, reduce_widget_font_size
 
 logger = logging.getLogger(__name__)
 
@@ -64,6 +65,8 @@ class IssueSelectionWindow(QtWidgets.QDialog):
         self.settings = settings
         self.url_fetch_thread = None
         self.issue_list = []
+        self.thumbnail_prefetcher = ThumbnailPrefetcher()
+        self.finished.connect(self.thumbnail_prefetcher.shutdown)
 
         if issue_number is None or issue_number == "":
             self.issue_number = 1
@@ -76,6 +79,7 @@ class IssueSelectionWindow(QtWidgets.QDialog):
         self.twList.resizeColumnsToContents()
         self.twList.currentItemChanged.connect(self.current_item_changed)
         self.twList.cellDoubleClicked.connect(self.cell_double_clicked)
+        self.twList.verticalScrollBar().valueChanged.connect(self.prefetch_covers)
 
         # now that the list has been sorted, find the initial record, and
         # select it
@@ -142,10 +146,7 @@ class IssueSelectionWindow(QtWidgets.QDialog):
             item.setFlags(QtCore.Qt.ItemFlag.ItemIsSelectable | QtCore.Qt.ItemFlag.ItemIsEnabled)
             self.twList.setItem(row, 2, item)
 
-            if (
-                IssueString(record["issue_number"]).as_string().lower()
-                == IssueString(self.issue_number).as_string().lower()
-            ):
+            if issue_key(record["issue_number"]) == issue_key(self.issue_number):
                 self.initial_id = record["id"]
 
             row += 1
@@ -158,6 +159,16 @@ class IssueSelectionWindow(QtWidgets.QDialog):
     def cell_double_clicked(self, r, c):
         self.accept()
 
+    def prefetch_covers(self):
+        """Starts fetching the covers for the rows on screen and around them"""
+        records = {record["id"]: record for record in self.issue_list}
+        url_list = []
+        for r in get_visible_rows(self.twList, 10):
+            record = records.get(self.twList.item(r, 0).data(QtCore.Qt.ItemDataRole.UserRole))
+            if record is not None and record["image"] is not None:
+                url_list.append(record["image"]["thumb_url"] or record["image"]["super_url"])
+        self.thumbnail_prefetcher.prefetch(url_list)
+
     def current_item_changed(self, curr, prev):
 
         if curr is None:
@@ -166,6 +177,7 @@ class IssueSelectionWindow(QtWidgets.QDialog):
             return
 
         self.issue_id = self.twList.item(curr.row(), 0).data(QtCore.Qt.ItemDataRole.UserRole)
+        self.prefetch_covers()
 
         # list selection was changed, update the the issue cover
         for record in self.issue_list:
@@ -23,34 +23,41 @@ import signal
 import sys
 import traceback
 
-import pkg_resources
-
-from comictaggerlib import cli
-from comictaggerlib.comicvinetalker import ComicVineTalker
+from comictaggerlib import server
 from comictaggerlib.ctversion import version
-from comictaggerlib.options import Options
 from comictaggerlib.settings import ComicTaggerSettings
 
 logger = logging.getLogger("comictagger")
 logging.getLogger("comicapi").setLevel(logging.DEBUG)
 logger.setLevel(logging.DEBUG)
 
-try:
-    qt_available = True
-    from PyQt5 import QtGui, QtWidgets
-
-    from comictaggerlib.taggerwindow import TaggerWindow
-except ImportError as e:
-    logging.debug(e)
-    qt_available = False
-
 
 def rotate(handler: logging.handlers.RotatingFileHandler, filename: pathlib.Path):
     if filename.is_file() and filename.stat().st_size > 0:
         handler.doRollover()
 
 
+def log_installed_packages():
+    import pkg_resources
+
+    logger.debug("Installed Packages")
+    for pkg in sorted(pkg_resources.working_set, key=lambda x: x.project_name):
+        logger.debug("%s\t%s", pkg.project_name, pkg.version)
+
+
 def ctmain():
+    # hand the request to a server before loading the rest of ComicTagger
+    if "--use-server" in sys.argv[1:]:
+        exit_code = server.forward_to_server([a for a in sys.argv[1:] if a != "--use-server"])
+        if exit_code is not None:
+            sys.exit(exit_code)
+
+    from comictaggerlib import cli
+    from comictaggerlib.comicvinecacher import CacheTTLPolicy, ComicVineCacher
+    from comictaggerlib.comicvinetalker import ComicVineTalker
+    from comictaggerlib.imagefetcher import ImageFetcher
+    from comictaggerlib.options import Options
+
     os.makedirs(ComicTaggerSettings.get_settings_folder() / "logs", exist_ok=True)
     stream_handler = logging.StreamHandler()
     stream_handler.setLevel(logging.WARNING)
@@ -83,6 +90,14 @@ def ctmain():
         return
 
     ComicVineTalker.api_key = SETTINGS.cv_api_key
+    ComicVineCacher.ttl_policy = CacheTTLPolicy.from_settings(SETTINGS)
+    ComicVineTalker.offline = opts.offline
+    ImageFetcher.offline = opts.offline
+    ImageFetcher.max_cache_size = SETTINGS.image_cache_max_size * 1024 * 1024
+
+    if opts.server:
+        server.serve(SETTINGS)
+        return
 
     signal.signal(signal.SIGINT, signal.SIG_DFL)
 
@@ -93,16 +108,24 @@ def ctmain():
         "Yes" if getattr(sys, "frozen", None) else "No",
     )
 
-    logger.debug("Installed Packages")
-    for pkg in sorted(pkg_resources.working_set, key=lambda x: x.project_name):
-        logger.debug("%s\t%s", pkg.project_name, pkg.version)
+    # Qt is only loaded for the GUI, command-line runs start much faster without it
+    if not opts.no_gui:
+        try:
+            from PyQt5 import QtGui, QtWidgets
+
+            from comictaggerlib.taggerwindow import TaggerWindow
+        except ImportError as e:
+            logger.debug(e)
+            opts.no_gui = True
+            print("PyQt5 is not available. ComicTagger is limited to command-line mode.")
+            logger.info("PyQt5 is not available. ComicTagger is limited to command-line mode.")
 
-    if not qt_available and not opts.no_gui:
-        opts.no_gui = True
-        print("PyQt5 is not available. ComicTagger is limited to command-line mode.")
-        logger.info("PyQt5 is not available. ComicTagger is limited to command-line mode.")
+    # listing the packages takes longer than most command-line runs
+    if not opts.no_gui or opts.verbose:
+        log_installed_packages()
 
     if opts.no_gui:
+        # a local run exits 0 whatever the result, only --use-server clients get cli_mode's exit code
         try:
             cli.cli_mode(opts, SETTINGS)
         except:
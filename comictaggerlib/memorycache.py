@@ -0,0 +1,80 @@
+"""A size bounded, least recently used, in-memory cache"""
+
+# Copyright 2012-2014 Anthony Beville
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#     http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import collections
+import threading
+
+
+class MemoryCache:
+    """Holds values up to a total size, dropping the least recently used first
+
+    size_func gives the size of a value in bytes; the default suits bytes
+    objects.  Values larger than the whole cache are not kept.  Safe to use
+    from several threads.
+    """
+
+    def __init__(self, max_size, size_func=len):
+        self.max_size = max_size
+        self.size_func = size_func
+        self.entries = collections.OrderedDict()
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, value):
+        size = self.size_func(value)
+        with self.lock:
+            self.remove_entry(key)
+            if size > self.max_size:
+                return
+            self.entries[key] = (value, size)
+            self.size += size
+            while self.size > self.max_size:
+                _, (_, old_size) = self.entries.popitem(last=False)
+                self.size -= old_size
+
+    def remove(self, key):
+        with self.lock:
+            self.remove_entry(key)
+
+    def remove_entry(self, key):
+        entry = self.entries.pop(key, None)
+        if entry is not None:
+            self.size -= entry[1]
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.size = 0
+
+    def __contains__(self, key):
+        with self.lock:
+            return key in self.entries
+
+    def __len__(self):
+        with self.lock:
+            return len(self.entries)
@@ -0,0 +1,83 @@
+"""A class to record cache misses made in offline mode, for replay by an online pass"""
+
+# Copyright 2012-2014 Anthony Beville
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#     http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import json
+import logging
+import os
+import threading
+
+from comictaggerlib.settings import ComicTaggerSettings
+
+logger = logging.getLogger(__name__)
+
+
+class OfflineQueue:
+    """Each entry is the name of a fetch method plus its arguments, one JSON object per line
+
+    Entries name the high level ComicVineTalker method (or "fetch_image" for
+    ImageFetcher) so that replaying them online fills the same caches that
+    the offline pass reads from.
+    """
+
+    FetchImage = "fetch_image"
+
+    lock = threading.Lock()
+
+    def __init__(self, queue_file=None):
+        if queue_file is None:
+            queue_file = os.path.join(ComicTaggerSettings.get_settings_folder(), "offline_queue.jsonl")
+        self.queue_file = queue_file
+
+    def record(self, fetch_method, *args):
+        entry = json.dumps({"method": fetch_method, "args": list(args)})
+        with OfflineQueue.lock:
+            with open(self.queue_file, "a", encoding="utf-8") as f:
+                f.write(entry + "\n")
+        logger.info("Offline cache miss queued: %s%s", fetch_method, args)
+
+    def get_entries(self):
+        """Returns the unique queued entries, in the order they were first recorded"""
+        entries = []
+        seen = set()
+        with OfflineQueue.lock:
+            if not os.path.exists(self.queue_file):
+                return entries
+            with open(self.queue_file, "r", encoding="utf-8") as f:
+                for line in f:
+                    line = line.strip()
+                    if not line or line in seen:
+                        continue
+                    seen.add(line)
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        logger.warning("Skipping invalid offline queue entry: %s", line)
+                        continue
+                    entries.append((entry["method"], entry["args"]))
+        return entries
+
+    def write_entries(self, entries):
+        with OfflineQueue.lock:
+            with open(self.queue_file, "w", encoding="utf-8") as f:
+                for fetch_method, args in entries:
+                    f.write(json.dumps({"method": fetch_method, "args": list(args)}) + "\n")
+
+    def clear(self):
+        with OfflineQueue.lock:
+            try:
+                os.unlink(self.queue_file)
+            except FileNotFoundError:
+                pass
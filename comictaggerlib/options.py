@@ -77,6 +77,12 @@ If no options are given, {0} will run in windowed mode.
                             used: series, issue, issueCount, year,
                             publisher, title
 -r, --rename                Rename the file based on specified tag style.
+    --prefetch              Fill the local Comic Vine and cover image
+                            caches with what an online search (-s -o)
+                            of the files would fetch, then quit.  Series
+                            info comes from the filenames, plus tags of
+                            the type given with -t and -m.  Safe to
+                            rerun after an interruption.
     --noabort               Don't abort save operation when online match
                             is of low confidence.
 -e, --export-to-zip         Export RAR archive to Zip format.
@@ -94,6 +100,20 @@ If no options are given, {0} will run in windowed mode.
     --only-set-cv-key       Only set the Comic Vine API key and quit.
 -w, --wait-on-cv-rate-limit When encountering a Comic Vine rate limit
                             error, wait and retry query.
+    --offline               Never use the network.  Comic Vine data and
+                            cover images are only read from the local
+                            caches, and cache misses are queued for a
+                            later online pass.
+    --replay-offline-queue  Fetch everything queued by --offline runs
+                            into the local caches and quit.
+    --clean-image-cache     Remove cover image cache files that nothing
+                            refers to any more and quit.
+    --server                Keep running and carry out the command-line
+                            actions sent by --use-server runs, over a
+                            Unix socket in the config directory.
+    --use-server            Have a running --server carry out this
+                            command, which saves the startup time.  Runs
+                            it here if no server is running.
 -v, --verbose               Be noisy when doing what it does.
     --terse                 Don't say much (for print mode).
     --darkmode              Windows only. Force a dark pallet
@@ -134,6 +154,12 @@ For more help visit the wiki at: https://github.com/comictagger/comictagger/wiki
         self.run_script = False
         self.script = None
         self.wait_and_retry_on_rate_limit = False
+        self.offline = False
+        self.replay_offline_queue = False
+        self.clean_image_cache = False
+        self.server = False
+        self.use_server = False
+        self.prefetch = False
         self.assume_issue_is_one_if_not_set = False
         self.file_list = []
         self.darkmode = False
@@ -232,9 +258,12 @@ For more help visit the wiki at: https://github.com/comictagger/comictagger/wiki
 
         sys.exit(0)
 
-    def parse_cmd_line_args(self):
+    def parse_cmd_line_args(self, args=None):
+        """Parses args, or the arguments of this process if it's None"""
 
-        if platform.system() == "Darwin" and hasattr(sys, "frozen") and sys.frozen == 1:
+        if args is not None:
+            input_args = list(args)
+        elif platform.system() == "Darwin" and hasattr(sys, "frozen") and sys.frozen == 1:
             # remove the PSN (process serial number) argument from OS/X
             input_args = [a for a in sys.argv[1:] if "-psn_0_" not in a]
         else:
@@ -283,6 +312,12 @@ For more help visit the wiki at: https://github.com/comictagger/comictagger/wiki
                     "cv-api-key=",
                     "only-set-cv-key",
                     "wait-on-cv-rate-limit",
+                    "offline",
+                    "replay-offline-queue",
+                    "clean-image-cache",
+                    "server",
+                    "use-server",
+                    "prefetch",
                     "darkmode",
                     "config=",
                 ],
@@ -339,6 +374,18 @@ For more help visit the wiki at: https://github.com/comictagger/comictagger/wiki
                 self.parse_filename = True
             if o in ("-w", "--wait-on-cv-rate-limit"):
                 self.wait_and_retry_on_rate_limit = True
+            if o == "--offline":
+                self.offline = True
+            if o == "--replay-offline-queue":
+                self.replay_offline_queue = True
+            if o == "--clean-image-cache":
+                self.clean_image_cache = True
+            if o == "--server":
+                self.server = True
+            if o == "--use-server":
+                self.use_server = True
+            if o == "--prefetch":
+                self.prefetch = True
             if o == "--config":
                 self.config_path = os.path.abspath(a)
             if o == "--id":
@@ -384,6 +431,10 @@ For more help visit the wiki at: https://github.com/comictagger/comictagger/wiki
                 self.rename_file,
                 self.export_to_zip,
                 self.only_set_key,
+                self.replay_offline_queue,
+                self.clean_image_cache,
+                self.server,
+                self.prefetch,
             ]
         ):
             self.no_gui = True
@@ -405,10 +456,20 @@ For more help visit the wiki at: https://github.com/comictagger/comictagger/wiki
             count += 1
         if self.only_set_key:
             count += 1
+        if self.replay_offline_queue:
+            count += 1
+        if self.clean_image_cache:
+            count += 1
+        if self.server:
+            count += 1
+        if self.prefetch:
+            count += 1
 
         if count > 1:
             self.display_msg_and_quit(
-                "Must choose only one action of print, delete, save, copy, rename, export, set key, or run script", 1
+                "Must choose only one action of print, delete, save, copy, rename, export, set key, replay offline"
+                " queue, clean image cache, server, prefetch, or run script",
+                1,
             )
 
         if self.script is not None:
@@ -431,7 +492,17 @@ For more help visit the wiki at: https://github.com/comictagger/comictagger/wiki
         if self.only_set_key and self.cv_api_key is None:
             self.display_msg_and_quit("Key not given!", 1)
 
-        if not self.only_set_key and self.no_gui and self.filename is None:
+        if self.replay_offline_queue and self.offline:
+            self.display_msg_and_quit("Can't replay the offline queue in offline mode!", 1)
+
+        if self.prefetch and self.offline:
+            self.display_msg_and_quit("Can't prefetch in offline mode!", 1)
+
+        if (
+            not (self.only_set_key or self.replay_offline_queue or self.clean_image_cache or self.server)
+            and self.no_gui
+            and self.filename is None
+        ):
             self.display_msg_and_quit("Command requires at least one filename!", 1)
 
         if self.delete_tags and self.data_style is None:
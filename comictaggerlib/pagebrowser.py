@@ -21,12 +21,16 @@ from PyQt5 import QtCore, QtGui, QtWidgets, uic
 
 from comicapi.comicarchive import ComicArchive
 from comictaggerlib.coverimagewidget import CoverImageWidget
+from comictaggerlib.pagedecoder import PageDecoder
 from comictaggerlib.settings import ComicTaggerSettings
 
 logger = logging.getLogger(__name__)
 
 
 class PageBrowserWindow(QtWidgets.QDialog):
+    # how many pages either side of the current one to decode ahead of time
+    prefetch_pages = 3
+
     def __init__(self, parent, metadata):
         super().__init__(parent)
 
@@ -47,6 +51,7 @@ class PageBrowserWindow(QtWidgets.QDialog):
         )
 
         self.comic_archive = None
+        self.page_decoder = None
         self.page_count = 0
         self.current_page_num = 0
         self.metadata = metadata
@@ -61,12 +66,14 @@ class PageBrowserWindow(QtWidgets.QDialog):
 
         self.btnNext.clicked.connect(self.next_page)
         self.btnPrev.clicked.connect(self.prev_page)
+        self.finished.connect(self.stop_page_decoder)
         self.show()
 
         self.btnNext.setEnabled(False)
         self.btnPrev.setEnabled(False)
 
     def reset(self):
+        self.stop_page_decoder()
         self.comic_archive = None
         self.page_count = 0
         self.current_page_num = 0
@@ -76,8 +83,17 @@ class PageBrowserWindow(QtWidgets.QDialog):
         self.btnPrev.setEnabled(False)
         self.pageWidget.clear()
 
+    def stop_page_decoder(self):
+        if self.page_decoder is not None:
+            self.page_decoder.shutdown()
+            self.page_decoder = None
+
     def set_comic_archive(self, ca: ComicArchive):
 
+        self.stop_page_decoder()
+        self.page_decoder = PageDecoder(ca)
+        self.pageWidget.set_page_decoder(self.page_decoder)
+
         self.comic_archive = ca
         self.page_count = ca.get_number_of_pages()
         self.current_page_num = 0
@@ -104,11 +120,18 @@ class PageBrowserWindow(QtWidgets.QDialog):
             self.current_page_num = self.page_count - 1
         self.set_page()
 
-    def set_page(self):
+    def get_archive_page_index(self, page_num):
         if self.metadata is not None:
-            archive_page_index = self.metadata.get_archive_page_index(self.current_page_num)
-        else:
-            archive_page_index = self.current_page_num
+            return self.metadata.get_archive_page_index(page_num)
+        return page_num
 
-        self.pageWidget.set_page(archive_page_index)
+    def set_page(self):
+        self.pageWidget.set_page(self.get_archive_page_index(self.current_page_num))
         self.setWindowTitle(f"Page Browser - Page {self.current_page_num + 1} (of {self.page_count}) ")
+
+        # decode the pages around this one, nearest first, wrapping around like next and previous do
+        page_list = [self.get_archive_page_index(self.current_page_num)]
+        for offset in range(1, min(PageBrowserWindow.prefetch_pages, self.page_count // 2) + 1):
+            page_list.append(self.get_archive_page_index((self.current_page_num + offset) % self.page_count))
+            page_list.append(self.get_archive_page_index((self.current_page_num - offset) % self.page_count))
+        self.page_decoder.prefetch(page_list, self.pageWidget.get_display_size())
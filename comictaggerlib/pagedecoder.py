@@ -0,0 +1,120 @@
+"""A class to read and decode the pages of an archive on worker threads"""
+
+# Copyright 2012-2014 Anthony Beville
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#     http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from PyQt5 import QtCore, QtGui
+
+from comicapi.comicarchive import ComicArchive
+from comictaggerlib.ui.qtutils import get_qimage_from_data, pixmap_cache
+
+logger = logging.getLogger(__name__)
+
+
+class PageDecoder(QtCore.QObject):
+    """Reads, decodes and scales pages of one archive off the GUI thread
+
+    Finished pages go into the pixmap cache under the same (source, size)
+    keys CoverImageWidget uses, so the widget finds them there.  Prefetched
+    pages are only kept scaled, the full size pixmap is kept for the pages
+    asked for with full=True.  pageDecoded is emitted on the GUI thread once
+    a page is in the cache.
+    """
+
+    pageDecoded = QtCore.pyqtSignal(int)
+    decodeComplete = QtCore.pyqtSignal(int, QtGui.QImage, QtGui.QImage, int, int)
+
+    max_workers = 2
+
+    def __init__(self, ca: ComicArchive):
+        super().__init__()
+        self.ca = ca
+        self.executor = ThreadPoolExecutor(max_workers=PageDecoder.max_workers)
+        self.futures = {}
+        # pages whose full size pixmap should be kept too
+        self.full_pages = set()
+        self.lock = threading.Lock()
+        self.abandoned = False
+
+        # read the page list here, so the workers don't race to do it
+        self.ca.get_number_of_pages()
+
+        self.decodeComplete.connect(self.decode_complete)
+
+    def get_source(self, page_num):
+        return (self.ca.path, page_num)
+
+    def is_cached(self, page_num, size, full=False):
+        return (self.get_source(page_num), None if full else size) in pixmap_cache
+
+    def decode(self, page_num, size, full=False):
+        """Queues a page for decoding and scaling to fit size, unless it's cached or queued already
+
+        With full the full size pixmap is cached as well as the scaled one.
+        """
+        with self.lock:
+            if self.abandoned or self.is_cached(page_num, size, full):
+                return
+            if full:
+                self.full_pages.add(page_num)
+            if page_num in self.futures and not self.futures[page_num].done():
+                return
+            self.futures[page_num] = self.executor.submit(self.decode_page, page_num, size)
+
+    def prefetch(self, page_list, size):
+        """Queues the pages in page_list in order, and drops queued pages that are not in it"""
+        with self.lock:
+            for page_num, future in list(self.futures.items()):
+                if page_num not in page_list and future.cancel():
+                    del self.futures[page_num]
+        for page_num in page_list:
+            self.decode(page_num, size)
+
+    def decode_page(self, page_num, size):
+        if self.abandoned:
+            return
+        image_data = self.ca.get_page(page_num)
+        if image_data is None or self.abandoned:
+            return
+        image = get_qimage_from_data(image_data)
+        width, height = size
+        scaled_image = image.scaled(width, height, QtCore.Qt.AspectRatioMode.KeepAspectRatio)
+        self.decodeComplete.emit(page_num, image, scaled_image, width, height)
+
+    def decode_complete(self, page_num, image, scaled_image, width, height):
+        # pixmaps may only be made on the GUI thread
+        with self.lock:
+            self.futures.pop(page_num, None)
+            full = page_num in self.full_pages
+            self.full_pages.discard(page_num)
+        if self.abandoned:
+            return
+        source = self.get_source(page_num)
+        if full:
+            pixmap_cache.put((source, None), QtGui.QPixmap.fromImage(image))
+        pixmap_cache.put((source, (width, height)), QtGui.QPixmap.fromImage(scaled_image))
+        self.pageDecoded.emit(page_num)
+
+    def shutdown(self):
+        self.abandoned = True
+        with self.lock:
+            for future in self.futures.values():
+                future.cancel()
+            self.futures = {}
+            self.full_pages = set()
+        self.executor.shutdown(wait=False)
@@ -0,0 +1,252 @@
+"""A local server that runs command-line requests in one long-lived process"""
+
+# Copyright 2012-2014 Anthony Beville
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#     http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import contextlib
+import json
+import logging
+import os
+import socket
+import socketserver
+import sys
+
+from comictaggerlib.settings import ComicTaggerSettings
+
+logger = logging.getLogger(__name__)
+
+# Every message is one JSON object per line.  The client sends
+#   {"args": [...], "cwd": "..."}
+# and the server answers with any number of
+#   {"out": "..."} and {"err": "..."}
+# followed by
+#   {"exit": code}
+# or, for requests the server won't run, such as the GUI or interactive runs,
+#   {"local": true}
+# which tells the client to run the request itself.
+#
+# The client side is imported before anything else by main.py, so the
+# rest of ComicTagger is only imported by the server.
+
+
+def get_socket_path():
+    return str(ComicTaggerSettings.get_settings_folder() / "comictagger.sock")
+
+
+def server_supported():
+    return hasattr(socket, "AF_UNIX")
+
+
+def send_message(wfile, **message):
+    wfile.write(json.dumps(message).encode("utf-8") + b"\n")
+    wfile.flush()
+
+
+class ClientWriter:
+    """A text stream that sends what's written to the client as it's written"""
+
+    def __init__(self, wfile, key):
+        self.wfile = wfile
+        self.key = key
+
+    def write(self, text):
+        if text:
+            send_message(self.wfile, **{self.key: text})
+        return len(text)
+
+    def flush(self):
+        pass
+
+    def isatty(self):
+        return False
+
+
+class ClientLogHandler(logging.Handler):
+    """Sends warnings and errors to the client, the way the stderr handler shows them to a local run"""
+
+    def __init__(self, writer):
+        super().__init__(logging.WARNING)
+        self.writer = writer
+        self.setFormatter(
+            logging.Formatter("%(asctime)s | %(name)s | %(levelname)s | %(message)s", datefmt="%Y-%m-%dT%H:%M:%S")
+        )
+
+    def emit(self, record):
+        try:
+            self.writer.write(self.format(record) + "\n")
+        except Exception:
+            self.handleError(record)
+
+
+class RequestHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        line = self.rfile.readline()
+        if not line:
+            # a connection test, see serve()
+            return
+        try:
+            request = json.loads(line)
+        except ValueError:
+            logger.error("Bad request from client")
+            return
+
+        out = ClientWriter(self.wfile, "out")
+        err = ClientWriter(self.wfile, "err")
+        log_handler = ClientLogHandler(err)
+        old_cwd = os.getcwd()
+        try:
+            logging.getLogger().addHandler(log_handler)
+            try:
+                os.chdir(request["cwd"])
+                with contextlib.redirect_stdout(out), contextlib.redirect_stderr(err):
+                    exit_code = self.server.run_request(request["args"])
+            finally:
+                logging.getLogger().removeHandler(log_handler)
+                os.chdir(old_cwd)
+            if exit_code is None:
+                send_message(self.wfile, local=True)
+            else:
+                send_message(self.wfile, exit=exit_code)
+        except (BrokenPipeError, ConnectionResetError):
+            logger.info("Client went away")
+        except Exception:
+            logger.exception("Request failed: %s", request["args"])
+            with contextlib.suppress(OSError):
+                send_message(self.wfile, exit=1)
+
+
+# UnixStreamServer only exists where Unix sockets do, serve() checks before making a server
+class CTServer(getattr(socketserver, "UnixStreamServer", socketserver.TCPServer)):
+    """Runs the command-line actions of clients one at a time
+
+    Modules, parsed settings and the in-memory caches stay loaded between
+    requests.  Settings are read once at startup, so the server needs a
+    restart to see changes made to them.  The class attributes a request
+    may change are put back afterwards, so one request's options don't
+    carry over to the next.
+    """
+
+    def __init__(self, socket_path, settings):
+        self.socket_path = socket_path
+        self.settings = settings
+        super().__init__(socket_path, RequestHandler)
+
+    def run_request(self, args):
+        """Runs the command-line request, returns its exit code or None when the client should run it"""
+        from comictaggerlib import cli
+        from comictaggerlib.comicvinetalker import ComicVineTalker
+        from comictaggerlib.imagefetcher import ImageFetcher
+        from comictaggerlib.options import Options
+
+        # scripts run in the process that parses their options
+        if "-S" in args or "--script" in args:
+            return None
+
+        opts = Options()
+        try:
+            opts.parse_cmd_line_args(args)
+        except SystemExit as e:
+            return e.code if isinstance(e.code, int) else 0
+
+        if not opts.no_gui or opts.interactive or opts.server or opts.cv_api_key or opts.only_set_key:
+            return None
+
+        # the class-level state a run may change
+        request_state = [
+            (ComicVineTalker, "offline"),
+            (ComicVineTalker, "min_request_interval"),
+            (ImageFetcher, "offline"),
+        ]
+        saved_state = [(cls, name, getattr(cls, name)) for cls, name in request_state]
+        try:
+            ComicVineTalker.offline = opts.offline
+            ImageFetcher.offline = opts.offline
+            ImageFetcher.reset_stats()
+            return cli.cli_mode(opts, self.settings)
+        except SystemExit as e:
+            return e.code if isinstance(e.code, int) else 0
+        finally:
+            for cls, name, value in saved_state:
+                setattr(cls, name, value)
+
+    def server_close(self):
+        super().server_close()
+        with contextlib.suppress(OSError):
+            os.remove(self.socket_path)
+
+
+def serve(settings):
+    if not server_supported():
+        print("Server mode needs Unix domain sockets, which this platform doesn't have.")
+        return
+
+    socket_path = get_socket_path()
+    if os.path.exists(socket_path):
+        sock = connect(socket_path)
+        if sock is not None:
+            sock.close()
+            print(f"A server is already listening on {socket_path}")
+            return
+        # left behind by a server that was killed
+        os.remove(socket_path)
+
+    server = CTServer(socket_path, settings)
+    print(f"Listening on {socket_path}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+def connect(socket_path):
+    try:
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.connect(socket_path)
+    except OSError:
+        return None
+    return sock
+
+
+def forward_to_server(args):
+    """Runs a command-line request on the server and prints its output
+
+    Returns the exit code of the request, or None when no server is
+    running or the server leaves the request to the client.
+    """
+    if not server_supported():
+        return None
+
+    sock = connect(get_socket_path())
+    if sock is None:
+        return None
+
+    with sock, sock.makefile("rwb") as f:
+        send_message(f, args=args, cwd=os.getcwd())
+        for line in f:
+            message = json.loads(line)
+            if "out" in message:
+                sys.stdout.write(message["out"])
+                sys.stdout.flush()
+            elif "err" in message:
+                sys.stderr.write(message["err"])
+                sys.stderr.flush()
+            elif "exit" in message:
+                return message["exit"]
+            elif "local" in message:
+                return None
+
+    # the server went away in the middle of the request
+    return 1
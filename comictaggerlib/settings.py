@@ -97,6 +97,17 @@ class ComicTaggerSettings:
         self.exact_series_matches_first = True
         self.always_use_publisher_filter = False
 
+        # Comic Vine cache settings (TTLs are in days)
+        self.cv_cache_ttl_search = 1
+        self.cv_cache_ttl_volume = 7
+        self.cv_cache_ttl_issue = 7
+        self.cv_cache_ttl_alt_covers = 30
+        self.cv_cache_ttl_ended_volume = 90
+        self.cv_cache_ended_volume_age = 365
+        self.cv_cache_stale_while_revalidate = False
+        # maximum size of the cover image cache in MB, 0 for no limit
+        self.image_cache_max_size = 1024
+
         # CBL Tranform settings
 
         self.assume_lone_credit_is_primary = False
@@ -122,6 +133,7 @@ class ComicTaggerSettings:
         self.ignore_leading_numbers_in_filename = False
         self.remove_archive_after_successful_match = False
         self.wait_and_retry_on_rate_limit = False
+        self.auto_tag_concurrency = 2
 
     def __init__(self):
 
@@ -170,6 +182,17 @@ class ComicTaggerSettings:
         self.exact_series_matches_first = True
         self.always_use_publisher_filter = False
 
+        # Comic Vine cache settings (TTLs are in days)
+        self.cv_cache_ttl_search = 1
+        self.cv_cache_ttl_volume = 7
+        self.cv_cache_ttl_issue = 7
+        self.cv_cache_ttl_alt_covers = 30
+        self.cv_cache_ttl_ended_volume = 90
+        self.cv_cache_ended_volume_age = 365
+        self.cv_cache_stale_while_revalidate = False
+        # maximum size of the cover image cache in MB, 0 for no limit
+        self.image_cache_max_size = 1024
+
         # CBL Tranform settings
 
         self.assume_lone_credit_is_primary = False
@@ -195,6 +218,7 @@ class ComicTaggerSettings:
         self.ignore_leading_numbers_in_filename = False
         self.remove_archive_after_successful_match = False
         self.wait_and_retry_on_rate_limit = False
+        self.auto_tag_concurrency = 2
 
         self.config = configparser.RawConfigParser()
         self.folder = ComicTaggerSettings.get_settings_folder()
@@ -309,6 +333,23 @@ class ComicTaggerSettings:
         if self.config.has_option("comicvine", "cv_api_key"):
             self.cv_api_key = self.config.get("comicvine", "cv_api_key")
 
+        if self.config.has_option("cvcache", "cv_cache_ttl_search"):
+            self.cv_cache_ttl_search = self.config.getint("cvcache", "cv_cache_ttl_search")
+        if self.config.has_option("cvcache", "cv_cache_ttl_volume"):
+            self.cv_cache_ttl_volume = self.config.getint("cvcache", "cv_cache_ttl_volume")
+        if self.config.has_option("cvcache", "cv_cache_ttl_issue"):
+            self.cv_cache_ttl_issue = self.config.getint("cvcache", "cv_cache_ttl_issue")
+        if self.config.has_option("cvcache", "cv_cache_ttl_alt_covers"):
+            self.cv_cache_ttl_alt_covers = self.config.getint("cvcache", "cv_cache_ttl_alt_covers")
+        if self.config.has_option("cvcache", "cv_cache_ttl_ended_volume"):
+            self.cv_cache_ttl_ended_volume = self.config.getint("cvcache", "cv_cache_ttl_ended_volume")
+        if self.config.has_option("cvcache", "cv_cache_ended_volume_age"):
+            self.cv_cache_ended_volume_age = self.config.getint("cvcache", "cv_cache_ended_volume_age")
+        if self.config.has_option("cvcache", "cv_cache_stale_while_revalidate"):
+            self.cv_cache_stale_while_revalidate = self.config.getboolean("cvcache", "cv_cache_stale_while_revalidate")
+        if self.config.has_option("cvcache", "image_cache_max_size"):
+            self.image_cache_max_size = self.config.getint("cvcache", "image_cache_max_size")
+
         if self.config.has_option("cbl_transform", "assume_lone_credit_is_primary"):
             self.assume_lone_credit_is_primary = self.config.getboolean(
                 "cbl_transform", "assume_lone_credit_is_primary"
@@ -361,6 +402,8 @@ class ComicTaggerSettings:
             )
         if self.config.has_option("autotag", "wait_and_retry_on_rate_limit"):
             self.wait_and_retry_on_rate_limit = self.config.getboolean("autotag", "wait_and_retry_on_rate_limit")
+        if self.config.has_option("autotag", "auto_tag_concurrency"):
+            self.auto_tag_concurrency = self.config.getint("autotag", "auto_tag_concurrency")
 
     def save(self):
 
@@ -419,6 +462,18 @@ class ComicTaggerSettings:
 
         self.config.set("comicvine", "cv_api_key", self.cv_api_key)
 
+        if not self.config.has_section("cvcache"):
+            self.config.add_section("cvcache")
+
+        self.config.set("cvcache", "cv_cache_ttl_search", self.cv_cache_ttl_search)
+        self.config.set("cvcache", "cv_cache_ttl_volume", self.cv_cache_ttl_volume)
+        self.config.set("cvcache", "cv_cache_ttl_issue", self.cv_cache_ttl_issue)
+        self.config.set("cvcache", "cv_cache_ttl_alt_covers", self.cv_cache_ttl_alt_covers)
+        self.config.set("cvcache", "cv_cache_ttl_ended_volume", self.cv_cache_ttl_ended_volume)
+        self.config.set("cvcache", "cv_cache_ended_volume_age", self.cv_cache_ended_volume_age)
+        self.config.set("cvcache", "cv_cache_stale_while_revalidate", self.cv_cache_stale_while_revalidate)
+        self.config.set("cvcache", "image_cache_max_size", self.image_cache_max_size)
+
         if not self.config.has_section("cbl_transform"):
             self.config.add_section("cbl_transform")
 
@@ -450,6 +505,7 @@ class ComicTaggerSettings:
         self.config.set("autotag", "ignore_leading_numbers_in_filename", self.ignore_leading_numbers_in_filename)
         self.config.set("autotag", "remove_archive_after_successful_match", self.remove_archive_after_successful_match)
         self.config.set("autotag", "wait_and_retry_on_rate_limit", self.wait_and_retry_on_rate_limit)
+        self.config.set("autotag", "auto_tag_concurrency", self.auto_tag_concurrency)
 
         with open(self.settings_file, "w") as configfile:
             self.config.write(configfile)
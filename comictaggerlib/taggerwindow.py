@@ -21,10 +21,9 @@ import os
 import pickle
 import platform
 import pprint
-import re
 import sys
 import webbrowser
-from typing import List, Optional, Union
+from typing import Optional, Union
 from urllib.parse import urlparse
 
 import natsort
@@ -37,9 +36,12 @@ from comicapi.filenameparser import FileNameParser
 from comicapi.genericmetadata import GenericMetadata
 from comicapi.issuestring import IssueString
 from comictaggerlib import ctversion
+from comictaggerlib.autotagjob import AutoTagJob
 from comictaggerlib.autotagmatchwindow import AutoTagMatchWindow
 from comictaggerlib.autotagprogresswindow import AutoTagProgressWindow
 from comictaggerlib.autotagstartwindow import AutoTagStartWindow
+from comictaggerlib.bulktagjob import BulkTagJob
+from comictaggerlib.bulktagsummarywindow import BulkTagSummaryWindow
 from comictaggerlib.cbltransformer import CBLTransformer
 from comictaggerlib.comicvinetalker import ComicVineTalker, ComicVineTalkerException
 from comictaggerlib.coverimagewidget import CoverImageWidget
@@ -52,7 +54,6 @@ from comictaggerlib.optionalmsgdialog import OptionalMessageDialog
 from comictaggerlib.pagebrowser import PageBrowserWindow
 from comictaggerlib.pagelisteditor import PageListEditor
 from comictaggerlib.renamewindow import RenameWindow
-from comictaggerlib.resulttypes import IssueResult, MultipleMatch, OnlineMatchResults
 from comictaggerlib.settings import ComicTaggerSettings
 from comictaggerlib.settingswindow import SettingsWindow
 from comictaggerlib.ui.qtutils import center_window_on_parent, reduce_widget_font_size
@@ -162,6 +163,9 @@ class TaggerWindow(QtWidgets.QMainWindow):
         self.droppedFiles = []
         self.metadata = GenericMetadata()
         self.atprogdialog: Optional[AutoTagProgressWindow] = None
+        self.atjob: Optional[AutoTagJob] = None
+        self.bulk_job: Optional[BulkTagJob] = None
+        self.bulk_progdialog: Optional[QtWidgets.QProgressDialog] = None
         self.reset_app()
 
         # set up some basic field validators
@@ -1339,13 +1343,13 @@ Please choose options below, and select OK.
 
         # Add the entries to the country combobox
         self.cbCountry.addItem("", "")
-        for f in natsort.humansorted(utils.countries.items(), operator.itemgetter(1)):
+        for f in natsort.humansorted(utils.get_countries().items(), operator.itemgetter(1)):
             self.cbCountry.addItem(f[1], f[0])
 
         # Add the entries to the language combobox
         self.cbLanguage.addItem("", "")
 
-        for f in natsort.humansorted(utils.languages.items(), operator.itemgetter(1)):
+        for f in natsort.humansorted(utils.get_languages().items(), operator.itemgetter(1)):
             self.cbLanguage.addItem(f[1], f[0])
 
         # Add the entries to the manga combobox
@@ -1464,51 +1468,8 @@ Please choose options below, and select OK.
             )
 
             if reply == QtWidgets.QMessageBox.StandardButton.Yes:
-                progdialog = QtWidgets.QProgressDialog("", "Cancel", 0, has_md_count, self)
-                progdialog.setWindowTitle("Removing Tags")
-                progdialog.setWindowModality(QtCore.Qt.WindowModality.ApplicationModal)
-                progdialog.setMinimumDuration(300)
-                center_window_on_parent(progdialog)
-                QtCore.QCoreApplication.processEvents()
-
-                prog_idx = 0
-
-                failed_list = []
-                success_count = 0
-                for ca in ca_list:
-                    if ca.has_metadata(style):
-                        QtCore.QCoreApplication.processEvents()
-                        if progdialog.wasCanceled():
-                            break
-                        prog_idx += 1
-                        progdialog.setValue(prog_idx)
-                        progdialog.setLabelText(ca.path)
-                        center_window_on_parent(progdialog)
-                        QtCore.QCoreApplication.processEvents()
-
-                    if ca.has_metadata(style) and ca.is_writable():
-                        if not ca.remove_metadata(style):
-                            failed_list.append(ca.path)
-                        else:
-                            success_count += 1
-                        ca.load_cache([MetaDataStyle.CBI, MetaDataStyle.CIX])
-
-                progdialog.hide()
-                QtCore.QCoreApplication.processEvents()
-                self.fileSelectionList.update_selected_rows()
-                self.update_info_box()
-                self.update_menus()
-
-                summary = f"Successfully removed tags in {success_count} archive(s)."
-                if len(failed_list) > 0:
-                    summary += f"\n\nThe remove operation failed in the following {len(failed_list)} archive(s):\n"
-                    for f in failed_list:
-                        summary += f"\t{f}\n"
-
-                dlg = LogWindow(self)
-                dlg.set_text(summary)
-                dlg.setWindowTitle("Tag Remove Summary")
-                dlg.exec()
+                ca_list = [ca for ca in ca_list if ca.has_metadata(style)]
+                self.start_bulk_tag_job(BulkTagJob(ca_list, BulkTagJob.Remove, style, style, self.settings))
 
     def copy_tags(self):
         # copy the indicated tags in the archive
@@ -1547,56 +1508,62 @@ Please choose options below, and select OK.
             )
 
             if reply == QtWidgets.QMessageBox.StandardButton.Yes:
-                prog_dialog = QtWidgets.QProgressDialog("", "Cancel", 0, has_src_count, self)
-                prog_dialog.setWindowTitle("Copying Tags")
-                prog_dialog.setWindowModality(QtCore.Qt.WindowModality.ApplicationModal)
-                prog_dialog.setMinimumDuration(300)
-                center_window_on_parent(prog_dialog)
-                QtCore.QCoreApplication.processEvents()
-                prog_idx = 0
-
-                failed_list = []
-                success_count = 0
-                for ca in ca_list:
-                    if ca.has_metadata(src_style):
-                        QtCore.QCoreApplication.processEvents()
-                        if prog_dialog.wasCanceled():
-                            break
-                        prog_idx += 1
-                        prog_dialog.setValue(prog_idx)
-                        prog_dialog.setLabelText(ca.path)
-                        center_window_on_parent(prog_dialog)
-                        QtCore.QCoreApplication.processEvents()
-
-                    if ca.has_metadata(src_style) and ca.is_writable():
-                        md = ca.read_metadata(src_style)
-
-                        if dest_style == MetaDataStyle.CBI and self.settings.apply_cbl_transform_on_bulk_operation:
-                            md = CBLTransformer(md, self.settings).apply()
-
-                        if not ca.write_metadata(md, dest_style):
-                            failed_list.append(ca.path)
-                        else:
-                            success_count += 1
-
-                        ca.load_cache([MetaDataStyle.CBI, MetaDataStyle.CIX])
+                ca_list = [ca for ca in ca_list if ca.has_metadata(src_style)]
+                self.start_bulk_tag_job(BulkTagJob(ca_list, BulkTagJob.Copy, src_style, dest_style, self.settings))
 
-                prog_dialog.hide()
-                QtCore.QCoreApplication.processEvents()
-                self.fileSelectionList.update_selected_rows()
-                self.update_info_box()
-                self.update_menus()
+    def start_bulk_tag_job(self, job: BulkTagJob):
+        if job.action == BulkTagJob.Copy:
+            title = "Copying Tags"
+        else:
+            title = "Removing Tags"
+
+        self.bulk_progdialog = QtWidgets.QProgressDialog("", "Cancel", 0, len(job.ca_list), self)
+        self.bulk_progdialog.setWindowTitle(title)
+        self.bulk_progdialog.setWindowModality(QtCore.Qt.WindowModality.ApplicationModal)
+        self.bulk_progdialog.setMinimumDuration(300)
+        self.bulk_progdialog.setAutoClose(False)
+        self.bulk_progdialog.setAutoReset(False)
+        center_window_on_parent(self.bulk_progdialog)
+
+        self.bulk_job = job
+        job.progressUpdate.connect(self.bulk_tag_progress)
+        job.finished.connect(self.bulk_tag_finished)
+        self.bulk_progdialog.canceled.connect(job.cancel)
+        job.start()
+
+    def bulk_tag_progress(self, count, path):
+        self.bulk_progdialog.setValue(count)
+        self.bulk_progdialog.setLabelText(path)
+
+    def bulk_tag_finished(self):
+        job = self.bulk_job
+        self.bulk_progdialog.hide()
+        self.bulk_progdialog = None
+        self.bulk_job = None
+
+        # only the rows of the archives that were rewritten need to be read again
+        self.fileSelectionList.update_archive_list(
+            job.get_archives_with_status(BulkTagJob.Success) + job.get_archives_with_status(BulkTagJob.Failed)
+        )
+        self.update_info_box()
+        self.update_menus()
 
-                summary = f"Successfully copied tags in {success_count} archive(s)."
-                if len(failed_list) > 0:
-                    summary += f"\n\nThe copy operation failed in the following {len(failed_list)} archive(s):\n"
-                    for f in failed_list:
-                        summary += f"\t{f}\n"
+        success_count = len(job.get_archives_with_status(BulkTagJob.Success))
+        failed_count = len(job.get_archives_with_status(BulkTagJob.Failed))
+        if job.action == BulkTagJob.Copy:
+            summary = f"Successfully copied tags in {success_count} archive(s)."
+            if failed_count > 0:
+                summary += f"  The copy operation failed in {failed_count} archive(s)."
+            title = "Tag Copy Summary"
+        else:
+            summary = f"Successfully removed tags in {success_count} archive(s)."
+            if failed_count > 0:
+                summary += f"  The remove operation failed in {failed_count} archive(s)."
+            title = "Tag Remove Summary"
 
-                dlg = LogWindow(self)
-                dlg.set_text(summary)
-                dlg.setWindowTitle("Tag Copy Summary")
-                dlg.exec()
+        dlg = BulkTagSummaryWindow(self, summary, job.results)
+        dlg.setWindowTitle(title)
+        dlg.exec()
 
     def actual_issue_data_fetch(self, match):
 
@@ -1619,109 +1586,6 @@ Please choose options below, and select OK.
 
         return cv_md
 
-    def auto_tag_log(self, text):
-        IssueIdentifier.default_write_output(text)
-        if self.atprogdialog is not None:
-            self.atprogdialog.textEdit.append(text.rstrip())
-            self.atprogdialog.textEdit.ensureCursorVisible()
-            QtCore.QCoreApplication.processEvents()
-            QtCore.QCoreApplication.processEvents()
-            QtCore.QCoreApplication.processEvents()
-
-    def identify_and_tag_single_archive(
-        self, ca: ComicArchive, match_results: OnlineMatchResults, dlg: AutoTagStartWindow
-    ):
-        success = False
-        ii = IssueIdentifier(ca, self.settings)
-
-        # read in metadata, and parse file name if not there
-        md = ca.read_metadata(self.save_data_style)
-        if md.is_empty:
-            md = ca.metadata_from_filename(self.settings.parse_scan_info)
-            if dlg.ignore_leading_digits_in_filename and md.series is not None:
-                # remove all leading numbers
-                md.series = re.sub(r"([\d.]*)(.*)", "\\2", md.series)
-
-        # use the dialog specified search string
-        if dlg.search_string is not None:
-            md.series = dlg.search_string
-
-        if md is None or md.is_empty:
-            logger.error("No metadata given to search online with!")
-            return False, match_results
-
-        if dlg.dont_use_year:
-            md.year = None
-        if dlg.assume_issue_one and (md.issue is None or md.issue == ""):
-            md.issue = "1"
-        ii.set_additional_metadata(md)
-        ii.only_use_additional_meta_data = True
-        ii.wait_and_retry_on_rate_limit = dlg.wait_and_retry_on_rate_limit
-        ii.set_output_function(self.auto_tag_log)
-        ii.cover_page_index = md.get_cover_page_index_list()[0]
-        ii.set_cover_url_callback(self.atprogdialog.set_test_image)
-        ii.set_name_length_delta_threshold(dlg.name_length_match_tolerance)
-
-        matches: List[IssueResult] = ii.search()
-
-        result = ii.search_result
-
-        found_match = False
-        choices = False
-        low_confidence = False
-
-        if result == ii.result_no_matches:
-            pass
-        elif result == ii.result_found_match_but_bad_cover_score:
-            low_confidence = True
-            found_match = True
-        elif result == ii.result_found_match_but_not_first_page:
-            found_match = True
-        elif result == ii.result_multiple_matches_with_bad_image_scores:
-            low_confidence = True
-            choices = True
-        elif result == ii.result_one_good_match:
-            found_match = True
-        elif result == ii.result_multiple_good_matches:
-            choices = True
-
-        if choices:
-            if low_confidence:
-                self.auto_tag_log("Online search: Multiple low-confidence matches.  Save aborted\n")
-                match_results.low_confidence_matches.append(MultipleMatch(ca, matches))
-            else:
-                self.auto_tag_log("Online search: Multiple matches.  Save aborted\n")
-                match_results.multiple_matches.append(MultipleMatch(ca, matches))
-        elif low_confidence and not dlg.auto_save_on_low:
-            self.auto_tag_log("Online search: Low confidence match.  Save aborted\n")
-            match_results.low_confidence_matches.append(MultipleMatch(ca, matches))
-        elif not found_match:
-            self.auto_tag_log("Online search: No match found.  Save aborted\n")
-            match_results.no_matches.append(ca.path)
-        else:
-            # a single match!
-            if low_confidence:
-                self.auto_tag_log("Online search: Low confidence match, but saving anyways, as indicated...\n")
-
-            # now get the particular issue data
-            cv_md = self.actual_issue_data_fetch(matches[0])
-            if cv_md is None:
-                match_results.fetch_data_failures.append(ca.path)
-
-            if cv_md is not None:
-                md.overlay(cv_md)
-
-                if not ca.write_metadata(md, self.save_data_style):
-                    match_results.write_failures.append(ca.path)
-                    self.auto_tag_log("Save failed ;-(\n")
-                else:
-                    match_results.good_matches.append(ca.path)
-                    success = True
-                    self.auto_tag_log("Save complete!\n")
-                ca.load_cache([MetaDataStyle.CBI, MetaDataStyle.CIX])
-
-        return success, match_results
-
     def auto_tag(self):
         ca_list = self.fileSelectionList.get_selected_archive_list()
         style = self.save_data_style
@@ -1751,49 +1615,29 @@ Please choose options below, and select OK to Auto-Tag.
 
         self.atprogdialog = AutoTagProgressWindow(self)
         self.atprogdialog.setModal(True)
-        self.atprogdialog.show()
-        self.atprogdialog.progressBar.setMaximum(len(ca_list))
         self.atprogdialog.setWindowTitle("Auto-Tagging")
 
-        self.auto_tag_log("==========================================================================\n")
-        self.auto_tag_log(f"Auto-Tagging Started for {len(ca_list)} items\n")
-
-        prog_idx = 0
-
-        match_results = OnlineMatchResults()
-        archives_to_remove = []
-        for ca in ca_list:
-            self.auto_tag_log("==========================================================================\n")
-            self.auto_tag_log(f"Auto-Tagging {prog_idx + 1} of {len(ca_list)}\n")
-            self.auto_tag_log(f"{ca.path}\n")
-            cover_idx = ca.read_metadata(style).get_cover_page_index_list()[0]
-            image_data = ca.get_page(cover_idx)
-            self.atprogdialog.set_archive_image(image_data)
-            self.atprogdialog.set_test_image(None)
-
-            QtCore.QCoreApplication.processEvents()
-            if self.atprogdialog.isdone:
-                break
-            self.atprogdialog.progressBar.setValue(prog_idx)
-            prog_idx += 1
-            self.atprogdialog.label.setText(ca.path)
-            center_window_on_parent(self.atprogdialog)
-            QtCore.QCoreApplication.processEvents()
-
-            if ca.is_writable():
-                success, match_results = self.identify_and_tag_single_archive(ca, match_results, atstartdlg)
+        self.atjob = AutoTagJob(ca_list, self.settings, style, atstartdlg)
+        self.atjob.finished.connect(self.auto_tag_finished)
+        self.atprogdialog.set_job(self.atjob)
+        self.atprogdialog.show()
+        center_window_on_parent(self.atprogdialog)
+        self.atjob.start()
 
-                if success and atstartdlg.remove_after_success:
-                    archives_to_remove.append(ca)
+    def auto_tag_finished(self):
+        job = self.atjob
+        style = job.style
+        match_results = job.match_results
 
         self.atprogdialog.close()
 
-        if atstartdlg.remove_after_success:
-            self.fileSelectionList.remove_archive_list(archives_to_remove)
+        if job.dlg.remove_after_success:
+            self.fileSelectionList.remove_archive_list(job.archives_to_remove)
         self.fileSelectionList.update_selected_rows()
 
         self.load_archive(self.fileSelectionList.get_current_archive())
         self.atprogdialog = None
+        self.atjob = None
 
         summary = ""
         summary += f"Successfully tagged archives: {len(match_results.good_matches)}\n"
@@ -1811,7 +1655,7 @@ Please choose options below, and select OK to Auto-Tag.
         if len(match_results.write_failures) > 0:
             summary += f"Archives that failed due to file writing errors: {len(match_results.write_failures)}\n"
 
-        self.auto_tag_log(summary)
+        IssueIdentifier.default_write_output(summary)
 
         sum_selectable = len(match_results.multiple_matches) + len(match_results.low_confidence_matches)
         if sum_selectable > 0:
@@ -1939,10 +1783,14 @@ Please choose options below, and select OK to Auto-Tag.
             "File Rename", "If you rename files now, unsaved data in the form will be lost.  Are you sure?"
         ):
 
+            # the rows are found by their old paths, the archives may not all be in the list's cache any more
+            old_paths = [ca.path for ca in ca_list]
             dlg = RenameWindow(self, ca_list, self.load_data_style, self.settings)
             dlg.setModal(True)
             if dlg.exec():
-                self.fileSelectionList.update_selected_rows()
+                self.fileSelectionList.update_renamed_archives(old_paths, ca_list)
+                if self.comic_archive is not None and self.comic_archive.path in old_paths:
+                    self.comic_archive = ca_list[old_paths.index(self.comic_archive.path)]
                 self.load_archive(self.comic_archive)
 
     def file_list_selection_changed(self, fi: FileInfo):
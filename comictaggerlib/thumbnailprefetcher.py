@@ -0,0 +1,73 @@
+"""A class to fetch cover images ahead of time for the rows of a selection list"""
+
+# Copyright 2012-2014 Anthony Beville
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#     http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from comictaggerlib.imagefetcher import ImageFetcher, ImageFetcherException
+
+logger = logging.getLogger(__name__)
+
+
+class ThumbnailPrefetcher:
+    """Fetches images into the image caches in the background, a few at a time
+
+    The selection windows hand it the URLs of the rows on screen and nearby
+    whenever the view changes; queued fetches for rows that are no longer
+    wanted are dropped.  Fetches already running finish and land in the cache.
+    """
+
+    max_workers = 4
+
+    def __init__(self):
+        self.executor = ThreadPoolExecutor(max_workers=ThumbnailPrefetcher.max_workers)
+        self.futures = {}
+        self.lock = threading.Lock()
+
+    def prefetch(self, url_list):
+        # in offline mode every miss would land in the offline queue, even for rows never looked at
+        if ImageFetcher.offline:
+            return
+
+        wanted = set(url_list)
+        with self.lock:
+            for url, future in list(self.futures.items()):
+                if url not in wanted:
+                    future.cancel()
+                if future.done():
+                    del self.futures[url]
+
+            for url in url_list:
+                if not url or url in self.futures or url in ImageFetcher.memory_cache:
+                    continue
+                self.futures[url] = self.executor.submit(self.fetch, url)
+
+    def fetch(self, url):
+        try:
+            ImageFetcher().fetch(url, blocking=True)
+        except ImageFetcherException:
+            logger.info("Prefetching %s failed", url)
+        except Exception:
+            # a busy cache database or a socket error, the image is fetched again when it's shown
+            logger.exception("Prefetching %s failed", url)
+
+    def shutdown(self):
+        with self.lock:
+            for future in self.futures.values():
+                future.cancel()
+            self.futures = {}
+        self.executor.shutdown(wait=False)
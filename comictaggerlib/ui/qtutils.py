@@ -3,12 +3,13 @@
 import io
 import logging
 
+from comictaggerlib.memorycache import MemoryCache
 from comictaggerlib.settings import ComicTaggerSettings
 
 logger = logging.getLogger(__name__)
 
 try:
-    from PyQt5 import QtGui
+    from PyQt5 import QtCore, QtGui
 
     qt_available = True
 except ImportError:
@@ -59,6 +60,20 @@ if qt_available:
         # And the move call repositions the window
         window.move(hpos + main_window_size.left(), vpos + main_window_size.top())
 
+    def get_visible_rows(table, margin=0):
+        """Returns the rows of a table view that are on screen, plus margin rows on either side"""
+        row_count = table.model().rowCount()
+        if row_count == 0:
+            return range(0)
+        first = table.rowAt(0)
+        last = table.rowAt(table.viewport().height() - 1)
+        if first == -1:
+            first = 0
+        if last == -1:
+            # the rows end above the bottom of the view, or the view isn't laid out yet
+            last = min(row_count - 1, first + 50)
+        return range(max(first - margin, 0), min(last + margin + 1, row_count))
+
     def get_qimage_from_data(image_data):
         img = QtGui.QImage()
         success = img.loadFromData(image_data)
@@ -74,3 +89,20 @@ if qt_available:
         if not success:
             img.load(ComicTaggerSettings.get_graphic("nocover.png"))
         return img
+
+    def pixmap_size(pixmap):
+        return pixmap.width() * pixmap.height() * max(pixmap.depth() // 8, 1)
+
+    # decoded and scaled images, keyed by (source, size) where a size of None is the full image
+    pixmap_cache = MemoryCache(128 * 1024 * 1024, pixmap_size)
+
+    def get_scaled_pixmap(source, pixmap, width, height):
+        """Scales the pixmap to fit in width x height, reusing an earlier scaling of the same source"""
+        if source is None:
+            return pixmap.scaled(width, height, QtCore.Qt.AspectRatioMode.KeepAspectRatio)
+
+        scaled_pixmap = pixmap_cache.get((source, (width, height)))
+        if scaled_pixmap is None:
+            scaled_pixmap = pixmap.scaled(width, height, QtCore.Qt.AspectRatioMode.KeepAspectRatio)
+            pixmap_cache.put((source, (width, height)), scaled_pixmap)
+        return scaled_pixmap
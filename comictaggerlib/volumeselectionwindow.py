@@ -28,7 +28,8 @@ from comictaggerlib.issueselectionwindow import IssueSelectionWindow
 from comictaggerlib.matchselectionwindow import MatchSelectionWindow
 from comictaggerlib.progresswindow import IDProgressWindow
 from comictaggerlib.settings import ComicTaggerSettings
-from comictaggerlib.ui.qtutils import reduce_widget_font_size
+from comictaggerlib.thumbnailprefetcher import ThumbnailPrefetcher
+from comictaggerlib.ui.qtutils import get_visible_rows, reduce_widget_font_size
 
 logger = logging.getLogger(__name__)
 
@@ -130,12 +131,15 @@ class VolumeSelectionWindow(QtWidgets.QDialog):
         self.immediate_autoselect = autoselect
         self.cover_index_list = cover_index_list
         self.cv_search_results = None
+        self.thumbnail_prefetcher = ThumbnailPrefetcher()
+        self.finished.connect(self.thumbnail_prefetcher.shutdown)
 
         self.use_filter = self.settings.always_use_publisher_filter
 
         self.twList.resizeColumnsToContents()
         self.twList.currentItemChanged.connect(self.current_item_changed)
         self.twList.cellDoubleClicked.connect(self.cell_double_clicked)
+        self.twList.verticalScrollBar().valueChanged.connect(self.prefetch_covers)
         self.btnRequery.clicked.connect(self.requery)
         self.btnIssues.clicked.connect(self.show_issues)
         self.btnAutoSelect.clicked.connect(self.auto_select)
@@ -366,12 +370,8 @@ class VolumeSelectionWindow(QtWidgets.QDialog):
         if self.settings.exact_series_matches_first:
             try:
                 sanitized = utils.sanitize_title(self.series_name)
-                exact_matches = list(
-                    filter(lambda d: utils.sanitize_title(str(d["name"])) in sanitized, self.cv_search_results)
-                )
-                non_matches = list(
-                    filter(lambda d: utils.sanitize_title(str(d["name"])) not in sanitized, self.cv_search_results)
-                )
+                exact_matches = list(filter(lambda d: d["sanitized_name"] in sanitized, self.cv_search_results))
+                non_matches = list(filter(lambda d: d["sanitized_name"] not in sanitized, self.cv_search_results))
                 self.cv_search_results = exact_matches + non_matches
             except:
                 logger.exception("bad data error filtering exact/near matches")
@@ -437,6 +437,19 @@ class VolumeSelectionWindow(QtWidgets.QDialog):
     def cell_double_clicked(self, r, c):
         self.show_issues()
 
+    def prefetch_covers(self):
+        """Starts fetching the covers for the rows on screen and around them"""
+        if not self.cv_search_results:
+            return
+        records = {record["id"]: record for record in self.cv_search_results}
+        url_list = []
+        for r in get_visible_rows(self.twList, 10):
+            record = records.get(self.twList.item(r, 0).data(QtCore.Qt.ItemDataRole.UserRole))
+            # only thumbnails are prefetched, the full cover is fetched when its row is selected
+            if record is not None and record["image"] is not None and record["image"].get("thumb_url"):
+                url_list.append(record["image"]["thumb_url"])
+        self.thumbnail_prefetcher.prefetch(url_list)
+
     def current_item_changed(self, curr, prev):
 
         if curr is None:
@@ -445,6 +458,7 @@ class VolumeSelectionWindow(QtWidgets.QDialog):
             return
 
         self.volume_id = self.twList.item(curr.row(), 0).data(QtCore.Qt.ItemDataRole.UserRole)
+        self.prefetch_covers()
 
         # list selection was changed, update the info on the volume
         for record in self.cv_search_results:
@@ -453,5 +467,5 @@ class VolumeSelectionWindow(QtWidgets.QDialog):
                     self.teDetails.setText("")
                 else:
                     self.teDetails.setText(record["description"])
-                self.imageWidget.set_url(record["image"]["super_url"])
+                self.imageWidget.set_url(record["image"]["super_url"], record["image"].get("thumb_url"))
                 break
@@ -0,0 +1,68 @@
+"""Checks that reading the tags of an archive opens it once"""
+
+import zipfile
+
+import pytest
+
+from comicapi.comicarchive import ComicArchive, MetaDataStyle
+from comicapi.comicbookinfo import ComicBookInfo
+from comicapi.comicinfoxml import ComicInfoXml
+from comicapi.genericmetadata import GenericMetadata
+from comictaggerlib.settings import ComicTaggerSettings
+
+comet_xml = """<?xml version="1.0" encoding="utf-8"?>
+<comet xmlns:comet="http://www.denvog.com/comet/" xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance">
+  <title>CoMet Title</title>
+  <series>CoMet Series</series>
+  <issue>3</issue>
+</comet>
+"""
+
+
+@pytest.fixture
+def tagged_cbz(tmp_path):
+    md = GenericMetadata()
+    md.series = "Test Series"
+    md.issue = "3"
+    md.year = 2021
+
+    path = tmp_path / "Test Series 003 (2021).cbz"
+    with zipfile.ZipFile(path, "w") as zf:
+        for i in range(5):
+            zf.writestr(f"page{i:02}.jpg", b"\xff\xd8\xff\xd9")
+        zf.writestr("ComicInfo.xml", ComicInfoXml().string_from_metadata(md))
+        zf.writestr("CoMet.xml", comet_xml)
+        zf.writestr("notes.xml", "<notes>not a CoMet file</notes>")
+        zf.comment = ComicBookInfo().string_from_metadata(md).encode("utf-8")
+    return str(path)
+
+
+@pytest.fixture
+def zip_opens(monkeypatch):
+    opens = []
+    original_init = zipfile.ZipFile.__init__
+
+    def counting_init(self, file, *args, **kwargs):
+        opens.append(file)
+        original_init(self, file, *args, **kwargs)
+
+    monkeypatch.setattr(zipfile.ZipFile, "__init__", counting_init)
+    return opens
+
+
+def test_load_all_metadata_opens_archive_once(tagged_cbz, zip_opens):
+    ca = ComicArchive(tagged_cbz, None, ComicTaggerSettings.get_graphic("nocover.png"))
+    ca.load_all_metadata()
+    assert len(zip_opens) == 1
+
+
+def test_tags_are_read_from_the_single_pass(tagged_cbz, zip_opens):
+    ca = ComicArchive(tagged_cbz, None, ComicTaggerSettings.get_graphic("nocover.png"))
+    ca.load_all_metadata()
+
+    assert ca.has_cix() and ca.has_cbi() and ca.has_comet()
+    assert ca.read_metadata(MetaDataStyle.CIX).series == "Test Series"
+    assert ca.read_metadata(MetaDataStyle.CBI).series == "Test Series"
+    assert ca.read_metadata(MetaDataStyle.COMET).series == "CoMet Series"
+    assert ca.get_number_of_pages() == 5
+    assert len(zip_opens) == 1
@@ -0,0 +1,44 @@
+"""Round trips the ComicInfo.xml samples and compares them to the output of the original reader and writer
+
+The golden files in tests/data/comicinfo/golden were written by the
+ComicInfoXml of the baseline tree: <name>.rewritten.xml is the sample
+read and written back over itself, <name>.new.xml is it written from
+scratch.
+"""
+
+import os
+
+import pytest
+
+from comicapi.comicinfoxml import ComicInfoXml
+
+data_dir = os.path.join(os.path.dirname(__file__), "data", "comicinfo")
+samples = sorted(name[:-4] for name in os.listdir(data_dir) if name.endswith(".xml"))
+
+
+def read_file(*path):
+    with open(os.path.join(data_dir, *path), "rb") as f:
+        return f.read()
+
+
+@pytest.mark.parametrize("sample", samples)
+def test_rewrite_matches_golden(sample):
+    raw = read_file(sample + ".xml")
+    md = ComicInfoXml().metadata_from_string(raw)
+    assert ComicInfoXml().string_from_metadata(md, raw).encode("utf-8") == read_file(
+        "golden", sample + ".rewritten.xml"
+    )
+
+
+@pytest.mark.parametrize("sample", samples)
+def test_new_matches_golden(sample):
+    md = ComicInfoXml().metadata_from_string(read_file(sample + ".xml"))
+    assert ComicInfoXml().string_from_metadata(md).encode("utf-8") == read_file("golden", sample + ".new.xml")
+
+
+@pytest.mark.parametrize("sample", samples)
+def test_str_and_bytes_read_the_same(sample):
+    raw = read_file(sample + ".xml")
+    from_bytes = ComicInfoXml().metadata_from_string(raw)
+    from_str = ComicInfoXml().metadata_from_string(raw.decode("utf-8"))
+    assert ComicInfoXml().string_from_metadata(from_bytes) == ComicInfoXml().string_from_metadata(from_str)
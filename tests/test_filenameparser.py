@@ -0,0 +1,43 @@
+"""Parses the filename corpus and compares it to the output of the original parser
+
+tests/data/filenames/golden.json was written by the FileNameParser of the
+baseline tree, from the names in corpus.txt.
+"""
+
+import json
+import os
+
+import pytest
+
+from comicapi.filenameparser import FileNameParser
+
+data_dir = os.path.join(os.path.dirname(__file__), "data", "filenames")
+
+fields = ["series", "volume", "year", "issue", "issue_count", "remainder"]
+
+with open(os.path.join(data_dir, "golden.json"), encoding="utf-8") as f:
+    golden = json.load(f)
+
+
+def parsed_fields(fnp):
+    return {field: getattr(fnp, field) for field in fields}
+
+
+@pytest.mark.parametrize("expected", golden, ids=[entry["filename"] for entry in golden])
+def test_parse_filename_matches_golden(expected):
+    fnp = FileNameParser()
+    fnp.parse_filename(expected["filename"])
+    assert {"filename": expected["filename"], **parsed_fields(fnp)} == expected
+
+
+def test_corpus_and_golden_agree():
+    with open(os.path.join(data_dir, "corpus.txt"), encoding="utf-8") as f:
+        names = [line.rstrip("\n") for line in f if line.strip()]
+    assert names == [entry["filename"] for entry in golden]
+
+
+def test_parse_many_matches_parse_filename():
+    names = [entry["filename"] for entry in golden]
+    assert [parsed_fields(fnp) for fnp in FileNameParser.parse_many(names)] == [
+        {field: entry[field] for field in fields} for entry in golden
+    ]
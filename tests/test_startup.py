@@ -0,0 +1,54 @@
+"""The command-line startup budget: what importing the entry points loads, and how long it takes"""
+
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# modules that are only imported by the code that needs them
+deferred_modules = ["PyQt5", "pycountry", "py7zr", "rarfile", "requests", "natsort", "thefuzz"]
+
+# seconds, well above a normal run so a slow machine doesn't fail it
+import_budget = {
+    "comicapi.utils": 0.5,
+    "comicapi.comicarchive": 1.0,
+    "comictaggerlib.main": 1.0,
+}
+
+probe = """
+import json, sys, time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+print(json.dumps({{"elapsed": elapsed, "modules": sorted(sys.modules)}}))
+"""
+
+
+def import_in_subprocess(module):
+    env = dict(os.environ, PYTHONPATH=root)
+    result = subprocess.run(
+        [sys.executable, "-c", probe.format(module=module)],
+        cwd=root,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return json.loads(result.stdout.splitlines()[-1])
+
+
+@pytest.mark.parametrize("module", list(import_budget))
+def test_import_defers_heavy_modules(module):
+    loaded = set(import_in_subprocess(module)["modules"])
+    assert [m for m in deferred_modules if m in loaded] == []
+
+
+@pytest.mark.parametrize("module", list(import_budget))
+def test_import_within_budget(module):
+    # the best of a few runs, so a busy machine doesn't fail the test
+    elapsed = min(import_in_subprocess(module)["elapsed"] for _ in range(3))
+    assert elapsed < import_budget[module]